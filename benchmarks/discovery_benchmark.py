@@ -0,0 +1,70 @@
+"""discovery_benchmark.py
+
+Compares the original per-generator os.listdir + os.path.isfile discovery loop with ResultsDiscovery on a synthetic results
+tree.  The tree is sharded as <root>/shard-N/browser/*.xml with a sprinkling of non-XML artifacts, and is built once in a
+temporary directory (or --root, which is reused if it already exists).  Invoke it as follows:
+
+python3 benchmarks/discovery_benchmark.py --files 200000 --threads 1 8
+
+"""
+
+import argparse, os, sys, tempfile, time, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsDiscovery
+
+
+def build_tree(root, files, shards):
+    _browsers = ["chrome", "firefox"]
+    for i in range(files):
+        _dir = os.path.join(root, f"shard-{i % shards}", _browsers[i % len(_browsers)])
+        if i < shards * len(_browsers):
+            os.makedirs(_dir, exist_ok=True)
+        _name = f"case-{i}.xml" if i % 10 else f"case-{i}.log"
+        open(os.path.join(_dir, _name), "w").close()
+
+
+def listdir_discovery(results_dirs):
+    # The loop every generator used to carry, extended to walk the tree since the original wasn't recursive
+    _results_files = []
+    _pending = list(results_dirs)
+    while _pending:
+        _results_dir = _pending.pop()
+        for _f in os.listdir(_results_dir):
+            _full_path = os.path.join(_results_dir, _f)
+            if os.path.isfile(_full_path):
+                if _full_path.endswith('.xml'):
+                    _results_files.append(_full_path)
+            elif os.path.isdir(_full_path):
+                _pending.append(_full_path)
+    return _results_files
+
+
+def timed(func):
+    _start = time.perf_counter()
+    _found = func()
+    return time.perf_counter() - _start, len(_found)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark results-directory discovery.")
+    parser.add_argument('--files', type=int, default=200000)
+    parser.add_argument('--shards', type=int, default=200)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--root', help="Directory to build the tree in, reused between runs if it exists.")
+    args = parser.parse_args()
+
+    _root = args.root if args.root else tempfile.mkdtemp()
+    if not os.path.isdir(_root) or not os.listdir(_root):
+        _start = time.perf_counter()
+        build_tree(_root, args.files, args.shards)
+        print(f"built {args.files} files in {time.perf_counter() - _start:.1f}s")
+    try:
+        _elapsed, _count = timed(lambda: listdir_discovery([_root]))
+        print(f"{'listdir + isfile':<24}{_count:>10} files{_elapsed:>10.3f}s")
+        for _threads in args.threads:
+            _discovery = ResultsDiscovery.ResultsDiscovery(recursive=True, threads=_threads)
+            _elapsed, _count = timed(lambda: _discovery.discover([_root]))
+            print(f"{f'scandir, {_threads} thread(s)':<24}{_count:>10} files{_elapsed:>10.3f}s")
+    finally:
+        if not args.root:
+            shutil.rmtree(_root)
@@ -0,0 +1,43 @@
+"""ignorelist_benchmark.py
+
+Measures the cost of checking failing test cases against ignorelists of growing length, comparing the compiled
+IgnoreListMatcher with a scan of a plain list of ignored names.  Half of each ignorelist is exact names and half glob
+patterns (which the name scan can't express, so it only sees the exact half).  Invoke it as follows:
+
+python3 benchmarks/ignorelist_benchmark.py --sizes 10 100 1000 10000
+
+"""
+
+import argparse, os, sys, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import IgnoreListMatcher
+
+
+def run(size, lookups):
+    _ignorelist = [{"name": f"ignored case {i}"} if i % 2 == 0 else {"name": f"ignored group {i} *", "match": "glob"} for i in range(size)]
+    _names = [f"failing case {i}" if i % 10 else f"ignored case {(i * 2) % size}" for i in range(lookups)]
+    _start = time.perf_counter()
+    _matcher = IgnoreListMatcher.IgnoreListMatcher(_ignorelist)
+    _compile = time.perf_counter() - _start
+    _start = time.perf_counter()
+    for _name in _names:
+        _matcher.match("suite", _name)
+    _matched = time.perf_counter() - _start
+    _ignored_names = [e['name'] for e in _ignorelist if "match" not in e]
+    _start = time.perf_counter()
+    for _name in _names:
+        _name in _ignored_names
+    _scanned = time.perf_counter() - _start
+    return _compile, _matched, _scanned
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark IgnoreListMatcher lookups against ignorelist length.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--lookups', type=int, default=100000, help="Number of failing test cases checked per ignorelist.")
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'compile ms':>12}{'matcher us':>12}{'scan us':>12}")
+    for _size in args.sizes:
+        _compile, _matched, _scanned = run(_size, args.lookups)
+        print(f"{_size:>10}{_compile * 1e3:>12.2f}{(_matched / args.lookups) * 1e6:>12.2f}{(_scanned / args.lookups) * 1e6:>12.2f}")
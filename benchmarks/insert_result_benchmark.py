@@ -0,0 +1,38 @@
+"""insert_result_benchmark.py
+
+Measures ResultsAggregator.insert_result throughput as the number of cases grows, to confirm ingestion scales linearly.
+Every run inserts N unique cases (1 in 20 failing) followed by N/100 duplicate failing re-runs, then reads counts and
+coverage once.  Invoke it as follows:
+
+python3 benchmarks/insert_result_benchmark.py --sizes 1000 10000 100000 1000000
+
+"""
+
+import argparse, os, sys, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsAggregator as ra
+
+
+def run(size):
+    _aggregate = ra.ResultsAggregator(ignorelist=[{"name": "case 7"}])
+    _metadata = {"message": "", "filename": "bench.xml", "priority": "Priority/P1", "severity": "Severity 1 - Urgent", "squad(s)": ["Unlabelled"]}
+    _start = time.perf_counter()
+    for i in range(size):
+        _state = ra.ResultsAggregator.failed if i % 20 == 0 else ra.ResultsAggregator.passed
+        _aggregate.insert_result(f"suite {i % 500}", _state, f"case {i}", _metadata)
+    for i in range(0, size, 100):
+        _aggregate.insert_result(f"suite {i % 500}", ra.ResultsAggregator.failed, f"case {i}", _metadata)
+    _aggregate.get_counts()
+    _aggregate.get_coverage()
+    return time.perf_counter() - _start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ResultsAggregator.insert_result scaling.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'cases':>10}{'seconds':>12}{'us/case':>12}")
+    for _size in args.sizes:
+        _elapsed = run(_size)
+        print(f"{_size:>10}{_elapsed:>12.3f}{(_elapsed / _size) * 1e6:>12.2f}")
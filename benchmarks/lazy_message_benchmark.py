@@ -0,0 +1,53 @@
+"""lazy_message_benchmark.py
+
+Compares the memory a ResultsAggregator holds on to after loading a results file with many failures, with failure
+messages loaded eagerly and with lazy_messages=True.  Retained memory is measured with tracemalloc once loading is done,
+and the time to read every message back through get_message is reported alongside it.  Invoke it as follows:
+
+python3 benchmarks/lazy_message_benchmark.py --failures 5000 --trace-kb 8
+
+"""
+
+import argparse, os, sys, tempfile, time, tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsAggregator as ra
+
+
+def generate_results_file(path, failures, trace_kb):
+    """Write a JUnit XML file to path in which every one of failures cases fails with a trace_kb KB stack trace."""
+    _frame = "    at frame (/tests/e2e/spec.js:12:16) [31mexpected true to equal false[0m\n"
+    _trace = _frame * ((trace_kb * 1024) // len(_frame))
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n  <testsuite name="suite">\n')
+        for i in range(failures):
+            f.write(f'    <testcase name="[P1][Severity 1 - Urgent][squad{i % 7}] case {i}">\n')
+            f.write(f'      <failure message="failed"><![CDATA[case {i} failed\n{_trace}]]></failure>\n    </testcase>\n')
+        f.write('  </testsuite>\n</testsuites>\n')
+
+
+def measure(path, lazy):
+    tracemalloc.start()
+    _start = time.perf_counter()
+    _aggregate = ra.ResultsAggregator(files=[path], lazy_messages=lazy)
+    _load = time.perf_counter() - _start
+    _retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    _start = time.perf_counter()
+    _chars = sum(len(_aggregate.get_message(r)) for r in _aggregate.get_results())
+    _read = time.perf_counter() - _start
+    return _load, _retained, _read, _chars
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark eager vs lazy failure message storage.")
+    parser.add_argument('--failures', type=int, default=5000)
+    parser.add_argument('--trace-kb', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        _path = os.path.join(_tmp, "failures.xml")
+        generate_results_file(_path, args.failures, args.trace_kb)
+        print(f"{'mode':<8}{'load (s)':>10}{'retained (MB)':>16}{'read all (s)':>14}{'message chars':>16}")
+        for _lazy in [False, True]:
+            _load, _retained, _read, _chars = measure(_path, _lazy)
+            print(f"{'lazy' if _lazy else 'eager':<8}{_load:>10.3f}{_retained / (1024 * 1024):>16.2f}{_read:>14.3f}{_chars:>16}")
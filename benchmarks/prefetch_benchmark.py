@@ -0,0 +1,64 @@
+"""prefetch_benchmark.py
+
+Measures how much reading results files ahead of the parser (PrefetchReader) speeds up loading a results directory made
+of many small files, one JUnit XML file per test, on storage with a per-open latency - ex. a network filesystem.  The
+latency is simulated by sleeping in every open() of a results file made by the loader or the prefetching threads.  The
+tree is built once in a temporary directory (or --root, which is reused if it already exists).  Invoke it as follows:
+
+python3 benchmarks/prefetch_benchmark.py --files 20000 --latency-ms 2 --depths 0 4 16 64
+
+"""
+
+import argparse, builtins, os, sys, tempfile, time, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import PrefetchReader
+
+
+def build_tree(root, files):
+    for i in range(files):
+        _failure = f'<failure message="boom">expected {i} to pass</failure>' if i % 50 == 0 else ""
+        with open(os.path.join(root, f"case-{i:06}.xml"), "w") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites><testsuite name="suite {i % 100}" tests="1">'
+                f'<testcase name="case {i}" classname="suite {i % 100}">{_failure}</testcase></testsuite></testsuites>\n')
+
+
+def slow_open(latency):
+    # Shadows open() in the modules that read results files, sleeping before each open of one
+    def _open(file, *args, **kwargs):
+        if isinstance(file, str) and file.endswith(".xml"):
+            time.sleep(latency)
+        return builtins.open(file, *args, **kwargs)
+    return _open
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prefetched loading of many small results files.")
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--latency-ms', type=float, default=2.0, help="Simulated latency of each open(), in milliseconds.")
+    parser.add_argument('--depths', type=int, nargs='+', default=[0, 4, 16, 64], help="Prefetch depths to compare, 0 disables prefetching.")
+    parser.add_argument('--root', help="Directory to build the tree in, reused between runs if it exists.")
+    args = parser.parse_args()
+
+    _root = args.root if args.root else tempfile.mkdtemp()
+    if not os.path.isdir(_root) or not os.listdir(_root):
+        os.makedirs(_root, exist_ok=True)
+        _start = time.perf_counter()
+        build_tree(_root, args.files)
+        print(f"built {args.files} files in {time.perf_counter() - _start:.1f}s")
+    _files = sorted(os.path.join(_root, f) for f in os.listdir(_root))
+    ra.open = PrefetchReader.open = slow_open(args.latency_ms / 1000)
+    try:
+        print(f"{'depth':>8}{'seconds':>10}{'speedup':>10}")
+        _baseline = None
+        for _depth in args.depths:
+            _start = time.perf_counter()
+            _aggregate = ra.ResultsAggregator(files=_files, prefetch=_depth)
+            _elapsed = time.perf_counter() - _start
+            _baseline = _baseline if _baseline is not None else _elapsed
+            print(f"{_depth:>8}{_elapsed:>10.2f}{_baseline / _elapsed:>9.1f}x")
+        print(f"counts: {_aggregate.get_counts()}")
+    finally:
+        del ra.open, PrefetchReader.open
+        if not args.root:
+            shutil.rmtree(_root)
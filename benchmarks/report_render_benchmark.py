@@ -0,0 +1,48 @@
+"""report_render_benchmark.py
+
+Measures how markdown report rendering scales with the number of test cases.  Each run builds an aggregate of N cases,
+1 in 10 failing with a short stack trace, and writes its markdown report to a file through a ReportWriter, reporting the
+time taken per table row and the memory allocated at peak while rendering (measured with tracemalloc, on top of the
+aggregate itself).  Time per row and peak memory should stay flat as N grows.  Invoke it as follows:
+
+python3 benchmarks/report_render_benchmark.py --sizes 25000 50000 100000
+
+"""
+
+import argparse, os, sys, tempfile, time, tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsAggregator as ra
+from generators import MarkdownGenerator, ReportWriter
+
+
+def build_aggregate(size):
+    _aggregate = ra.ResultsAggregator()
+    _trace = "    at frame (/tests/e2e/spec.js:12:16)\n" * 10
+    for i in range(size):
+        _failed = i % 10 == 0
+        _aggregate.insert_result(f"suite {i % 50}", ra.ResultsAggregator.failed if _failed else ra.ResultsAggregator.passed, f"case {i}",
+            ra.ResultsAggregator.get_case_metadata(f"case {i}", f"case {i} failed\n{_trace}" if _failed else "", "bench.xml"))
+    return _aggregate
+
+
+def measure(size, path):
+    _generator = MarkdownGenerator.MarkdownGenerator([], aggregated_results=build_aggregate(size))
+    tracemalloc.start()
+    _start = time.perf_counter()
+    ReportWriter.ReportWriter.write_report(_generator.iter_markdown_report(), path)
+    _elapsed = time.perf_counter() - _start
+    _peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _elapsed, _peak, os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming markdown report rendering.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25000, 50000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        print(f"{'cases':>10}{'seconds':>10}{'us/row':>10}{'peak MB':>10}{'report MB':>11}")
+        for _size in args.sizes:
+            _elapsed, _peak, _bytes = measure(_size, os.path.join(_tmp, "report.md"))
+            print(f"{_size:>10}{_elapsed:>10.3f}{_elapsed * 1e6 / _size:>10.2f}{_peak / (1024 * 1024):>10.2f}{_bytes / (1024 * 1024):>11.2f}")
@@ -0,0 +1,50 @@
+"""results_store_benchmark.py
+
+Compares peak memory and time of the in-memory and SQLite result stores on a synthetic run of N cases, 1 in 10 failing
+with a distinct multi-KB failure message, as in a full regression run.  Each store is measured in a fresh subprocess so
+its peak resident set size is its own.  After inserting the cases every failure is read back through get_results(), as
+the report generators do.  Invoke it as follows:
+
+python3 benchmarks/results_store_benchmark.py --sizes 100000 400000 --message-kb 4
+
+"""
+
+import argparse, os, resource, subprocess, sys, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsAggregator as ra
+
+
+def run(store, size, message_kb):
+    _aggregate = ra.ResultsAggregator(store=store)
+    _trace = "    at frame {}\n" * (message_kb * 1024 // 20)
+    _start = time.perf_counter()
+    for i in range(size):
+        if i % 10 == 0:
+            _metadata = ra.ResultsAggregator.get_case_metadata(f"case {i}", f"case {i} failed\n" + _trace, "bench.xml")
+            _aggregate.insert_result(f"suite {i % 500}", ra.ResultsAggregator.failed, f"case {i}", _metadata)
+        else:
+            _aggregate.insert_result(f"suite {i % 500}", ra.ResultsAggregator.passed, f"case {i}", ra.ResultsAggregator.get_case_metadata(f"case {i}", "", "bench.xml"))
+    _read = sum(len(_aggregate.get_message(r)) for r in _aggregate.get_results(states=[ra.ResultsAggregator.failed]))
+    _elapsed = time.perf_counter() - _start
+    return _elapsed, _read
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ResultsAggregator result stores.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 400000])
+    parser.add_argument('--message-kb', type=int, default=4, help="Size of each failure message, in KB.")
+    parser.add_argument('--run', nargs=2, metavar=('STORE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        _elapsed, _read = run(args.run[0], int(args.run[1]), args.message_kb)
+        print(f"{_elapsed} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}")
+        sys.exit(0)
+
+    print(f"{'store':>8}{'cases':>10}{'seconds':>10}{'peak MB':>10}")
+    for _size in args.sizes:
+        for _store in (ra.ResultsAggregator.memory_store, ra.ResultsAggregator.sqlite_store):
+            _output = subprocess.run([sys.executable, __file__, "--run", _store, str(_size), "--message-kb", str(args.message_kb)],
+                check=True, capture_output=True, text=True).stdout.split()
+            # ru_maxrss is in KB on Linux
+            print(f"{_store:>8}{_size:>10}{float(_output[0]):>10.2f}{int(_output[1]) / 1024:>10.0f}")
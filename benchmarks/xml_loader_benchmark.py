@@ -0,0 +1,103 @@
+"""xml_loader_benchmark.py
+
+Compares the streaming XmlLoader ingestion path against the legacy untangle DOM path on a synthetic JUnit XML file
+padded with <system-out> noise, reporting wall time and peak RSS for each.  Each path runs in its own child process so
+that peak RSS figures don't bleed into one another.  Invoke it as follows:
+
+python3 benchmarks/xml_loader_benchmark.py --size-mb 500
+
+"""
+
+import argparse, json, os, resource, subprocess, sys, tempfile, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Shape of the synthetic file - every case carries system-out noise, every 50th case fails with a stack trace
+SYSTEM_OUT_BYTES = 16 * 1024
+FAILURE_EVERY = 50
+CASES_PER_SUITE = 100
+
+
+def generate_results_file(path, size_mb):
+    """Write a synthetic <testsuites> JUnit XML file of roughly size_mb megabytes to path."""
+    _target = size_mb * 1024 * 1024
+    _noise = ("[INFO] " + "x" * 73 + "\n") * (SYSTEM_OUT_BYTES // 81)
+    _trace = "".join(f"    at frame{i} (/tests/e2e/spec.js:{i}:16)\n" for i in range(40))
+    _written = 0
+    _case = 0
+    with open(path, "w") as f:
+        _written += f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        while _written < _target:
+            _written += f.write(f'  <testsuite name="suite-{_case // CASES_PER_SUITE}">\n')
+            for _ in range(CASES_PER_SUITE):
+                _written += f.write(f'    <testcase name="[P1][Severity 1 - Urgent][squad{_case % 7}] case {_case}" time="1.0">\n')
+                if _case % FAILURE_EVERY == 0:
+                    _written += f.write(f'      <failure message="failed"><![CDATA[Timed out waiting for element\n{_trace}]]></failure>\n')
+                _written += f.write(f'      <system-out><![CDATA[{_noise}]]></system-out>\n    </testcase>\n')
+                _case += 1
+            _written += f.write('  </testsuite>\n')
+        f.write('</testsuites>\n')
+
+
+def run_untangle(path):
+    """The pre-streaming ingestion path - read the whole file, build an untangle DOM, and walk it."""
+    import untangle
+    from datamodel import ResultsAggregator as ra
+    _aggregate = ra.ResultsAggregator()
+    with open(path, "r") as f:
+        _dom = untangle.parse(f.read())
+    for _suite in _dom.testsuites.children:
+        for _case in _suite.children:
+            if _case._name == "testcase":
+                _aggregate.insert_result(_suite['name'], ra.ResultsAggregator.get_case_state_xml(_case),
+                    ra.ResultsAggregator.get_case_name_xml(_case), ra.ResultsAggregator.get_case_metadata_xml(_case, path))
+    return _aggregate
+
+
+def run_stream(path):
+    """The streaming ingestion path used by ResultsAggregator.load_file."""
+    from datamodel import ResultsAggregator as ra
+    _aggregate = ra.ResultsAggregator()
+    _aggregate.load_file(path, filetype="xml")
+    return _aggregate
+
+
+def peak_rss_mb():
+    _rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes everywhere else
+    return _rss / (1024 * 1024) if sys.platform == "darwin" else _rss / 1024
+
+
+def measure(mode, path):
+    _start = time.perf_counter()
+    _aggregate = run_stream(path) if mode == "stream" else run_untangle(path)
+    _elapsed = time.perf_counter() - _start
+    _total = _aggregate.get_counts()[0]
+    print(json.dumps({"mode": mode, "seconds": _elapsed, "peak_rss_mb": peak_rss_mb(), "cases": _total}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming vs untangle JUnit XML ingestion.")
+    parser.add_argument('--size-mb', type=int, default=500, help="Size of the synthetic results file to generate.")
+    parser.add_argument('--input', help="Benchmark an existing results file instead of generating one.")
+    parser.add_argument('--modes', nargs='+', default=["stream", "untangle"], choices=["stream", "untangle"])
+    parser.add_argument('--mode', choices=["stream", "untangle"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        measure(args.mode, args.input)
+        exit(0)
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        _path = args.input
+        if _path is None:
+            _path = os.path.join(_tmp, "synthetic.xml")
+            print(f"Generating a {args.size_mb} MB synthetic results file in {_path}", file=sys.stderr)
+            generate_results_file(_path, args.size_mb)
+        print(f"{'mode':<10}{'cases':>10}{'seconds':>12}{'peak RSS (MB)':>16}")
+        for _mode in args.modes:
+            _out = subprocess.run([sys.executable, __file__, "--mode", _mode, "--input", _path], capture_output=True, text=True)
+            if _out.returncode != 0:
+                print(f"{_mode:<10}{'failed':>10}  {_out.stderr.strip().splitlines()[-1] if _out.stderr.strip() else ''}")
+                continue
+            _result = json.loads(_out.stdout.strip().splitlines()[-1])
+            print(f"{_mode:<10}{_result['cases']:>10}{_result['seconds']:>12.2f}{_result['peak_rss_mb']:>16.1f}")
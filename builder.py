@@ -8,6 +8,7 @@ import pymysql
 import pandas as pd
 import numpy as np
 from pandas import json_normalize
+from datamodel import CompactResults
 
 
 c = None
@@ -42,8 +43,7 @@ def populate_db(json_file):
     c.execute("CREATE TABLE IF NOT EXISTS squad_tests (id text, time datetime, acm_release varchar(10), verification_level text, \
         `squad(s)` varchar(50), testsuite varchar(200), passes int, fails int, skips int, ignored int, severity text, priority text, \
         hub_platform varchar(10), hub_version varchar(10), stage varchar(20), branch varchar(20), issue_url text)")
-    data = json_file.read()
-    d = json.loads(data)
+    d = read_report(json_file)
     date_time_str= re.findall("\D-([0-9].*)", d['snapshot'])[0]
     date_time_obj = datetime.datetime.strptime(date_time_str, '%Y-%m-%d-%H-%M-%S')
     release = re.findall("([0-9].*)-\D", d['snapshot'])[0]
@@ -65,6 +65,22 @@ def populate_db(json_file):
         add_tests_to_db(d, date_time_obj, release, d['verification_level'])
     conn.commit()
 
+#read a report written by `reporter.py js` in any of its formats (json, ndjson, or compact) into the json format's dict
+def read_report(json_file):
+    data = json_file.read()
+    if re.match(r'\{\s*"summary"\s*:', data.rstrip().rsplit("\n", 1)[-1].lstrip()):
+        # ndjson - a line per result, then the summary record (the only line, if there were no results)
+        lines = [json.loads(line) for line in data.splitlines() if line.strip()]
+        d = lines.pop()['summary']
+        d['results'] = lines
+        return d
+    d = json.loads(data)
+    if d.get('format') == CompactResults.CompactResults.format_name:
+        strings = d.pop('strings')
+        d['results'] = [CompactResults.CompactResults.decode(row, strings) for row in d['results']]
+        del d['format'], d['format_version']
+    return d
+
 #function to read in json to database
 def add_snapshot_to_db(json_data, date, release, verification_level):
     c.execute("INSERT into snapshots values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
@@ -0,0 +1,123 @@
+"""CompactResults
+
+The dictionary-encoded ("compact") variant of the JSON reports JsonGenerator writes.  Archived reports are mostly the same
+few testsuite names, squads, severities, priorities, file names, and states repeated for every result, so a compact
+report lists each of those strings once in a "strings" table and writes every result as a row of its fields in a fixed
+order, with those fields as indexes into the table:
+    [name, state, testsuite, message, filename, priority, severity, [squads]]
+A field a result doesn't have is written as null, and any other metadata follows as a trailing object.  The report's
+other members (counts, coverage, snapshot details, ...) are written as in a plain JSON report.  Compact reports are
+loaded like any other results file - the ResultsAggregator registers this module's loader - streaming rows out of the
+file one at a time, since the string table is written before the results.
+"""
+
+import json, re
+from datamodel import JsonStreamReader
+
+class CompactResults():
+
+    # Written as the report's "format" member, which compact reports open with
+    format_name = "compact"
+    # Bump when the row layout changes - reports written with another version are rejected rather than misread
+    format_version = 1
+
+    # Result fields in the order they're written in each row, and the ones written as indexes into the string table (a list
+    # field, ex. squads, is written as a list of indexes)
+    fields = ["name", "state", "testsuite", "message", "filename", "priority", "severity", "squad(s)"]
+    encoded_fields = ["state", "testsuite", "filename", "priority", "severity", "squad(s)"]
+
+    # Result states - these mirror the state strings used by the ResultsAggregator
+    failed = "failed"
+
+    # Fields held by the result dict itself rather than its metadata
+    __result_fields = ("name", "state", "testsuite")
+
+    __report_start = re.compile(r'\{\s*"format"\s*:\s*"compact"')
+
+
+    def build_strings(results):
+        """Return the string table for a compact report of results, as a dict of string to index in order of first use.
+
+        Required Arguments:
+        results --  an iterable of result dicts, as returned by ResultsAggregator.iter_results()
+        """
+        _strings = {}
+        for _result in results:
+            for _field in CompactResults.encoded_fields:
+                _value = CompactResults.__get_field(_result, _field)
+                for _string in (_value if isinstance(_value, list) else [_value] if _value is not None else []):
+                    _strings.setdefault(_string, len(_strings))
+        return _strings
+
+
+    def encode(result, strings):
+        """Return the row a result is written as in a compact report.
+
+        Required Arguments:
+        result  --  a result dict with its message resolved, ex. from ResultsAggregator.iter_raw_results()
+        strings --  the report's string table, from build_strings()
+        """
+        _row = []
+        for _field in CompactResults.fields:
+            _value = CompactResults.__get_field(result, _field)
+            if _field in CompactResults.encoded_fields and _value is not None:
+                _value = [strings[s] for s in _value] if isinstance(_value, list) else strings[_value]
+            _row.append(_value)
+        _extra = {k: v for k, v in result['metadata'].items() if k not in CompactResults.fields}
+        if _extra:
+            _row.append(_extra)
+        return _row
+
+
+    def decode(row, strings):
+        """Return the result dict a compact report's row was encoded from.
+
+        Required Arguments:
+        row     --  a row of a compact report's "results"
+        strings --  the report's "strings" list
+        """
+        _result = {}
+        _metadata = {}
+        for _field, _value in zip(CompactResults.fields, row):
+            if _field in CompactResults.encoded_fields and _value is not None:
+                _value = [strings[s] for s in _value] if isinstance(_value, list) else strings[_value]
+            if _field in CompactResults.__result_fields:
+                _result[_field] = _value
+            elif _value is not None:
+                _metadata[_field] = _value
+        if len(row) > len(CompactResults.fields):
+            _metadata.update(row[len(CompactResults.fields)])
+        _result['metadata'] = _metadata
+        return _result
+
+
+    def __get_field(result, field):
+        # A row field's value - name, state, and testsuite are members of the result, the rest are metadata
+        return result[field] if field in CompactResults.__result_fields else result['metadata'].get(field)
+
+
+    def sniff(text):
+        """Sniffer for compact JSON reports - an object opening with "format": "compact"."""
+        return CompactResults.__report_start.match(text) is not None
+
+
+    def load(aggregator, stream, filename):
+        """Loader for compact JSON reports - registered with the LoaderRegistry as "compact".  Like plain JSON reports,
+        results are inserted as they were reported, so results the report's ignorelist ignored stay ignored.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert results into
+        stream      --  a binary stream of a compact JSON report
+        filename    --  the name of the file the stream was opened from
+        """
+        _reader = JsonStreamReader.JsonStreamReader(stream)
+        try:
+            for _row in _reader.iter_items("results"):
+                # The format and string table precede the results, so they've been read by the time the first row is
+                if _reader.members.get("format_version") != CompactResults.format_version:
+                    raise ValueError(f"compact report format version {_reader.members.get('format_version')} is not supported (expected {CompactResults.format_version})")
+                _result = CompactResults.decode(_row, _reader.members['strings'])
+                aggregator.insert_result(_result['testsuite'], _result['state'], _result['name'], _result['metadata'])
+        except (ValueError, KeyError, TypeError, IndexError) as ex: # not JSON, or not a compact report
+            print(f"{filename} could not be loaded as a compact JSON report: {ex!r}")
+            aggregator.insert_result(f"{filename}", CompactResults.failed, f"Load {filename}", {"message": f"{filename} not in compact JSON report format ({ex!r}).  Marking as a failure."})
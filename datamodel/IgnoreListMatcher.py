@@ -0,0 +1,161 @@
+"""IgnoreListMatcher
+
+Decides which failing test cases an ignorelist covers.  The ignorelist is compiled once up front so that the cost of a
+lookup doesn't grow with the number of entries: exact names go into hash tables, and glob and regex entries are bucketed
+by their literal prefix (ex. "Search: " for the glob "Search: *") with each bucket folded into one combined regular
+expression.  A lookup probes one bucket per distinct prefix length and only runs the regexes of the buckets its name
+starts with.  Patterns without a literal prefix (ex. starting with a wildcard or a group) all share the empty prefix's
+bucket, so those are best kept few.
+
+Ignorelist entries are dicts with a "name" plus optional keys:
+    "match"     --  how "name" is compared to test case names: "exact" (the default), "glob" (fnmatch-style wildcards),
+                    or "regex" (a Python regular expression that must match the whole name - use named rather than numbered
+                    groups for backreferences)
+    "testsuite" --  only ignore test cases in the testsuite with exactly this name
+Any other keys (ex. "squad" and "owner") are carried along untouched.  Each entry counts the failures it matched, so that
+entries which no longer match anything can be found and pruned.
+"""
+
+import fnmatch, re, sys
+
+class IgnoreListMatcher():
+
+    exact = "exact"
+    glob = "glob"
+    regex = "regex"
+
+    # Leading literal text of a glob, and of a regex - characters up to the first wildcard or regex metacharacter
+    __glob_literal = re.compile(r"[^*?\[]*")
+    __regex_literal = re.compile(r"[^.^$*+?{}\[\]\\|()]*")
+    # (key, compiled tables) of the most recently compiled ignorelist
+    __last_compiled = None
+
+    def __init__(self, ignorelist=[]):
+        """Compile an ignorelist.  Entries with an unknown "match" type or an invalid regex are reported and skipped.
+
+        Keyword Arguments:
+        ignorelist  --  a list of ignorelist entry dicts, see above
+        """
+        self.ignorelist = ignorelist
+        self.__hits = [0] * len(ignorelist)
+        # Aggregates are often built many times over in one process with the same ignorelist (ex. one per results file
+        # when loading in parallel), so the last ignorelist's compiled tables are reused rather than rebuilt
+        _key = tuple((e.get('name'), e.get("match", IgnoreListMatcher.exact), e.get("testsuite")) for e in ignorelist)
+        if IgnoreListMatcher.__last_compiled is None or IgnoreListMatcher.__last_compiled[0] != _key:
+            IgnoreListMatcher.__last_compiled = (_key, IgnoreListMatcher.__compile(ignorelist))
+        self.__names, self.__scoped_names, self.__patterns = IgnoreListMatcher.__last_compiled[1]
+        self.__unscoped_patterns = self.__patterns.get(None)
+
+
+    def __compile(ignorelist):
+        # name -> entry index, and (testsuite, name) -> entry index, for exact entries - the first entry listed wins
+        _names = {}
+        _scoped_names = {}
+        # testsuite (None when unscoped) -> literal prefix -> list of (entry index, regex source, compiled regex) for glob
+        # and regex entries
+        _patterns = {}
+        for _i, _entry in enumerate(ignorelist):
+            _type = _entry.get("match", IgnoreListMatcher.exact)
+            _testsuite = _entry.get("testsuite")
+            if _type == IgnoreListMatcher.exact:
+                if _testsuite is None:
+                    _names.setdefault(_entry['name'], _i)
+                else:
+                    _scoped_names.setdefault((_testsuite, _entry['name']), _i)
+            elif _type in (IgnoreListMatcher.glob, IgnoreListMatcher.regex):
+                if _type == IgnoreListMatcher.glob:
+                    _source = fnmatch.translate(_entry['name'])
+                    _prefix = IgnoreListMatcher.__glob_literal.match(_entry['name']).group()
+                else:
+                    _source = _entry['name']
+                    _prefix = IgnoreListMatcher.__regex_prefix(_source)
+                try:
+                    # Compiled wrapped, as it will be combined - ex. global inline flags like (?i) are only valid at the very start
+                    _compiled = re.compile(f"({_source})")
+                except re.error as ex:
+                    print(f"Ignorelist entry {_entry['name']!r} is not a valid regular expression ({ex}), skipping it.", file=sys.stderr)
+                    continue
+                _patterns.setdefault(_testsuite, {}).setdefault(_prefix, []).append((_i, _source, _compiled))
+            else:
+                print(f"Ignorelist entry {_entry['name']!r} has unknown match type {_type!r}, skipping it.", file=sys.stderr)
+        # testsuite (None when unscoped) -> (prefix lengths, longest first, and prefix -> list of (regex, capturing group
+        # number -> entry index) pairs)
+        _patterns = {t: (sorted(set(map(len, p)), reverse=True), {_prefix: IgnoreListMatcher.__combine(_bucket) for _prefix, _bucket in p.items()})
+            for t, p in _patterns.items()}
+        return _names, _scoped_names, _patterns
+
+
+    def match(self, testsuite, name):
+        """Return the ignorelist entry covering a test case and count the hit, or None if no entry covers it.  Exact entries
+        are checked before patterns, testsuite-scoped entries before unscoped ones, and patterns with longer literal prefixes
+        before shorter ones.
+
+        Required Arguments:
+        testsuite   --  name of the test case's testsuite
+        name        --  name of the test case
+        """
+        _i = self.__scoped_names.get((testsuite, name)) if self.__scoped_names else None
+        if _i is None:
+            _i = self.__names.get(name)
+        if _i is None and self.__patterns:
+            _i = IgnoreListMatcher.__match_pattern(self.__patterns.get(testsuite) if testsuite is not None else None, name)
+            if _i is None:
+                _i = IgnoreListMatcher.__match_pattern(self.__unscoped_patterns, name)
+        if _i is None:
+            return None
+        self.__hits[_i] += 1
+        return self.ignorelist[_i]
+
+
+    def get_hits(self):
+        """Return a copy of every ignorelist entry with a "hits" key counting the failures it matched, in ignorelist order."""
+        return [{**_entry, "hits": _hits} for _entry, _hits in zip(self.ignorelist, self.__hits)]
+
+
+    def __combine(patterns):
+        # One alternation over every pattern, each wrapped in a capturing group.  The wrapper is the outermost group of
+        # its branch, so it's always the last group to close on a match and Match.lastindex identifies the branch.
+        # Patterns that can't share one regex (ex. two reusing a group name) fall back to a regex each.
+        if len(patterns) == 1:
+            return [(patterns[0][2], {1: patterns[0][0]})]
+        try:
+            _regex = re.compile("|".join(f"({_source})" for _i, _source, _compiled in patterns))
+        except re.error:
+            return [(_compiled, {1: _i}) for _i, _source, _compiled in patterns]
+        _entries = {}
+        _group = 1
+        for _i, _source, _compiled in patterns:
+            _entries[_group] = _i
+            _group += _compiled.groups
+        return [(_regex, _entries)]
+
+
+    def __match_pattern(compiled, name):
+        if compiled is None:
+            return None
+        _lengths, _buckets = compiled
+        for _length in _lengths:
+            _bucket = _buckets.get(name[:_length]) if _length <= len(name) else None
+            if _bucket is None:
+                continue
+            for _regex, _entries in _bucket:
+                _match = _regex.fullmatch(name)
+                if _match is not None:
+                    return _entries[_match.lastindex]
+        return None
+
+
+    def __regex_prefix(source):
+        # The literal text every match of source starts with.  An alternation could make it optional, so rather than
+        # parse the pattern any regex containing "|" is given no prefix at all.
+        if "|" in source:
+            return ""
+        _prefix = IgnoreListMatcher.__regex_literal.match(source).group()
+        # A quantifier applies to the last literal character, ex. "ab*" only guarantees "a"
+        if _prefix and source[len(_prefix):len(_prefix) + 1] in ("*", "+", "?", "{"):
+            _prefix = _prefix[:-1]
+        return _prefix
+
+
+    def __len__(self):
+        return len(self.ignorelist)
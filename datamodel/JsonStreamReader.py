@@ -0,0 +1,164 @@
+"""JsonStreamReader
+
+Incrementally reads a large JSON document whose bulk is a single array, such as the "results" list of a JsonGenerator
+report.  The stream is decoded in fixed-size chunks and each array element is handed out as soon as it has been read in
+full, so only one element (plus a chunk of look-ahead) is held in memory at a time no matter how large the document is.
+The document's other top-level members - counts, coverage, snapshot details and the like - are decoded whole and kept in
+members.  Documents made up of an array of objects that each hold such an array, such as Ginkgo's JSON reports, can be
+streamed object by object too.  Elements and members are decoded with the standard json module, so values round-trip
+exactly as json.loads would read them.
+"""
+
+import codecs, json, re
+
+class JsonStreamReader():
+
+    # Number of bytes decoded per read
+    read_size = 64 * 1024
+
+    __whitespace = re.compile(r"[ \t\n\r]*")
+
+    def __init__(self, stream):
+        """Create a JsonStreamReader over a binary stream of UTF-8 JSON (with or without a byte order mark).
+
+        Required Arguments:
+        stream -- a file-like object opened in binary mode
+        """
+        self.stream = stream
+        # Top-level members other than the streamed array, filled in as they're read
+        self.members = {}
+        self.__decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.__json = json.JSONDecoder()
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+
+
+    def iter_items(self, key):
+        """Yield the elements of the array under key in the top-level object, or of the top-level array itself.  Raises a
+        ValueError if the document isn't well-formed JSON.
+
+        Required Arguments:
+        key -- name of the top-level member holding the array to stream, ex. "results"
+        """
+        if self.__peek() == "[":
+            yield from self.__iter_array()
+        else:
+            yield from self.__iter_object(key, self.members)
+        self.__expect_end()
+
+
+    def iter_objects(self, key):
+        """Yield a (members, items) pair for each object in a top-level array of objects, where items iterates over the
+        elements of the array under key in that object and members is a dict of the object's other members.  members only
+        holds the members that precede key until items has been exhausted - read items before moving on to the next object
+        (any elements left unread are skipped).  Raises a ValueError if the document isn't well-formed JSON or the array
+        holds anything other than objects.
+
+        Required Arguments:
+        key -- name of the member of each object holding the array to stream, ex. "SpecReports"
+        """
+        self.__expect("[")
+        if self.__peek() == "]":
+            self.__pos += 1
+        else:
+            while True:
+                _members = {}
+                _items = self.__iter_object(key, _members)
+                yield _members, _items
+                for _item in _items:
+                    pass
+                if self.__peek() == ",":
+                    self.__pos += 1
+                    continue
+                self.__expect("]")
+                break
+        self.__expect_end()
+
+
+    def __iter_object(self, key, members):
+        # Yield the elements of the array under key in the object at the current position, decoding its other members into members
+        self.__expect("{")
+        if self.__peek() == "}":
+            self.__pos += 1
+            return
+        while True:
+            _name = self.__value()
+            if not isinstance(_name, str):
+                raise ValueError(f"Expected an object key at character {self.__pos}, found {_name!r}")
+            self.__expect(":")
+            if _name == key and self.__peek() == "[":
+                yield from self.__iter_array()
+            else:
+                members[_name] = self.__value()
+            if self.__peek() == ",":
+                self.__pos += 1
+                continue
+            self.__expect("}")
+            return
+
+
+    def __expect_end(self):
+        if self.__peek() != "":
+            raise ValueError(f"Extra data after the JSON document at character {self.__pos}")
+
+
+    def __iter_array(self):
+        self.__expect("[")
+        if self.__peek() == "]":
+            self.__pos += 1
+            return
+        while True:
+            yield self.__value()
+            if self.__peek() == ",":
+                self.__pos += 1
+                continue
+            self.__expect("]")
+            return
+
+
+    def __value(self):
+        # Decode the next value, reading further ahead until it's complete.  A value is only complete once something
+        # follows it (or the stream has ended) - otherwise ex. a number split across two chunks would be cut short.
+        self.__peek()
+        while True:
+            try:
+                _value, _end = self.__json.raw_decode(self.__buffer, self.__pos)
+                if _end < len(self.__buffer) or self.__eof:
+                    self.__pos = _end
+                    return _value
+            except json.JSONDecodeError:
+                if self.__eof:
+                    raise
+            # Read at least as much again as is already buffered, so a huge value is re-scanned a logarithmic number of times
+            self.__fill(max(JsonStreamReader.read_size, len(self.__buffer) - self.__pos))
+
+
+    def __peek(self):
+        # Skip whitespace and return the next character without consuming it, or "" at the end of the stream
+        while True:
+            self.__pos = JsonStreamReader.__whitespace.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill(JsonStreamReader.read_size):
+                return ""
+
+
+    def __expect(self, char):
+        _next = self.__peek()
+        if _next != char:
+            raise ValueError(f"Expected {char!r} at character {self.__pos}, found {_next!r}" if _next else f"Expected {char!r}, found the end of the document")
+        self.__pos += 1
+
+
+    def __fill(self, size):
+        # Append up to size more bytes of decoded text to the buffer, dropping what's already been consumed
+        if self.__eof:
+            return False
+        _chunk = self.stream.read(size)
+        self.__buffer = self.__buffer[self.__pos:] + self.__decoder.decode(_chunk, final=not _chunk)
+        self.__pos = 0
+        if not _chunk:
+            self.__eof = True
+            return False
+        return True
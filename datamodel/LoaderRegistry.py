@@ -0,0 +1,111 @@
+"""LoaderRegistry
+
+Maps results file formats to the loaders that ingest them.  ResultsAggregator.load_file reads the first few KB of a file,
+asks the registry which format it is, and hands the open stream to that format's loader - so every file is opened once,
+read-only, and parsed once.
+
+New formats register a loader here rather than in the ResultsAggregator.  Any module dropped into datamodel/loaders/ is
+imported the first time the registry is consulted, so a loader module only needs to call LoaderRegistry.register() at
+import time to be picked up.
+"""
+
+import codecs, importlib, os, re
+
+class LoaderRegistry():
+
+    # Number of bytes read from the start of a file to determine its format
+    sniff_size = 8 * 1024
+
+    # Package (relative to the repo root) holding pluggable loader modules
+    plugin_package = "datamodel.loaders"
+
+    # Registered formats as (name, sniffer, loader, binary) tuples, in the order they're consulted
+    loaders = []
+
+    # Set once plugin loaders have been imported
+    plugins_loaded = False
+
+
+    def register(name, sniffer, loader, binary=False):
+        """Register a loader for a results format.  Formats registered later are consulted first, so a specific format
+        (ex. a JSON dialect) can claim files ahead of the generic XML/JSON loaders.  Re-registering a name replaces it.
+
+        Required Arguments:
+        name    --  the format name, ex. "xml" - also accepted as the filetype argument of ResultsAggregator.load_file
+        sniffer --  a callable taking the decoded, whitespace-stripped start of a file and returning True if it's this format
+        loader  --  a callable taking (aggregator, stream, filename) that inserts the results read from the binary stream
+
+        Keyword Arguments:
+        binary  --  if True, the sniffer is passed the raw bytes at the start of the file instead of decoded text, ex. for archives
+        """
+        LoaderRegistry.unregister(name)
+        LoaderRegistry.loaders.insert(0, (name, sniffer, loader, binary))
+
+
+    def unregister(name):
+        """Remove the loader registered under name, if there is one."""
+        LoaderRegistry.loaders = [l for l in LoaderRegistry.loaders if l[0] != name]
+
+
+    def get_loader(name):
+        """Return the loader registered under name, or None if no such format is registered."""
+        LoaderRegistry.load_plugins()
+        for _name, _sniffer, _loader, _binary in LoaderRegistry.loaders:
+            if _name == name:
+                return _loader
+        return None
+
+
+    def sniff(head):
+        """Return the name of the first registered format that claims the given bytes, or None if none do.
+
+        Required Arguments:
+        head -- the first LoaderRegistry.sniff_size (or fewer) bytes of a file
+        """
+        LoaderRegistry.load_plugins()
+        _text = LoaderRegistry.decode_head(head)
+        for _name, _sniffer, _loader, _binary in LoaderRegistry.loaders:
+            if _sniffer(head if _binary else _text):
+                return _name
+        return None
+
+
+    def decode_head(head):
+        """Decode the start of a file for sniffing, honouring any byte order mark and dropping leading whitespace."""
+        if head.startswith(codecs.BOM_UTF8):
+            return head[len(codecs.BOM_UTF8):].decode("utf-8", errors="ignore").lstrip()
+        if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+            return head.decode("utf-16", errors="ignore").lstrip()
+        return head.decode("utf-8", errors="ignore").lstrip()
+
+
+    def load_plugins():
+        """Import every module in the loaders plugin package so that they can register themselves.  Only runs once."""
+        if LoaderRegistry.plugins_loaded:
+            return
+        LoaderRegistry.plugins_loaded = True
+        _plugin_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loaders")
+        if not os.path.isdir(_plugin_dir):
+            return
+        for _module in sorted(os.listdir(_plugin_dir)):
+            if _module.endswith(".py") and _module != "__init__.py":
+                importlib.import_module(f"{LoaderRegistry.plugin_package}.{_module[:-3]}")
+
+
+    def sniff_xml(text):
+        """Sniffer for XML documents - anything opening with a tag, declaration, or comment."""
+        return text.startswith("<")
+
+
+    def sniff_json(text):
+        """Sniffer for JSON documents - anything opening with an object or array."""
+        return text.startswith("{") or text.startswith("[")
+
+
+    __ndjson_start = re.compile(r'\{\s*("name"\s*:\s*"(?:[^"\\\n]|\\.)*"\s*,\s*"state"\s*:\s*"[^"\n]*"\s*,\s*"testsuite"\s*:|"summary"\s*:\s*\{)')
+
+
+    def sniff_ndjson(text):
+        """Sniffer for NDJSON results written by JsonGenerator - a line per result object, opening with its name, state, and
+        testsuite in that order, or just the summary record if there are no results."""
+        return LoaderRegistry.__ndjson_start.match(text) is not None
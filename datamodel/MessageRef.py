@@ -0,0 +1,65 @@
+"""MessageRef
+
+A reference to a failure message that still lives in its results file.  In lazy message mode the ResultsAggregator stores
+one of these in place of each failure's text - just the file path and the byte range of its <failure> element - and the
+text is read back and parsed only when a report actually renders it.  The results file must not change between loading
+and rendering.
+"""
+
+import mmap, xml.parsers.expat
+
+class MessageRef():
+
+    __slots__ = ("path", "start", "end", "encoding")
+
+    def __init__(self, path, start, end, encoding=None):
+        """Create a reference to the message in bytes [start, end) of path.
+
+        Required Arguments:
+        path    --  the results file holding the message
+        start   --  byte offset of the <failure> start tag
+        end     --  byte offset of the </failure> end tag, or just past the element for an empty <failure/>
+
+        Keyword Arguments:
+        encoding    --  the encoding declared by the results file, if it declared one
+        """
+        self.path = path
+        self.start = start
+        self.end = end
+        self.encoding = encoding
+
+
+    def __getstate__(self):
+        return (self.path, self.start, self.end, self.encoding)
+
+
+    def __setstate__(self, state):
+        self.path, self.start, self.end, self.encoding = state
+
+
+    def __repr__(self):
+        return f"MessageRef({self.path!r}, {self.start}, {self.end})"
+
+
+    def load(self):
+        """Read and return the referenced message text.  The text isn't kept, so each call re-reads it from the file."""
+        if self.end <= self.start:
+            return ""
+        with open(self.path, "rb") as _f:
+            try:
+                with mmap.mmap(_f.fileno(), 0, access=mmap.ACCESS_READ) as _map:
+                    _fragment = _map[self.start:self.end]
+            except (ValueError, OSError): # empty or unmappable file, ex. on some network filesystems
+                _f.seek(self.start)
+                _fragment = _f.read(self.end - self.start)
+        # The fragment runs from the <failure> start tag up to its end tag - close it off and parse it on its own so that
+        # entities and CDATA sections are decoded just as they are for an eagerly loaded message
+        _parts = []
+        _parser = xml.parsers.expat.ParserCreate(self.encoding)
+        _parser.buffer_text = True
+        _parser.CharacterDataHandler = _parts.append
+        try:
+            _parser.Parse(_fragment + b"</failure>", True)
+        except xml.parsers.expat.ExpatError: # an empty <failure/> has no text, and no end tag to close
+            return ""
+        return "".join(_parts)
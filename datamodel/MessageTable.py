@@ -0,0 +1,54 @@
+"""MessageTable
+
+Stores each distinct failure message once.  When a shared dependency breaks, hundreds of test cases fail with the same
+text - the ResultsAggregator interns every message through this table so those results all reference a single copy, and
+identifies each distinct message by an id derived from a hash of its content so that reports can group results by it.
+"""
+
+import hashlib
+
+class MessageTable():
+
+    # Length of message ids, in hex digits of the content hash
+    id_length = 12
+
+    def __init__(self):
+        # message text -> id, and id -> the one stored copy of that text
+        self.__ids = {}
+        self.__messages = {}
+
+
+    def intern(self, message):
+        """Return the stored copy of message, adding it to the table if it's new.
+
+        Required Arguments:
+        message -- a message string
+        """
+        _id = self.__ids.get(message)
+        if _id is None:
+            _id = self.add(message)
+        return self.__messages[_id]
+
+
+    def add(self, message):
+        """Add message to the table if it isn't already there and return its id."""
+        _id = self.__ids.get(message)
+        if _id is None:
+            _id = hashlib.sha1(message.encode("utf-8", errors="surrogatepass")).hexdigest()[:MessageTable.id_length]
+            self.__ids[message] = _id
+            self.__messages[_id] = message
+        return _id
+
+
+    def get_id(self, message):
+        """Return the id of message, or None if it isn't in the table."""
+        return self.__ids.get(message)
+
+
+    def get(self, message_id):
+        """Return the message stored under message_id, or None if there isn't one."""
+        return self.__messages.get(message_id)
+
+
+    def __len__(self):
+        return len(self.__messages)
@@ -0,0 +1,136 @@
+"""ParseCache
+
+A persistent, content-addressed cache of parsed results files, shared between reporter.py invocations.
+Each entry holds the test cases a loader produced for one file, keyed by a hash of the file's contents, its name, and the
+parser version, and stored as zlib-compressed marshal data.  When the cache grows past its size bound, the least recently
+used entries are evicted first.  The cache is only an optimization: a cache directory that can't be created or written
+to (ex. a read-only home directory in a CI container) turns caching off or skips writes, rather than failing the load.
+"""
+
+import hashlib, marshal, os, sys, tempfile, zlib
+
+class ParseCache():
+
+    # Bump when the on-disk entry layout changes - entries written with another version are ignored
+    format_version = 1
+    magic = b"CRPC"
+    default_max_mb = 512
+    entry_suffix = ".bin"
+
+    def __init__(self, cache_dir, max_bytes=default_max_mb * 1024 * 1024):
+        """Create a ParseCache rooted at cache_dir, creating the directory if needed.  Raises an OSError if it can't be created.
+
+        Required Arguments:
+        cache_dir   --  directory to hold cache entries
+
+        Keyword Arguments:
+        max_bytes   --  total size that prune() trims the cache down to, evicting least recently used entries first
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+
+    def from_args(args):
+        """Return a ParseCache configured from the --cache-dir, --cache-size-mb, and --no-cache arguments, or None if caching
+        is off or the cache directory can't be created."""
+        if args.no_cache:
+            return None
+        try:
+            return ParseCache(args.cache_dir, max_bytes=int(args.cache_size_mb) * 1024 * 1024)
+        except OSError as ex:
+            print(f"Parse cache directory {args.cache_dir} is unavailable, continuing without a cache: {ex}", file=sys.stderr)
+            return None
+
+
+    def default_cache_dir():
+        """Return the cache directory from the CANARY_REPORTING_CACHE_DIR environment variable, or ~/.cache/canary-reporting."""
+        return os.getenv("CANARY_REPORTING_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "canary-reporting"))
+
+
+    def key(self, filename, parser_version, data=None):
+        """Return the cache key for a results file - a hash of its contents, its name, and the version of the parser reading it.
+
+        Required Arguments:
+        filename    --  path to the results file
+        parser_version  --  version of the loaders producing cache entries, so entries are invalidated when parsing changes
+
+        Keyword Arguments:
+        data        --  the file's contents if they've already been read, so the file isn't read again to hash it
+        """
+        # The file name is part of the key because loaders record it in each case's metadata
+        _hash = hashlib.sha256(f"{ParseCache.format_version}:{parser_version}:{marshal.version}:{filename}\0".encode())
+        if data is not None:
+            _hash.update(data)
+            return _hash.hexdigest()
+        with open(filename, "rb") as _f:
+            for _chunk in iter(lambda: _f.read(1024 * 1024), b""):
+                _hash.update(_chunk)
+        return _hash.hexdigest()
+
+
+    def get(self, key):
+        """Return the list of cached (testsuite, state, name, metadata) cases for key, or None on a cache miss."""
+        _path = self.__entry_path(key)
+        try:
+            with open(_path, "rb") as _f:
+                _data = _f.read()
+            if _data[:len(ParseCache.magic)] != ParseCache.magic or _data[len(ParseCache.magic)] != ParseCache.format_version:
+                return None
+            _cases = marshal.loads(zlib.decompress(_data[len(ParseCache.magic) + 1:]))
+            # Mark the entry as recently used for LRU eviction
+            os.utime(_path)
+        except (OSError, IndexError, EOFError, ValueError, TypeError, zlib.error):
+            return None
+        return _cases
+
+
+    def put(self, key, cases):
+        """Store a list of (testsuite, state, name, metadata) cases under key.  Entries are written atomically, and nothing is
+        stored if the cache directory can't be written to.
+
+        Required Arguments:
+        key     --  a key returned by ParseCache.key()
+        cases   --  the cases a loader produced for the keyed file
+        """
+        _data = ParseCache.magic + bytes([ParseCache.format_version]) + zlib.compress(marshal.dumps(cases), 1)
+        try:
+            _fd, _tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(_fd, "wb") as _f:
+                _f.write(_data)
+            os.replace(_tmp, self.__entry_path(key))
+        except OSError:
+            try:
+                os.remove(_tmp)
+            except OSError:
+                pass
+
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits within max_bytes.  Does nothing if the cache directory can't be listed."""
+        _entries = []
+        _total = 0
+        try:
+            with os.scandir(self.cache_dir) as _it:
+                for _entry in _it:
+                    if _entry.is_file() and _entry.name.endswith(ParseCache.entry_suffix):
+                        _stat = _entry.stat()
+                        _entries.append((_stat.st_mtime, _stat.st_size, _entry.path))
+                        _total += _stat.st_size
+        except OSError:
+            return
+        for _mtime, _size, _path in sorted(_entries):
+            if _total <= self.max_bytes:
+                break
+            try:
+                os.remove(_path)
+                _total -= _size
+            except OSError:
+                pass
+
+
+    def __entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ParseCache.entry_suffix)
@@ -0,0 +1,65 @@
+"""PrefetchReader
+
+Reads results files ahead of the parser.  When results are split over thousands of small files on a network filesystem,
+loading them one after another spends most of its time waiting on each open() and read() rather than parsing.  A
+PrefetchReader keeps a bounded number of reads in flight on a thread pool and hands out each file's contents in the
+order the files were given, so parsing stays serial and deterministic while the I/O for the next files overlaps it.
+Only the bytes of at most depth files are held ahead of the parser at once.
+"""
+
+import collections, concurrent.futures, os
+
+class PrefetchReader():
+
+    # Number of files read ahead of the parser
+    default_depth = 16
+    # Larger files aren't read ahead - they're opened and streamed by the loader as usual, so prefetching never holds
+    # large files (ex. results archives) in memory whole
+    default_max_file_bytes = 8 * 1024 * 1024
+
+    def __init__(self, files, depth=default_depth, max_file_bytes=default_max_file_bytes):
+        """Create a PrefetchReader over files.
+
+        Required Arguments:
+        files   --  a list of results file paths
+
+        Keyword Arguments:
+        depth           --  number of files read ahead of the parser, and threads reading them
+        max_file_bytes  --  files larger than this aren't read ahead
+        """
+        self.files = files
+        self.depth = depth
+        self.max_file_bytes = max_file_bytes
+
+
+    def read(self, filename):
+        """Return the contents of filename, or None if it's too large to read ahead or can't be read - the loader then opens
+        it itself, reporting any error the same way it would without prefetching."""
+        try:
+            with open(filename, "rb") as _f:
+                if os.fstat(_f.fileno()).st_size > self.max_file_bytes:
+                    return None
+                return _f.read()
+        except OSError:
+            return None
+
+
+    def __iter__(self):
+        """Yield (filename, contents or None) for each file, in order."""
+        _files = iter(self.files)
+        _pending = collections.deque()
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.depth)
+        try:
+            for _filename in _files:
+                _pending.append((_filename, _executor.submit(self.read, _filename)))
+                if len(_pending) >= self.depth:
+                    break
+            while _pending:
+                _filename, _future = _pending.popleft()
+                _next = next(_files, None)
+                if _next is not None:
+                    _pending.append((_next, _executor.submit(self.read, _next)))
+                yield _filename, _future.result()
+        finally:
+            # Stop reading ahead if the consumer stops early, ex. on a load error
+            _executor.shutdown(wait=False, cancel_futures=True)
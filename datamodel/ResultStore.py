@@ -0,0 +1,172 @@
+"""ResultStore
+
+An insertion-ordered store of ResultsAggregator result dicts, indexed on (testsuite, name) so that finding the existing
+entry for a test case is a constant-time dict lookup rather than a scan over every result loaded so far.
+
+Results are also indexed by state, squad, severity, and priority as they're added and updated, so that queries like "every
+failure" or "every failure for this squad" only touch the matching results rather than scanning the whole store.
+"""
+
+import collections
+
+class ResultStore():
+
+    # iter_query() streams over the name-sorted results instead of sorting a filtered copy once the matching index buckets
+    # hold more than 1 / iter_scan_ratio of all results - past that, scanning is cheaper than sorting the matches
+    iter_scan_ratio = 8
+
+    # Values indexed for results whose metadata doesn't carry squad/severity/priority tags - these mirror the defaults
+    # ResultsAggregator.get_case_metadata assigns untagged test cases
+    default_squad = "Unlabelled"
+    default_severity = "Severity 1 - Urgent"
+    default_priority = "Priority/P1"
+
+    def __init__(self):
+        # Results in the order they were first inserted
+        self.__results = []
+        # (testsuite, name) -> position of the result in self.__results
+        self.__index = {}
+        # Secondary indexes - value -> positions of the results that have (or had) that value.  Buckets are append-only:
+        # update() adds a result to the buckets of its new values and query() skips entries that no longer match, which
+        # keeps index upkeep on the insert path down to a few list appends.
+        self.__by_state = collections.defaultdict(list)
+        self.__by_squad = collections.defaultdict(list)
+        self.__by_severity = collections.defaultdict(list)
+        self.__by_priority = collections.defaultdict(list)
+        # Name-sorted copy of self.__results, built on demand and dropped whenever a new result is added
+        self.__sorted = None
+
+
+    def get(self, testsuite, name):
+        """Return the result dict for the given testsuite and test case name, or None if it hasn't been inserted."""
+        _position = self.__index.get((testsuite, name))
+        return self.__results[_position] if _position is not None else None
+
+
+    def add(self, result):
+        """Add a new result dict to the store.  Raises a ValueError if its (testsuite, name) pair is already present.
+
+        Required Arguments:
+        result -- a result dict containing at least "testsuite" and "name" keys
+        """
+        _key = (result['testsuite'], result['name'])
+        if _key in self.__index:
+            raise ValueError(f"More than one matching test case and test suite ")
+        _position = len(self.__results)
+        self.__index[_key] = _position
+        self.__results.append(result)
+        self.__add_to_indexes(_position, result)
+        self.__sorted = None
+
+
+    def update(self, result, state, metadata):
+        """Replace the state and metadata of a result already in the store, keeping the secondary indexes up to date.
+
+        Required Arguments:
+        result      --  a result dict returned by get()
+        state       --  the result's new state
+        metadata    --  the result's new metadata dict
+        """
+        result['state'] = state
+        result['metadata'] = metadata
+        self.__add_to_indexes(self.__index[(result['testsuite'], result['name'])], result)
+
+
+    def sorted(self):
+        """Return all results sorted by test case name.  Ties keep their insertion order."""
+        if self.__sorted is None:
+            self.__sorted = sorted(self.__results, key = lambda r: r['name'])
+        return self.__sorted
+
+
+    def query(self, states=None, squad=None, severity=None, priority=None):
+        """Return the results matching every given filter, in the same order as sorted().  Only the results in the smallest
+        matching index bucket are visited, so the cost is proportional to the number of matches rather than the store's size.
+
+        Keyword Arguments:
+        states      --  a list of states a result must be in
+        squad       --  a squad a result must be tagged with
+        severity    --  the severity a result must be tagged with
+        priority    --  the priority a result must be tagged with
+        """
+        _buckets = self.__smallest_buckets(states, squad, severity, priority)
+        if _buckets is None:
+            return self.sorted()
+        # A result that's been updated can appear in a bucket more than once, or in one it no longer matches
+        _positions = sorted(set(p for _bucket in _buckets for p in _bucket))
+        _results = [r for r in map(self.__results.__getitem__, _positions) if ResultStore.__matches(r, states, squad, severity, priority)]
+        # Sorting by name is stable, so ties stay in insertion order like sorted()
+        return sorted(_results, key = lambda r: r['name'])
+
+
+    def iter_query(self, states=None, squad=None, severity=None, priority=None):
+        """Return an iterator over the same results as query(), in the same order, without building a list of them where
+        it can be avoided - unfiltered and broad queries stream straight over the sorted results, and only narrow queries
+        (whose matches are cheap to copy) are answered from the indexes.  Takes the same arguments as query()."""
+        _buckets = self.__smallest_buckets(states, squad, severity, priority)
+        if _buckets is None:
+            return iter(self.sorted())
+        if sum(len(p) for p in _buckets) * ResultStore.iter_scan_ratio < len(self.__results):
+            return iter(self.query(states=states, squad=squad, severity=severity, priority=priority))
+        return (r for r in self.sorted() if ResultStore.__matches(r, states, squad, severity, priority))
+
+
+    def __smallest_buckets(self, states, squad, severity, priority):
+        # The index buckets of whichever filter matches the fewest results, or None if there are no filters
+        _candidates = []
+        if states is not None:
+            _candidates.append([self.__by_state.get(s, []) for s in set(states)])
+        if squad is not None:
+            _candidates.append([self.__by_squad.get(squad, [])])
+        if severity is not None:
+            _candidates.append([self.__by_severity.get(severity, [])])
+        if priority is not None:
+            _candidates.append([self.__by_priority.get(priority, [])])
+        if not _candidates:
+            return None
+        return min(_candidates, key=lambda b: sum(len(p) for p in b))
+
+
+    def __matches(result, states, squad, severity, priority):
+        return ((states is None or result['state'] in states)
+            and (squad is None or squad in ResultStore.squads_of(result))
+            and (severity is None or ResultStore.severity_of(result) == severity)
+            and (priority is None or ResultStore.priority_of(result) == priority))
+
+
+    def squads_of(result):
+        """Return the squads a result is tagged with."""
+        _squads = result['metadata'].get('squad(s)')
+        return _squads if _squads else [ResultStore.default_squad]
+
+
+    def severity_of(result):
+        """Return the severity a result is tagged with."""
+        return result['metadata'].get('severity', ResultStore.default_severity)
+
+
+    def priority_of(result):
+        """Return the priority a result is tagged with."""
+        return result['metadata'].get('priority', ResultStore.default_priority)
+
+
+    def __add_to_indexes(self, position, result):
+        # Runs for every inserted result, so the metadata lookups are inlined rather than going through squads_of() & co.
+        _metadata = result['metadata']
+        self.__by_state[result['state']].append(position)
+        _squads = _metadata.get('squad(s)')
+        if _squads:
+            for _squad in _squads:
+                self.__by_squad[_squad].append(position)
+        else:
+            self.__by_squad[ResultStore.default_squad].append(position)
+        self.__by_severity[_metadata.get('severity', ResultStore.default_severity)].append(position)
+        self.__by_priority[_metadata.get('priority', ResultStore.default_priority)].append(position)
+
+
+    def __iter__(self):
+        return iter(self.__results)
+
+
+    def __len__(self):
+        return len(self.__results)
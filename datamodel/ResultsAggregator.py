@@ -1,4 +1,5 @@
-import untangle, json, xml, os, re, itertools, typing
+import io, json, xml.parsers.expat, os, re, typing, concurrent.futures
+from datamodel import XmlLoader, JsonStreamReader, ResultStore, SqliteResultStore, IgnoreListMatcher, PrefetchReader, LoaderRegistry, MessageRef, MessageTable, ResultsArtifact, CompactResults
 
 class ResultsAggregator():
 
@@ -8,15 +9,35 @@ class ResultsAggregator():
     ignored = "ignored"
     total = "total"
 
-    def __init__(self, files=[], ignorelist=[]):
+    # Result store backends - results are kept in memory by default, or in a SQLite file for runs too large for memory
+    memory_store = "memory"
+    sqlite_store = "sqlite"
+
+    # Version of the loaders' output - bump whenever parsing changes so that ParseCache entries are invalidated
+    parser_version = 4
+
+    def __init__(self, files=[], ignorelist=[], jobs=1, cache=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth,
+        store=memory_store, store_dir=None):
         self.ignorelist = ignorelist
-        self.ignorelisted_names = [ iv['name'] for iv in self.ignorelist ]
-        # self.__results should only be modified in insert_results and should have
-        # self.__results_unsorted set when it is modified without being sorted
-        self.__results = []
-        # "dirty" flag for sorting - set when the dataset has been modified but not sorted
-        # We're doing "lazy" sorting - only sorting results when asked for raw output, for efficiency
-        self.__results_unsorted = False
+        # Optional ParseCache - when set, files whose parsed cases are already cached aren't parsed again
+        self.cache = cache
+        # In lazy message mode XML failure messages are kept as MessageRefs into their results file and only read back
+        # by get_message - read messages through get_message rather than from a result's metadata when this is on
+        self.lazy_messages = lazy_messages
+        # Compiled once so checking a failure against the ignorelist costs the same however many entries it has
+        self.ignorelist_matcher = IgnoreListMatcher.IgnoreListMatcher(self.ignorelist)
+        # self.__results should only be modified in insert_results - it indexes results on (testsuite, name) and
+        # does "lazy" sorting, only sorting results when asked for them, for efficiency
+        # With the SQLite store, result lists (get_results() & co.) are SqliteResultStore.ResultsViews that stream results
+        # out of the database as they're iterated, rather than lists
+        if store == ResultsAggregator.sqlite_store:
+            self.__results = SqliteResultStore.SqliteResultStore(directory=store_dir)
+        else:
+            self.__results = ResultStore.ResultStore()
+        # Every distinct failure message is stored once here, and results' metadata reference the stored copy.  Messages
+        # aren't interned with the SQLite store - that would keep every distinct message in memory.
+        self.__messages = MessageTable.MessageTable()
+        self.__intern_messages = store != ResultsAggregator.sqlite_store
         self.__counts = {
             f"{ResultsAggregator.total}": 0,
             f"{ResultsAggregator.failed}": 0,
@@ -24,26 +45,58 @@ class ResultsAggregator():
             f"{ResultsAggregator.skipped}": 0,
             f"{ResultsAggregator.ignored}": 0
         }
-        # coverage contains a live percentage coverage value for tests executed (percentage of total not-skipped)
+        # coverage contains a percentage coverage value for tests executed (percentage of total not-skipped)
         #   and tests passed (percentage of executed tests that passed)
         self.__coverage = {
             f"{ResultsAggregator.skipped}": 0,
             f"{ResultsAggregator.passed}": 0,
         }
-        for f in files:
-            self.load_file(f)
+        # "dirty" flag for coverage - set when counts change, coverage is only recomputed when it's read
+        self.__coverage_stale = False
+        if jobs != 1 and len(files) > 1:
+            self.__load_files_parallel(files, jobs)
+        elif prefetch > 0 and len(files) > 1:
+            # Files are still parsed serially and in order - only reading them is overlapped with parsing
+            for f, _data in PrefetchReader.PrefetchReader(files, depth=prefetch):
+                self.load_file(f, data=_data)
+        else:
+            for f in files:
+                self.load_file(f)
+        if cache is not None and len(files) > 0:
+            cache.prune()
 
 
     def get_raw_results(self):
-        self.__sort_results()
+        """Return a dict of every result (as a list, with lazily loaded messages read in), the coverage, and the counts.
+        The results are listed whichever store holds them - use iter_raw_results() to stream them out of the SQLite store."""
+        _results = self.__results.sorted()
+        if self.lazy_messages:
+            _results = [self.__with_message(r) for r in _results]
+        elif isinstance(_results, SqliteResultStore.ResultsView):
+            _results = list(_results)
         return {
-            "results": self.__results,
-            "coverage": self.__coverage,
+            "results": _results,
+            "coverage": self.get_coverage(),
             **self.__counts
         }
 
     
+    def iter_raw_results(self):
+        """Return the same dict as get_raw_results(), but with "results" as an iterator that reads results (and lazily
+        loaded messages) one at a time, so the raw results can be streamed out - ex. written as JSON - without building a
+        list of every result first.  The iterator can only be consumed once."""
+        _results = self.iter_results()
+        if self.lazy_messages:
+            _results = map(self.__with_message, _results)
+        return {
+            "results": _results,
+            "coverage": self.get_coverage(),
+            **self.__counts
+        }
+
+
     def get_status(self, executed_gate=100, passing_gate=100):
+        self.__refresh_coverage()
         if self.__coverage[ResultsAggregator.skipped] >= executed_gate and self.__coverage[ResultsAggregator.passed] >= passing_gate:
             return ResultsAggregator.passed
         return ResultsAggregator.failed
@@ -56,72 +109,145 @@ class ResultsAggregator():
         #     return ResultsAggregator.passed
 
     
-    def get_results(self):
-        self.__sort_results()
-        return self.__results
+    def get_results(self, states=None, squad=None, severity=None, priority=None):
+        """Return results sorted by test case name, optionally filtered.  Filters are answered from indexes kept up to date
+        as results are inserted, so ex. listing the failures costs O(failures) rather than O(results).
+
+        Keyword Arguments:
+        states      --  a list of states to include, ex. [ResultsAggregator.failed, ResultsAggregator.ignored] - all if None
+        squad       --  only include results tagged with this squad ("Unlabelled" for untagged results)
+        severity    --  only include results tagged with this severity
+        priority    --  only include results tagged with this priority
+        """
+        return self.__results.query(states=states, squad=squad, severity=severity, priority=priority)
+
+
+    def iter_results(self, states=None, squad=None, severity=None, priority=None):
+        """Return an iterator over the same results as get_results(), in the same order, without building a list of them
+        where it can be avoided.  Prefer this to get_results() when the results are only read once, in order.  Takes the
+        same arguments as get_results()."""
+        return self.__results.iter_query(states=states, squad=squad, severity=severity, priority=priority)
 
 
     def get_coverage(self):
+        self.__refresh_coverage()
         return self.__coverage
 
+
+    def get_message(self, result):
+        """Return the failure message of a result, reading it from its results file if it was loaded lazily.
+
+        Required Arguments:
+        result -- a result dict, as returned by get_results()
+        """
+        _message = result['metadata'].get('message', "")
+        if isinstance(_message, MessageRef.MessageRef):
+            return _message.load()
+        return _message
+
+
+    def get_message_groups(self, states=[failed, ignored]):
+        """Return results in the given states grouped by failure message, as a list of dicts with "id", "message", and
+        "results" keys.  Groups are ordered by their first result in get_results() order, as are the results in a group.
+
+        Keyword Arguments:
+        states -- the result states to group, failed and ignored results by default
+        """
+        _groups = {}
+        for _result in self.__results.query(states=states):
+            _message = self.get_message(_result)
+            _id = self.__messages.add(_message)
+            if _id not in _groups:
+                _groups[_id] = {"id": _id, "message": self.__messages.get(_id), "results": []}
+            _groups[_id]['results'].append(_result)
+        return list(_groups.values())
+
+
+    def __with_message(self, result):
+        # A shallow copy of result with its message resolved, leaving the stored result's reference in place
+        if not isinstance(result['metadata'].get('message'), MessageRef.MessageRef):
+            return result
+        return {**result, "metadata": {**result['metadata'], "message": self.get_message(result)}}
+
     
     def get_unique_tags_from_failures(self):
-        _failures = list(r['metadata'] for r in filter(lambda r: r['state'] == ResultsAggregator.failed, self.__results))
+        _failures = (r['metadata'] for r in self.__results.query(states=[ResultsAggregator.failed]))
         return self.get_unique_tags(results=_failures)
 
     
     def get_unique_tags(self, results=None):
-        results = self.__results if results is None else results
-        # Unravelling the below command:
-        #   We map the squad(s) lists from _failures to a single list of lists rather than dicts
-        #       handling non-existance elegantly
-        #   We then flatten the list of lists using itertools.chain
-        #   We then toss that into a set to ensure we only get unique items
-        #   Finally we translate that set into an iterable list of tags
-        _metadata = list(set(itertools.chain(*map(lambda r: r.get('squad(s)', "Unlabelled"), results))))
-        # Here's a more-maintainable backup if we need it later:
-        #   _metadata = set()
-        #   for r in _failures:
-        #      if "squad(s)" in r:
-        #          for s in r["squad(s)"]:
-        #              _metadata.add(s)
-        #   _metadata = list(_metadata)
-        _metadata = [f"squad:{s}" for s in _metadata]
-        _metadata = _metadata + list(set(map(lambda r: r.get('severity', "Severity 1 - Urgent"), results)))
-        _metadata = _metadata + list(set(map(lambda r: r.get('priority', "Priority/P1"), results)))
-        return _metadata
+        results = (r['metadata'] for r in self.__results) if results is None else results
+        # Collect the unique squads, severities, and priorities in a single pass, so results can be streamed (ex. out of
+        # the SQLite store) rather than held in a list
+        _squads = set()
+        _severities = set()
+        _priorities = set()
+        for r in results:
+            _squads.update(r.get('squad(s)', "Unlabelled"))
+            _severities.add(r.get('severity', "Severity 1 - Urgent"))
+            _priorities.add(r.get('priority', "Priority/P1"))
+        return [f"squad:{s}" for s in _squads] + list(_severities) + list(_priorities)
 
 
     def get_counts(self) -> typing.Dict[str, str]:
         return self.__counts[ResultsAggregator.total], self.__counts[ResultsAggregator.passed], self.__counts[ResultsAggregator.failed], self.__counts[ResultsAggregator.skipped], self.__counts[ResultsAggregator.ignored]
 
 
+    def get_ignorelist_hits(self):
+        """Return every ignorelist entry with a "hits" key counting the failures it ignored - entries with no hits no longer
+        match any failing test and can be pruned."""
+        return self.ignorelist_matcher.get_hits()
+
+
     def insert_result(self, testsuite, state, name, metadata):
-        _int_state = state if not (name in self.ignorelisted_names and state == ResultsAggregator.failed) else ResultsAggregator.ignored
-        _matching_results = list(filter(lambda d: d['name'] == name and d['testsuite'] == testsuite, self.__results))
-        if len(_matching_results) == 0:
-            self.__results.append({
+        """Add a result to the aggregate, or fold it into the result already recorded for its (testsuite, name).
+
+        A duplicate counts once toward the total - a failing duplicate replaces a passing or skipped result, moving it to
+        the failed (or ignored) count and bringing its metadata along, and any other duplicate is dropped.
+
+        Required Arguments:
+        testsuite   --  the name of the result's testsuite
+        state       --  the result's state, ex. ResultsAggregator.failed
+        name        --  the name of the test
+        metadata    --  a dict of the result's message, file name, squads, ...  It isn't modified - a message to be interned
+                        is interned into a copy.
+        """
+        if self.__intern_messages and isinstance(metadata.get('message'), str):
+            metadata = {**metadata, "message": self.__messages.intern(metadata['message'])}
+        _int_state = state
+        # Already-ignored results (ex. merged from a partial aggregate) are matched again too, so their hits are counted here
+        if ((state == ResultsAggregator.failed or state == ResultsAggregator.ignored)
+            and self.ignorelist and self.ignorelist_matcher.match(testsuite, name) is not None):
+            _int_state = ResultsAggregator.ignored
+        _matching_result = self.__results.get(testsuite, name)
+        if _matching_result is None:
+            self.__results.add({
                 "name": name,
                 "state": _int_state,
                 "testsuite": testsuite,
                 "metadata": metadata
             })
             self.__update_counts(_int_state)
-            self.__results_unsorted = True
-        elif len(_matching_results) == 1:
-            if _int_state == ResultsAggregator.failed or _int_state == ResultsAggregator.ignored:
-                self.__update_counts(_int_state, _matching_results[0]['state'])
-                _matching_results[0]['state'] = ResultsAggregator.failed
-        else:
-            raise ValueError(f"More than one matching test case and test suite ")
+        elif ((_int_state == ResultsAggregator.failed or _int_state == ResultsAggregator.ignored)
+            and _matching_result['state'] != _int_state):
+            # Any failure wins - a duplicate failing run replaces a passing/skipped one, bringing its failure details along
+            self.__update_counts(_int_state, _matching_result['state'])
+            self.__results.update(_matching_result, _int_state, metadata)
 
 
     def __update_counts(self, newstate, oldstate=None):
-        # Iterate counts for pass/fail/skipped/total as needed
+        # Iterate counts for pass/fail/skipped/total as needed, moving a result between states if it already existed
         self.__counts[newstate] = self.__counts[newstate] + 1
         if oldstate is not None:
             self.__counts[oldstate] = self.__counts[oldstate] - 1
-        self.__counts[ResultsAggregator.total] = self.__counts[ResultsAggregator.total] + 1
+        else:
+            self.__counts[ResultsAggregator.total] = self.__counts[ResultsAggregator.total] + 1
+        self.__coverage_stale = True
+
+
+    def __refresh_coverage(self):
+        if not self.__coverage_stale:
+            return
         # Update code fail/pass percentage, marking as 0% if 0 tests total ran
         if (self.__counts[ResultsAggregator.total] - self.__counts[ResultsAggregator.skipped]) > 0:
             self.__coverage[ResultsAggregator.passed] = ((self.__counts[ResultsAggregator.passed] 
@@ -134,97 +260,186 @@ class ResultsAggregator():
                 / self.__counts[ResultsAggregator.total]) * 100))
         else:
             self.__coverage[ResultsAggregator.skipped] = 0
+        self.__coverage_stale = False
+
+
+    def merge(self, other):
+        """Fold another ResultsAggregator's results into this one using the same duplicate handling as insert_result.
 
+        Results are merged in the other aggregator's insertion order, so merging a list of partial aggregates in a fixed
+        order always produces the same results, counts, and coverage as loading their files serially in that order.
+
+        Required Arguments:
+        other -- a ResultsAggregator, typically a partial aggregate built from a subset of the results files
+        """
+        for _result in other.__results:
+            self.insert_result(_result['testsuite'], _result['state'], _result['name'], _result['metadata'])
 
-    def __sort_results(self):
-        if self.__results_unsorted:
-            self.__results = sorted(self.__results, key = lambda r: r['name'])
-            self.__results_unsorted = False
 
+    def load_partial(filename, ignorelist=[], cache=None, lazy_messages=False):
+        """Return a new ResultsAggregator holding only the results of filename.  Used as the unit of work for parallel loading.
 
-    def load_file(self, filename, filetype=None):
-        if filetype == "json": # If caller told us the file was json, assume they're not lying
-            self.__load_json(filename)
-        elif filetype == "xml": # If caller told us the file was xml, assume they're not lying
-            self.__load_xml(filename)
-        else: # Otherwise, try to determine the filetype, fall back on exception
-            _filetype = ResultsAggregator.determine_filetype(filename) # checks extension and validates against format, tossing error if invalid JSON + XML
-            if _filetype == "json":
-                self.__load_json(filename)
-            elif _filetype == "xml":
-                self.__load_xml(filename)
-            else:
-                raise ValueError(f"Could not determine the correct file format for {filename}.  Please verify that it is valid XML or JSON.")  
+        Required Arguments:
+        filename -- the results file to load
+
+        Keyword Arguments:
+        ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
+        cache       --  an optional ParseCache to read parsed cases from and write them to
+        lazy_messages   --  keep failure messages as references into filename rather than reading them in
+        """
+        _partial = ResultsAggregator(ignorelist=ignorelist, cache=cache, lazy_messages=lazy_messages)
+        _partial.load_file(filename)
+        return _partial
+
+
+    def __load_files_parallel(self, files, jobs):
+        # Each file is parsed into its own partial aggregate in a worker process, so a file that fails to load only
+        # fails its own task.  Partials are merged in input order to keep the result deterministic.
+        _workers = os.cpu_count() if jobs < 1 else jobs
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(_workers, len(files))) as _executor:
+            _futures = [_executor.submit(ResultsAggregator.load_partial, f, self.ignorelist, self.cache, self.lazy_messages) for f in files]
+            for _filename, _future in zip(files, _futures):
+                try:
+                    self.merge(_future.result())
+                except Exception as ex:
+                    print(f"{_filename} could not be loaded: {ex}")
+                    self.insert_result(f"{_filename}", ResultsAggregator.failed, f"Load {_filename}", {"message": f"{_filename} could not be loaded ({ex}).  Marking as a failure."})
+
+
+    def load_file(self, filename, filetype=None, data=None):
+        """Load a results file into the aggregate.  The file is opened read-only and parsed once by the loader registered for its format.
+
+        Required Arguments:
+        filename -- path to the results file to load
+
+        Keyword Arguments:
+        filetype -- the name of a registered format, ex. "xml" or "json" - sniffed from the start of the file if omitted
+        data -- the file's contents if they've already been read (ex. by a PrefetchReader), so the file isn't opened again
+        """
+        if self.cache is not None and (data is not None or os.path.isfile(filename)):
+            self.__load_cached(filename, filetype, data)
+            return
+        try:
+            _stream = ResultsAggregator.__prefetched_stream(filename, data) if data is not None else open(filename, "rb")
+        except FileNotFoundError as e:
+            if filetype is None:
+                raise FileNotFoundError(f"{filename} not found.  Exiting.")
+            print(f"{filename} not found.")
+            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} could not be opened.  Marking as a failure."})
+            return
+        with _stream:
+            if filetype is None: # Sniff the format from the start of the file, then rewind for the real load
+                filetype = LoaderRegistry.LoaderRegistry.sniff(_stream.read(LoaderRegistry.LoaderRegistry.sniff_size))
+                if filetype is None:
+                    raise AttributeError(f"{filename} is not in parsable XML or JSON format and cannot be loaded.")
+                _stream.seek(0)
+            _loader = LoaderRegistry.LoaderRegistry.get_loader(filetype)
+            if _loader is None:
+                raise ValueError(f"Could not determine the correct file format for {filename}.  Please verify that it is valid XML or JSON.")
+            _loader(self, _stream, filename)
+
+    
+    def __prefetched_stream(filename, data):
+        # Named after the file so lazy message references still point into it - offsets into data are offsets into the file
+        _stream = io.BytesIO(data)
+        _stream.name = filename
+        return _stream
+
+
+    def __load_cached(self, filename, filetype, data=None):
+        # Cached cases are recorded before the ignorelist is applied, so one entry serves every ignorelist.  Lazy and
+        # eager loads are cached separately - lazy entries hold each message's byte range in place of its text, which
+        # stays valid because the key covers the file's path and contents.
+        _key = self.cache.key(filename, f"{ResultsAggregator.parser_version}{'-lazy' if self.lazy_messages else ''}", data=data)
+        _cases = self.cache.get(_key)
+        if _cases is None:
+            _partial = ResultsAggregator(lazy_messages=self.lazy_messages)
+            _partial.load_file(filename, filetype, data)
+            _cases = [(r['testsuite'], r['state'], r['name'], ResultsAggregator.__cacheable_metadata(r['metadata'])) for r in _partial.__results]
+            self.cache.put(_key, _cases)
+        for _testsuite, _state, _name, _metadata in _cases:
+            if "message_ref" in _metadata:
+                _metadata = dict(_metadata)
+                _metadata['message'] = MessageRef.MessageRef(*_metadata.pop("message_ref"))
+            self.insert_result(_testsuite, _state, _name, _metadata)
+
+
+    def __cacheable_metadata(metadata):
+        # MessageRefs can't be marshalled, so they're cached as their (path, start, end, encoding) state
+        if not isinstance(metadata.get('message'), MessageRef.MessageRef):
+            return metadata
+        return {**metadata, "message": "", "message_ref": metadata['message'].__getstate__()}
 
     
     def determine_filetype(filename):
+        """Return the name of the registered format that filename is in, sniffed from the first few KB of the file."""
         if os.path.isfile(filename):
-            with open(filename, 'r+') as _f:
-                _contents = _f.read()
-                try:
-                    _parsed_contents = untangle.parse(_contents)
-                    return "xml"
-                except xml.sax._exceptions.SAXParseException as ex:
-                    pass
-                try:
-                    _parsed_contents = json.loads(_contents)
-                    return "json"
-                except json.JSONDecodeError as ex:
-                    pass
+            with open(filename, 'rb') as _f:
+                _filetype = LoaderRegistry.LoaderRegistry.sniff(_f.read(LoaderRegistry.LoaderRegistry.sniff_size))
+            if _filetype is not None:
+                return _filetype
         else:
             raise FileNotFoundError(f"{filename} not found.  Exiting.")
         raise AttributeError(f"{filename} is not in parsable XML or JSON format and cannot be loaded.")
 
     
-    def __load_xml(self, filename):
+    def load_xml(self, stream, filename):
+        """Loader for JUnit XML results - registered with the LoaderRegistry as "xml".
+
+        Required Arguments:
+        stream -- a binary stream of JUnit XML
+        filename -- the name of the file the stream was opened from, recorded in each result's metadata
+        """
+        # Each testcase is inserted as soon as the streaming loader reaches its closing tag, so we never hold more than
+        # one case (and its failure message) in memory on top of the aggregate itself
+        def _insert_case(testsuite, name, state, message):
+            self.insert_result(testsuite, state, name, ResultsAggregator.get_case_metadata(name, message, filename))
+        # Messages can only be referenced when the stream is the results file itself, not ex. an archive member
+        _lazy_path = filename if self.lazy_messages and getattr(stream, "name", None) == filename else None
         try:
-            with open(filename, "r") as test_file:
-                _test_results = test_file.read()
-                try:
-                    _test_results = untangle.parse(_test_results)
-                except xml.sax._exceptions.SAXParseException as ex:
-                    _test_results = _test_results
-        except FileNotFoundError as e:
-            print(f"{filename} not found.")
-            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", f"{filename} not found", {"message": f"{filename} could not be opened.  Marking as a failure."})
-        if _test_results is not None and isinstance(_test_results, untangle.Element):
-            # Try catch is necessary to check for the existance of the testsuites child object on the NoneType root object.  
-            try:
-                for _test_suite in _test_results.testsuites.children:
-                    for _case in _test_suite.children:
-                        if _case._name == "testcase": # Filter to ensure that we don't accidentally grab non-test-case items (XML can be troublesome)
-                            self.insert_result(_test_suite['name'], ResultsAggregator.get_case_state_xml(_case), ResultsAggregator.get_case_name_xml(_case), ResultsAggregator.get_case_metadata_xml(_case, filename))
-            except AttributeError as ex:
-                for _case in _test_results.testsuite.children:
-                    self.insert_result(_test_results.testsuite['name'], ResultsAggregator.get_case_state_xml(_case), ResultsAggregator.get_case_name_xml(_case), ResultsAggregator.get_case_metadata_xml(_case, filename))
-        else: # file isn't XML
-            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", f"{filename} parse as XML", {"message": f"{filename} not in XML format or is empty.  Marking as a failure."})
-
-
-    def __load_json(self, filename):
-        print("Dummy JSON Load")
-        # try:
-        #     with open(filename, "r") as test_file:
-        #         _test_results = test_file.read()
-        #         try:
-        #             _test_results = untangle.parse(_test_results)
-        #         except xml.sax._exceptions.SAXParseException as ex:
-        #             _test_results = _test_results
-        # except FileNotFoundError as e:
-        #     print(f"{filename} not found.")
-        #     self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", f"{filename} not found", {"message": f"{filename} could not be opened.  Marking as a failure."})
-        # if _test_results is not None and isinstance(_test_results, untangle.Element):
-        #     # Try catch is necessary to check for the existance of the testsuites child object on the NoneType root object.  
-        #     try:
-        #         for _test_suite in test_results.testsuites.children:
-        #             for _case in test_suite.children:
-        #                 if _case._name == "testcase": # Filter to ensure that we don't accidentally grab non-test-case items (XML can be troublesome)
-        #                     self.insert_result(_test_suite, ResultsAggregator.get_case_state_xml(_case), ResultsAggregator.get_case_name_xml(_case), ResultsAggregator.get_case_metadata_xml(_case, filename))
-        #     except AttributeError as ex:
-        #         for case in test_results.testsuite.children:
-        #             self.insert_result(_test_suite, ResultsAggregator.get_case_state_xml(_case), ResultsAggregator.get_case_name_xml(_case), ResultsAggregator.get_case_metadata_xml(_case, filename))
-        # else: # file isn't XML
-        #     self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", f"{filename} parse as XML", {"message": f"{filename} not in XML format or is empty.  Marking as a failure."})
+            XmlLoader.XmlLoader(_insert_case, lazy_path=_lazy_path).load(stream)
+        except xml.parsers.expat.ExpatError as ex: # file isn't XML
+            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} not in XML format or is empty.  Marking as a failure."})
+
+
+    def load_json(self, stream, filename):
+        """Loader for JSON results in the format written by JsonGenerator - registered with the LoaderRegistry as "json".
+        A bare JSON list of results is accepted too.  Results are streamed out of the file one at a time, so a large report
+        is never held in memory as a whole, and are inserted as they were reported - results the report's ignorelist
+        ignored stay ignored, so results, counts, and coverage come back exactly as they were generated.
+
+        Required Arguments:
+        stream -- a binary stream of JSON
+        filename -- the name of the file the stream was opened from
+        """
+        _reader = JsonStreamReader.JsonStreamReader(stream)
+        try:
+            for _result in _reader.iter_items("results"):
+                self.insert_result(_result['testsuite'], _result['state'], _result['name'], _result['metadata'])
+        except (ValueError, KeyError, TypeError) as ex: # not JSON, or not a list of results
+            print(f"{filename} could not be loaded as JSON results: {ex!r}")
+            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} not in JSON results format ({ex!r}).  Marking as a failure."})
+
+
+    def load_ndjson(self, stream, filename):
+        """Loader for NDJSON results as written by JsonGenerator's "ndjson" format - registered with the LoaderRegistry as
+        "ndjson".  Each line holds a result, except the report's trailing summary record, which is skipped.  Results are
+        read and inserted a line at a time, as they were reported, like load_json().
+
+        Required Arguments:
+        stream -- a binary stream of NDJSON
+        filename -- the name of the file the stream was opened from
+        """
+        try:
+            for _line in stream:
+                if not _line.strip():
+                    continue
+                _result = json.loads(_line)
+                if "summary" not in _result:
+                    self.insert_result(_result['testsuite'], _result['state'], _result['name'], _result['metadata'])
+        except (ValueError, KeyError, TypeError) as ex: # not NDJSON, or not results
+            print(f"{filename} could not be loaded as NDJSON results: {ex!r}")
+            self.insert_result(f"{filename}", ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} not in NDJSON results format ({ex!r}).  Marking as a failure."})
 
 
     def get_case_state_xml(case):
@@ -274,10 +489,21 @@ class ResultsAggregator():
         Required Parameters:
         case -- an XML testcase object from JUnit XML test output parsed by Untangle
         """
+        return ResultsAggregator.get_case_metadata(ResultsAggregator.get_case_name_xml(case), ResultsAggregator.get_case_message_xml(case), filename)
+
+
+    def get_case_metadata(name, message, filename):
+        """Return the metadata for a testcase given its name and failure message, detecting priority/severity/squad tags in the name.
+
+        Required Parameters:
+        name -- the name of the testcase, optionally tagged as "[priority][severity][squad1,squad2] name"
+        message -- the failure message of the testcase (or a MessageRef to it), or "" if it didn't fail
+        filename -- the results file the testcase was loaded from
+        """
         _meta = {}
-        _meta['message'] =  ResultsAggregator.get_case_message_xml(case)
+        _meta['message'] = message
         _meta['filename'] = os.path.basename(filename)
-        _info = re.findall("\[(.*?)\]", ResultsAggregator.get_case_name_xml(case)) 
+        _info = re.findall("\[(.*?)\]", name) 
         if _info and len(_info) >= 3:
             _meta['priority'] = _info[0]
             _meta['severity'] = _info[1]
@@ -290,3 +516,10 @@ class ResultsAggregator():
 
         return _meta
 
+
+# Register the built-in loaders - other formats register themselves from datamodel/loaders/
+LoaderRegistry.LoaderRegistry.register("json", LoaderRegistry.LoaderRegistry.sniff_json, ResultsAggregator.load_json)
+LoaderRegistry.LoaderRegistry.register("ndjson", LoaderRegistry.LoaderRegistry.sniff_ndjson, ResultsAggregator.load_ndjson)
+LoaderRegistry.LoaderRegistry.register("compact", CompactResults.CompactResults.sniff, CompactResults.CompactResults.load)
+LoaderRegistry.LoaderRegistry.register("xml", LoaderRegistry.LoaderRegistry.sniff_xml, ResultsAggregator.load_xml)
+LoaderRegistry.LoaderRegistry.register("artifact", ResultsArtifact.ResultsArtifact.sniff, ResultsArtifact.ResultsArtifact.load, binary=True)
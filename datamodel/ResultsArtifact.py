@@ -0,0 +1,140 @@
+"""ResultsArtifact
+
+A compact, portable snapshot of a ResultsAggregator, so that CI nodes can each aggregate their own results and ship a
+few MB of parsed results to the final reporting job instead of the raw XML.  Artifacts are loaded like any other results
+file - the ResultsAggregator registers this module's loader - so every report generator accepts them as input, and
+loading several artifacts into one aggregate merges them with the usual duplicate handling (any failure wins).
+
+An artifact file is laid out as:
+    magic (4 bytes) | format version (1 byte) | header length (4 bytes, big-endian) | header | body
+The header is small, uncompressed JSON recording the parser version, counts, and ignorelist of the exported aggregate, so
+it can be read without decoding the results.  The body is zlib-compressed JSON holding each distinct testsuite name,
+failure message, and set of other metadata (file name, squads, ...) once, and every result as [testsuite index, state,
+name, message index, metadata index].  JSON is used
+rather than the marshal format of the ParseCache because artifacts travel between machines that may run other Pythons.
+"""
+
+import json, os, struct, sys, tempfile, zlib
+
+class ResultsArtifact():
+
+    # Bump when the layout changes - artifacts written with another version are rejected rather than misread
+    format_version = 1
+    magic = b"CRRA"
+    suffix = ".cra"
+
+    # Result states - these mirror the state strings used by the ResultsAggregator
+    failed = "failed"
+    ignored = "ignored"
+
+    __header_length = struct.Struct(">I")
+
+    def dumps(aggregator):
+        """Return the artifact bytes for a ResultsAggregator.  Lazily loaded messages are read in, so the artifact stands alone.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to export
+        """
+        _total, _passed, _failed, _skipped, _ignored = aggregator.get_counts()
+        _header = {
+            "parser_version": type(aggregator).parser_version,
+            "counts": {"total": _total, "passed": _passed, "failed": _failed, "skipped": _skipped, "ignored": _ignored},
+            "ignorelist": aggregator.ignorelist
+        }
+        _testsuites = {}
+        _messages = {}
+        # Hashable form of the metadata -> (index, metadata), so that results sharing a file name and tags share one entry
+        _metadata = {}
+        _cases = []
+        for _result in aggregator.iter_results():
+            _message = aggregator.get_message(_result)
+            _case_metadata = {k: v for k, v in _result['metadata'].items() if k != "message"}
+            _key = tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in _case_metadata.items())
+            if _key not in _metadata:
+                _metadata[_key] = (len(_metadata), _case_metadata)
+            _cases.append([_testsuites.setdefault(_result['testsuite'], len(_testsuites)), _result['state'], _result['name'],
+                _messages.setdefault(_message, len(_messages)), _metadata[_key][0]])
+        _body = {"testsuites": list(_testsuites), "messages": list(_messages), "metadata": [m for i, m in _metadata.values()], "cases": _cases}
+        _header_bytes = json.dumps(_header, separators=(",", ":")).encode("utf-8")
+        return (ResultsArtifact.magic + bytes([ResultsArtifact.format_version]) + ResultsArtifact.__header_length.pack(len(_header_bytes))
+            + _header_bytes + zlib.compress(json.dumps(_body, separators=(",", ":")).encode("utf-8"), 6))
+
+
+    def write(aggregator, path):
+        """Export a ResultsAggregator to an artifact file at path.  The file is written atomically.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to export
+        path        --  destination file, conventionally named *.cra
+        """
+        _data = ResultsArtifact.dumps(aggregator)
+        _fd, _tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(_fd, "wb") as _f:
+                _f.write(_data)
+            os.replace(_tmp, path)
+        except OSError:
+            if os.path.exists(_tmp):
+                os.remove(_tmp)
+            raise
+
+
+    def read_header(stream):
+        """Return the header dict of the artifact in a binary stream, leaving the stream at the start of the body.
+        Raises a ValueError if the stream isn't an artifact of a supported version."""
+        _prefix = stream.read(len(ResultsArtifact.magic) + 1 + ResultsArtifact.__header_length.size)
+        if not ResultsArtifact.sniff(_prefix) or len(_prefix) < len(ResultsArtifact.magic) + 1 + ResultsArtifact.__header_length.size:
+            raise ValueError("not a results artifact")
+        if _prefix[len(ResultsArtifact.magic)] != ResultsArtifact.format_version:
+            raise ValueError(f"artifact format version {_prefix[len(ResultsArtifact.magic)]} is not supported (expected {ResultsArtifact.format_version})")
+        _length, = ResultsArtifact.__header_length.unpack(_prefix[len(ResultsArtifact.magic) + 1:])
+        try:
+            return json.loads(stream.read(_length).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as ex:
+            raise ValueError(f"artifact header is corrupt ({ex})")
+
+
+    def read_ignorelist(filename):
+        """Return the ignorelist recorded in the artifact at filename, or an empty list if it isn't a readable artifact."""
+        try:
+            with open(filename, "rb") as _f:
+                return ResultsArtifact.read_header(_f).get("ignorelist", [])
+        except (OSError, ValueError):
+            return []
+
+
+    def sniff(head):
+        """Binary sniffer for results artifacts."""
+        return head.startswith(ResultsArtifact.magic)
+
+
+    def load(aggregator, stream, filename):
+        """Loader for results artifacts - registered with the LoaderRegistry as "artifact".
+
+        If the loading aggregate has an ignorelist, results are inserted in their state from before the exporting
+        aggregate's ignorelist was applied, so the loading aggregate's own ignorelist decides which failures are ignored,
+        just as if it had parsed the original results.  Otherwise results keep the state they were exported in, so failures
+        the exporting aggregate's ignorelist (recorded in the header) ignored stay ignored.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert results into
+        stream      --  a binary stream of the artifact
+        filename    --  the name of the file the stream was opened from
+        """
+        try:
+            ResultsArtifact.read_header(stream)
+            _body = json.loads(zlib.decompress(stream.read()).decode("utf-8"))
+            _testsuites = _body['testsuites']
+            _messages = _body['messages']
+            _metadata = _body['metadata']
+            _cases = _body['cases']
+        except (ValueError, KeyError, TypeError, zlib.error) as ex:
+            print(f"{filename} could not be read as a results artifact: {ex}", file=sys.stderr)
+            aggregator.insert_result(f"{filename}", ResultsArtifact.failed, f"Load {filename}", {"message": f"{filename} could not be read as a results artifact ({ex}).  Marking as a failure."})
+            return
+        _reapply_ignorelist = bool(aggregator.ignorelist)
+        for _testsuite, _state, _name, _message, _case_metadata in _cases:
+            if _reapply_ignorelist and _state == ResultsArtifact.ignored:
+                _state = ResultsArtifact.failed
+            aggregator.insert_result(_testsuites[_testsuite], _state, _name,
+                {"message": _messages[_message], **_metadata[_case_metadata]})
@@ -0,0 +1,102 @@
+"""ResultsDiscovery
+
+Finds the results files to load under a set of RESULTS_DIR arguments.  Directories are listed with os.scandir, so file
+type checks come from the directory entry rather than a stat() per file, and can optionally be walked recursively and
+by several threads at once for large trees on network filesystems.  Files are returned in a deterministic, sorted order
+so that reports don't depend on the order a filesystem happens to list entries in.
+"""
+
+import fnmatch, os, concurrent.futures
+
+class ResultsDiscovery():
+
+    default_include = ["*.xml"]
+
+    def __init__(self, recursive=False, include=default_include, exclude=[], threads=1):
+        """Create a ResultsDiscovery that finds results files matching include but not exclude.
+
+        Keyword Arguments:
+        recursive   --  if True, descend into subdirectories of each results directory
+        include     --  glob patterns a file must match to be loaded, ex. "*.xml" - matched against both the file name and
+                        its path relative to the results directory, so "shard-*/chrome/*.xml" works too
+        exclude     --  glob patterns for files to skip, and for directories not to descend into when recursive
+        threads     --  number of threads used to list directories in parallel - directories are listed serially if 1
+        """
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.threads = threads
+
+
+    def from_args(args):
+        """Return a ResultsDiscovery configured from the --recursive, --include, --exclude, and --discovery-threads arguments."""
+        return ResultsDiscovery(recursive=args.recursive, include=args.include if args.include else ResultsDiscovery.default_include,
+            exclude=args.exclude, threads=int(args.discovery_threads))
+
+
+    def discover(self, results_dirs):
+        """Return the results files found under results_dirs - sorted within each directory, in the order the directories were given.
+        Arguments that are files rather than directories (ex. .zip/.tar.gz bundles of results) are returned as-is.
+
+        Required Arguments:
+        results_dirs    --  a list of results directories or files
+        """
+        _results_files = []
+        for _results_dir in results_dirs:
+            if os.path.isfile(_results_dir):
+                _results_files.append(_results_dir)
+            elif self.threads > 1 and self.recursive:
+                _results_files.extend(self.__walk_parallel(_results_dir))
+            else:
+                _results_files.extend(self.__walk(_results_dir))
+        return _results_files
+
+
+    def matches(self, name, relpath, patterns):
+        """Return True if a file name or its path relative to the results directory matches any of patterns."""
+        for _pattern in patterns:
+            if fnmatch.fnmatchcase(name, _pattern) or fnmatch.fnmatchcase(relpath, _pattern):
+                return True
+        return False
+
+
+    def __scan(self, path, prefix):
+        # List a single directory, returning the (relpath, path) of each matching file and the (path, relpath prefix) of
+        # each subdirectory to visit.  Relative paths are built up from the prefix rather than computed per entry.
+        _files = []
+        _dirs = []
+        with os.scandir(path) as _it:
+            for _entry in _it:
+                _relpath = prefix + _entry.name
+                if self.exclude and self.matches(_entry.name, _relpath, self.exclude):
+                    continue
+                if _entry.is_file():
+                    if self.matches(_entry.name, _relpath, self.include):
+                        _files.append((_relpath, _entry.path))
+                elif self.recursive and _entry.is_dir():
+                    _dirs.append((_entry.path, _relpath + "/"))
+        return _files, _dirs
+
+
+    def __walk(self, root):
+        _found = []
+        _pending = [(root, "")]
+        while _pending:
+            _files, _dirs = self.__scan(*_pending.pop())
+            _found.extend(_files)
+            _pending.extend(_dirs)
+        return [_path for _relpath, _path in sorted(_found)]
+
+
+    def __walk_parallel(self, root):
+        # Listing a directory is dominated by filesystem round trips that release the GIL, so threads overlap them well
+        _found = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as _executor:
+            _pending = {_executor.submit(self.__scan, root, "")}
+            while _pending:
+                _done, _pending = concurrent.futures.wait(_pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for _future in _done:
+                    _files, _dirs = _future.result()
+                    _found.extend(_files)
+                    _pending.update(_executor.submit(self.__scan, _dir, _prefix) for _dir, _prefix in _dirs)
+        return [_path for _relpath, _path in sorted(_found)]
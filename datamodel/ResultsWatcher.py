@@ -0,0 +1,109 @@
+"""ResultsWatcher
+
+Incrementally aggregates results directories that are still being written to, ex. by canary shards that finish at very
+different times.  Each poll discovers the results files, loads any that are new or have changed since they were last
+loaded into a partial ResultsAggregator of their own, and drops the partials of files that have gone away.  The live
+aggregate is the merge of every file's partial, so a file rewritten in place replaces its earlier contribution rather
+than being counted twice, and no file is parsed again unless it changes.
+"""
+
+import os, time, concurrent.futures
+from datamodel import ResultsAggregator as ra
+from datamodel import ResultsDiscovery
+
+class ResultsWatcher():
+
+    # A file whose size and mtime haven't changed for this many seconds is taken to be completely written
+    default_settle_seconds = 2
+
+    def __init__(self, results_dirs, discovery=None, ignorelist=[], jobs=1, cache=None, lazy_messages=False, settle_seconds=default_settle_seconds):
+        """Create a ResultsWatcher over results_dirs.  Nothing is loaded until the first poll().
+
+        Required Arguments:
+        results_dirs    --  a list of results directories (or archive files) to watch
+
+        Keyword Arguments:
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
+        jobs    --  number of worker processes used to load a batch of changed files in parallel - files are loaded serially if 1
+        cache   --  an optional ParseCache to read parsed cases from and write them to
+        lazy_messages   --  keep failure messages as references into their results files, see ResultsAggregator
+        settle_seconds  --  how long a file must go unmodified before it's loaded, unless it was already unchanged at the last poll
+        """
+        self.results_dirs = results_dirs
+        self.discovery = discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()
+        self.ignorelist = ignorelist
+        self.jobs = jobs
+        self.cache = cache
+        self.lazy_messages = lazy_messages
+        self.settle_seconds = settle_seconds
+        # path -> ((mtime_ns, size), partial ResultsAggregator) for every file loaded so far
+        self.__partials = {}
+        # path -> (mtime_ns, size) seen at the last poll for files still waiting to settle
+        self.__unsettled = {}
+
+
+    def poll(self):
+        """Load new and changed results files and forget deleted ones.  Returns True if the aggregate changed."""
+        _now = time.time()
+        _signatures = {}
+        for _path in self.discovery.discover(self.results_dirs):
+            try:
+                _stat = os.stat(_path)
+            except FileNotFoundError: # deleted between discovery and stat
+                continue
+            _signatures[_path] = (_stat.st_mtime_ns, _stat.st_size)
+        _changed = False
+        for _path in [p for p in self.__partials if p not in _signatures]:
+            del self.__partials[_path]
+            _changed = True
+        _ready = []
+        for _path, _signature in _signatures.items():
+            if _path in self.__partials and self.__partials[_path][0] == _signature:
+                continue
+            # A file is still being written if it changed recently and since the last poll - wait for it to settle
+            if self.__unsettled.get(_path) != _signature and _now - _signature[0] / 1e9 < self.settle_seconds:
+                self.__unsettled[_path] = _signature
+                continue
+            self.__unsettled.pop(_path, None)
+            _ready.append(_path)
+        for _path, _partial in zip(_ready, self.__load(_ready)):
+            self.__partials[_path] = (_signatures[_path], _partial)
+            _changed = True
+        self.__unsettled = {p: s for p, s in self.__unsettled.items() if p in _signatures}
+        return _changed
+
+
+    def get_aggregate(self):
+        """Return a new ResultsAggregator merging the results of every loaded file, in file order."""
+        _aggregate = ra.ResultsAggregator(ignorelist=self.ignorelist, lazy_messages=self.lazy_messages)
+        for _path in sorted(self.__partials):
+            _aggregate.merge(self.__partials[_path][1])
+        return _aggregate
+
+
+    def get_files(self):
+        """Return the paths of the files currently contributing to the aggregate."""
+        return sorted(self.__partials)
+
+
+    def __load(self, paths):
+        # Loading failures are recorded in the file's partial the same way ResultsAggregator records them
+        if self.jobs != 1 and len(paths) > 1:
+            _workers = os.cpu_count() if self.jobs < 1 else self.jobs
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(_workers, len(paths))) as _executor:
+                _futures = [_executor.submit(ra.ResultsAggregator.load_partial, p, self.ignorelist, self.cache, self.lazy_messages) for p in paths]
+                return [self.__result_or_failure(p, f) for p, f in zip(paths, _futures)]
+        return [self.__result_or_failure(p, None) for p in paths]
+
+
+    def __result_or_failure(self, path, future):
+        try:
+            if future is not None:
+                return future.result()
+            return ra.ResultsAggregator.load_partial(path, self.ignorelist, self.cache, self.lazy_messages)
+        except Exception as ex:
+            print(f"{path} could not be loaded: {ex}")
+            _partial = ra.ResultsAggregator(ignorelist=self.ignorelist)
+            _partial.insert_result(f"{path}", ra.ResultsAggregator.failed, f"Load {path}", {"message": f"{path} could not be loaded ({ex}).  Marking as a failure."})
+            return _partial
@@ -0,0 +1,210 @@
+"""SqliteResultStore
+
+A drop-in alternative to ResultStore that keeps results in a SQLite database file on local disk rather than in memory, for
+runs too large to hold in a CI pod's memory (ex. full regressions with hundreds of thousands of long failure messages).
+Memory use stays bounded by SQLite's page cache however many results are stored.  Results are indexed on
+(testsuite, name), state, squad, severity, and priority like ResultStore's, and queries return ResultsView objects that
+stream rows out of the database each time they're iterated rather than building a list of every matching result.
+
+The database is a temporary file, removed when the store is closed or garbage collected.  Result dicts handed out are
+copies - changing one doesn't change the stored result.
+"""
+
+import os, pickle, sqlite3, tempfile, weakref
+
+class SqliteResultStore():
+
+    # Values indexed for results whose metadata doesn't carry squad/severity/priority tags, see ResultStore
+    default_squad = "Unlabelled"
+    default_severity = "Severity 1 - Urgent"
+    default_priority = "Priority/P1"
+    # Size of SQLite's page cache, the bulk of the store's memory use
+    cache_kb = 16 * 1024
+
+    __schema = """
+        CREATE TABLE results (id INTEGER PRIMARY KEY, testsuite TEXT NOT NULL, name TEXT NOT NULL, state TEXT NOT NULL,
+            severity TEXT NOT NULL, priority TEXT NOT NULL, metadata BLOB NOT NULL);
+        CREATE UNIQUE INDEX results_key ON results (testsuite, name);
+        CREATE INDEX results_state ON results (state, name, id);
+        CREATE INDEX results_severity ON results (severity);
+        CREATE INDEX results_priority ON results (priority);
+        CREATE INDEX results_name ON results (name, id);
+        CREATE TABLE squads (result_id INTEGER NOT NULL, squad TEXT NOT NULL);
+        CREATE INDEX squads_squad ON squads (squad, result_id);
+        CREATE INDEX squads_result ON squads (result_id);
+    """
+
+    def __init__(self, directory=None):
+        """Create a SqliteResultStore backed by a new temporary database file.
+
+        Keyword Arguments:
+        directory   --  directory to create the database file in - the system temporary directory if omitted
+        """
+        _fd, self.path = tempfile.mkstemp(prefix="canary-results-", suffix=".sqlite", dir=directory)
+        os.close(_fd)
+        # The database only lives as long as this process needs it, so durability is traded away for speed
+        self.__db = sqlite3.connect(self.path, isolation_level=None)
+        self.__db.execute("PRAGMA journal_mode = OFF")
+        self.__db.execute("PRAGMA synchronous = OFF")
+        self.__db.execute(f"PRAGMA cache_size = -{SqliteResultStore.cache_kb}")
+        self.__db.executescript(SqliteResultStore.__schema)
+        # Everything is written in one long transaction - reads on the same connection see uncommitted rows
+        self.__db.execute("BEGIN")
+        self.__finalizer = weakref.finalize(self, SqliteResultStore.__remove, self.__db, self.path)
+
+
+    def get(self, testsuite, name):
+        """Return the result dict for the given testsuite and test case name, or None if it hasn't been inserted."""
+        _row = self.__db.execute("SELECT testsuite, name, state, metadata FROM results WHERE testsuite = ? AND name = ?", (testsuite, name)).fetchone()
+        return SqliteResultStore.__result(_row) if _row is not None else None
+
+
+    def add(self, result):
+        """Add a new result dict to the store.  Raises a ValueError if its (testsuite, name) pair is already present.
+
+        Required Arguments:
+        result -- a result dict containing at least "testsuite" and "name" keys
+        """
+        _metadata = result['metadata']
+        try:
+            _id = self.__db.execute("INSERT INTO results (testsuite, name, state, severity, priority, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                (result['testsuite'], result['name'], result['state'], _metadata.get('severity', SqliteResultStore.default_severity),
+                _metadata.get('priority', SqliteResultStore.default_priority), pickle.dumps(_metadata, pickle.HIGHEST_PROTOCOL))).lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError(f"More than one matching test case and test suite ")
+        self.__add_squads(_id, _metadata)
+
+
+    def update(self, result, state, metadata):
+        """Replace the state and metadata of a result already in the store.
+
+        Required Arguments:
+        result      --  a result dict returned by get()
+        state       --  the result's new state
+        metadata    --  the result's new metadata dict
+        """
+        result['state'] = state
+        result['metadata'] = metadata
+        _id = self.__db.execute("SELECT id FROM results WHERE testsuite = ? AND name = ?", (result['testsuite'], result['name'])).fetchone()[0]
+        self.__db.execute("UPDATE results SET state = ?, severity = ?, priority = ?, metadata = ? WHERE id = ?",
+            (state, metadata.get('severity', SqliteResultStore.default_severity), metadata.get('priority', SqliteResultStore.default_priority),
+            pickle.dumps(metadata, pickle.HIGHEST_PROTOCOL), _id))
+        self.__db.execute("DELETE FROM squads WHERE result_id = ?", (_id,))
+        self.__add_squads(_id, metadata)
+
+
+    def sorted(self):
+        """Return a ResultsView of all results sorted by test case name.  Ties keep their insertion order."""
+        return self.query()
+
+
+    def query(self, states=None, squad=None, severity=None, priority=None):
+        """Return a ResultsView of the results matching every given filter, in the same order as sorted().
+
+        Keyword Arguments:
+        states      --  a list of states a result must be in
+        squad       --  a squad a result must be tagged with
+        severity    --  the severity a result must be tagged with
+        priority    --  the priority a result must be tagged with
+        """
+        _where = []
+        _params = []
+        if states is not None:
+            _states = list(set(states))
+            _where.append(f"state IN ({', '.join('?' * len(_states))})")
+            _params.extend(_states)
+        if squad is not None:
+            _where.append("id IN (SELECT result_id FROM squads WHERE squad = ?)")
+            _params.append(squad)
+        if severity is not None:
+            _where.append("severity = ?")
+            _params.append(severity)
+        if priority is not None:
+            _where.append("priority = ?")
+            _params.append(priority)
+        # SQLite compares TEXT as UTF-8 bytes, which orders names by code point just like sorting Python strings
+        return ResultsView(self, f"FROM results{' WHERE ' + ' AND '.join(_where) if _where else ''}", _params, "ORDER BY name, id")
+
+
+    def iter_query(self, states=None, squad=None, severity=None, priority=None):
+        """Return an iterator over the same results as query(), in the same order.  Takes the same arguments as query()."""
+        return iter(self.query(states=states, squad=squad, severity=severity, priority=priority))
+
+
+    def execute(self, sql, params=()):
+        """Run a statement against the store's database and return the cursor - used by ResultsView."""
+        return self.__db.execute(sql, params)
+
+
+    def close(self):
+        """Close the database and remove its file.  The store can't be used afterwards."""
+        self.__finalizer()
+
+
+    def __add_squads(self, result_id, metadata):
+        _squads = metadata.get('squad(s)')
+        self.__db.executemany("INSERT INTO squads (result_id, squad) VALUES (?, ?)",
+            [(result_id, _squad) for _squad in (_squads if _squads else [SqliteResultStore.default_squad])])
+
+
+    def __result(row):
+        return {"name": row[1], "state": row[2], "testsuite": row[0], "metadata": pickle.loads(row[3])}
+
+
+    def __remove(db, path):
+        db.close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+    def __iter__(self):
+        return iter(ResultsView(self, "FROM results", [], "ORDER BY id"))
+
+
+    def __len__(self):
+        return self.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+class ResultsView():
+    """A re-iterable, lazily evaluated list of results from a SqliteResultStore.  Each iteration runs the view's query again
+    and streams result dicts out of the database in batches, so only a batch of results is in memory at a time."""
+
+    # Rows fetched from SQLite at a time while iterating
+    batch_size = 1000
+
+    def __init__(self, store, from_where, params, order_by, transform=None):
+        self.store = store
+        self.__from_where = from_where
+        self.__params = params
+        self.__order_by = order_by
+        self.__transform = transform
+
+
+    def map(self, transform):
+        """Return a view of the same results with transform applied to each result dict as it's read."""
+        return ResultsView(self.store, self.__from_where, self.__params, self.__order_by, transform)
+
+
+    def __iter__(self):
+        _cursor = self.store.execute(f"SELECT testsuite, name, state, metadata {self.__from_where} {self.__order_by}", self.__params)
+        while True:
+            _rows = _cursor.fetchmany(ResultsView.batch_size)
+            if not _rows:
+                return
+            for _row in _rows:
+                _result = {"name": _row[1], "state": _row[2], "testsuite": _row[0], "metadata": pickle.loads(_row[3])}
+                yield self.__transform(_result) if self.__transform is not None else _result
+
+
+    def __len__(self):
+        return self.store.execute(f"SELECT COUNT(*) {self.__from_where}", self.__params).fetchone()[0]
+
+
+    def __bool__(self):
+        return self.store.execute(f"SELECT EXISTS (SELECT 1 {self.__from_where})", self.__params).fetchone()[0] == 1
+
+
+    def __eq__(self, other):
+        return list(self) == list(other)
@@ -0,0 +1,263 @@
+"""StatusSummary
+
+A counter-only alternative to the ResultsAggregator for the status gate, which only needs totals.  JUnit XML files are
+scanned with expat for element tags alone - no character data, messages, metadata, or result dicts are built.
+
+Totals are gathered in up to three passes, each used only if the one before can't produce the right answer:
+  1.  Testsuites that carry tests/failures/skipped attributes which add up are counted from those attributes, once their
+      testcases' states have been tallied and found to match them - no case-by-case de-duplication state is kept.
+      Testsuites without usable attributes have their testcases counted as they stream past.
+  2.  If a non-empty testsuite name or a testcase name within a suite repeats, suites are nested, or a suite's attributes
+      don't match its testcases, the attributes can't be trusted - every file is re-scanned counting testcases, resolving
+      duplicates the way the ResultsAggregator does (any failure wins) from a hash of each case's (testsuite, name) key
+      and its state.
+  3.  Files that aren't plain, well-formed XML are loaded through a ResultsAggregator, which knows how to record them.
+
+This module only imports the standard library up front, so the status gate can run without loading the generators.
+"""
+
+import codecs, xml.parsers.expat
+
+class StatusSummary():
+
+    passed = "passed"
+    failed = "failed"
+    skipped = "skipped"
+    ignored = "ignored"
+    total = "total"
+
+    # Number of bytes handed to expat per Parse() call
+    read_size = 256 * 1024
+
+    def __init__(self, files=[]):
+        """Create a StatusSummary of the given JUnit XML results files.
+
+        Keyword Arguments:
+        files   --  a list of results files to count
+        """
+        self.files = files
+        # Which pass produced the totals - "attributes", "cases", or "aggregate"
+        self.mode = "attributes"
+        try:
+            self.__count(use_attributes=True)
+        except _Rescan:
+            self.mode = "cases"
+            try:
+                self.__count(use_attributes=False)
+            except _Fallback:
+                self.__load_aggregate()
+        except _Fallback:
+            self.__load_aggregate()
+
+
+    def get_counts(self):
+        """Return (total, passed, failed, skipped, ignored) in the same shape as ResultsAggregator.get_counts().  Failures
+        on the ignorelist count as failed here - the status gate treats ignored and failed results the same way."""
+        return self.__counts[StatusSummary.total], self.__counts[StatusSummary.passed], self.__counts[StatusSummary.failed], self.__counts[StatusSummary.skipped], self.__counts[StatusSummary.ignored]
+
+
+    def get_coverage(self):
+        """Return the percentage of tests executed and of executed tests passed, computed as ResultsAggregator.get_coverage() does."""
+        _total, _passed, _failed, _skipped, _ignored = self.get_counts()
+        return {
+            StatusSummary.skipped: (100 - ((_skipped / _total) * 100)) if _total > 0 else 0,
+            StatusSummary.passed: ((_passed / (_total - _skipped)) * 100) if (_total - _skipped) > 0 else 0
+        }
+
+
+    def get_status(self, executed_gate=100, passing_gate=100):
+        _coverage = self.get_coverage()
+        if _coverage[StatusSummary.skipped] >= executed_gate and _coverage[StatusSummary.passed] >= passing_gate:
+            return StatusSummary.passed
+        return StatusSummary.failed
+
+
+    def print_status(results, executed_quality_gate=100, passing_quality_gate=100):
+        """Print the canary status report for results and return 0 if it passes the quality gates, 1 otherwise.
+
+        Required Arguments:
+        results --  a StatusSummary or ResultsAggregator
+
+        Keyword Arguments:
+        executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
+        """
+        _coverage = results.get_coverage()
+        print("##### Canary Status Report")
+        print(f"Expected Percentage Executed: {executed_quality_gate}")
+        print(f"Actual Percentage Executed: {round(_coverage[StatusSummary.skipped], 2)}")
+        print(f"Expected Percentage Passed: {passing_quality_gate}")
+        print(f"Actual Percentage Passed: {round(_coverage[StatusSummary.passed], 2)}")
+        if _coverage[StatusSummary.skipped] < executed_quality_gate or _coverage[StatusSummary.passed] < passing_quality_gate:
+            print("##### Result: Failed")
+            return 1
+        print("##### Result: Passed")
+        return 0
+
+
+    def add_suite(self, passed, failed, skipped):
+        """Add the totals of a testsuite counted from its attributes."""
+        self.__counts[StatusSummary.total] += passed + failed + skipped
+        self.__counts[StatusSummary.passed] += passed
+        self.__counts[StatusSummary.failed] += failed
+        self.__counts[StatusSummary.skipped] += skipped
+
+
+    def add_case(self, testsuite, name, state):
+        """Count a testcase, resolving duplicates the way ResultsAggregator.insert_result does - any failure wins."""
+        _key = hash((testsuite, name))
+        _previous = self.__case_states.get(_key)
+        if _previous is None:
+            self.__case_states[_key] = state
+            self.__counts[StatusSummary.total] += 1
+            self.__counts[state] += 1
+        elif state == StatusSummary.failed and _previous != StatusSummary.failed:
+            self.__case_states[_key] = state
+            self.__counts[_previous] -= 1
+            self.__counts[state] += 1
+
+
+    def __count(self, use_attributes):
+        self.__counts = {
+            StatusSummary.total: 0,
+            StatusSummary.passed: 0,
+            StatusSummary.failed: 0,
+            StatusSummary.skipped: 0,
+            StatusSummary.ignored: 0
+        }
+        # Hash of each counted case's (testsuite, name) key -> its state, for duplicate resolution
+        self.__case_states = {}
+        _suite_names = set()
+        for _f in self.files:
+            with open(_f, "rb") as _stream:
+                _chunk = _stream.read(StatusSummary.read_size)
+                # Anything other than plain XML (ex. JSON results or an archive) needs the full loader registry
+                _head = _chunk[len(codecs.BOM_UTF8):] if _chunk.startswith(codecs.BOM_UTF8) else _chunk
+                if not _head.lstrip().startswith(b"<"):
+                    raise _Fallback()
+                _scanner = _SuiteScanner(self, _suite_names if use_attributes else None)
+                try:
+                    while _chunk:
+                        _scanner.parser.Parse(_chunk, False)
+                        _chunk = _stream.read(StatusSummary.read_size)
+                    _scanner.parser.Parse(b"", True)
+                except xml.parsers.expat.ExpatError:
+                    # The ResultsAggregator records unparsable files as failed loads - let it do so
+                    raise _Fallback()
+
+
+    def __load_aggregate(self):
+        # Imported here so the counter-only passes never pay for it
+        from datamodel import ResultsAggregator as ra
+        self.mode = "aggregate"
+        _total, _passed, _failed, _skipped, _ignored = ra.ResultsAggregator(files=self.files).get_counts()
+        self.__counts = {
+            StatusSummary.total: _total,
+            StatusSummary.passed: _passed,
+            StatusSummary.failed: _failed,
+            StatusSummary.skipped: _skipped,
+            StatusSummary.ignored: _ignored
+        }
+        self.__case_states = {}
+
+
+class _Rescan(Exception):
+    """Raised by the attribute pass when results may need de-duplicating, so testcases have to be counted instead."""
+
+
+class _Fallback(Exception):
+    """Raised when only a full ResultsAggregator load can produce the right totals."""
+
+
+class _SuiteScanner():
+    # Streams one file's element tags into a StatusSummary, either counting suites from their attributes where possible
+    # (suite_names is the set of non-empty suite names seen so far) or counting every testcase (suite_names is None)
+
+    def __init__(self, summary, suite_names):
+        self.summary = summary
+        self.suite_names = suite_names
+        self.parser = xml.parsers.expat.ParserCreate()
+        self.parser.StartElementHandler = self.start_element
+        self.parser.EndElementHandler = self.end_element
+        self.elements = []
+        # One [name, attribute totals, hashes of its testcase names, [passed, failed, skipped] tally] frame per open
+        # testsuite.  Suites counted from their attributes (totals set) still have their testcases tallied as they stream
+        # past, so attributes that don't match the cases - or a retried testcase, which needs de-duplicating - are noticed.
+        self.suites = []
+        self.case_name = None
+        self.case_state = None
+
+
+    def start_element(self, name, attrs):
+        _parent = self.elements[-1] if self.elements else None
+        self.elements.append(name)
+        if name == "testsuite":
+            self.start_suite(attrs)
+        elif not self.suites:
+            return
+        elif name == "testcase" and _parent == "testsuite":
+            if self.suites[-1][1] is not None:
+                _key = hash(attrs.get("name"))
+                if _key in self.suites[-1][2]:
+                    raise _Rescan()
+                self.suites[-1][2].add(_key)
+            self.case_name = attrs.get("name")
+            self.case_state = StatusSummary.passed
+        elif self.case_state is not None and _parent == "testcase":
+            if name == "failure":
+                self.case_state = StatusSummary.failed
+            elif name == "skipped" and self.case_state != StatusSummary.failed:
+                self.case_state = StatusSummary.skipped
+
+
+    def start_suite(self, attrs):
+        _name = attrs.get("name")
+        if self.suite_names is None:
+            self.suites.append([_name, None, None, None])
+            return
+        # Nested suites' cases belong to the innermost suite, which outer suites' attributes don't account for
+        if self.suites:
+            raise _Rescan()
+        _totals = _SuiteScanner.attribute_totals(attrs)
+        if _totals == (0, 0, 0): # ex. Cypress's empty "Root Suite" per spec file - nothing to count or de-duplicate
+            self.suites.append([_name, _totals, set(), [0, 0, 0]])
+            return
+        if _name in self.suite_names:
+            raise _Rescan()
+        self.suite_names.add(_name)
+        if _totals is not None:
+            self.summary.add_suite(*_totals)
+        self.suites.append([_name, _totals, set() if _totals is not None else None, [0, 0, 0] if _totals is not None else None])
+
+
+    def end_element(self, name):
+        self.elements.pop()
+        if name == "testsuite":
+            _name, _totals, _names, _tally = self.suites.pop()
+            # Attributes are only trusted if they agree with the testcases the suite actually holds
+            if _totals is not None and tuple(_tally) != _totals:
+                raise _Rescan()
+        elif name == "testcase" and self.case_state is not None and self.elements and self.elements[-1] == "testsuite":
+            if self.suites[-1][1] is not None:
+                self.suites[-1][3][_SuiteScanner.__tally_index[self.case_state]] += 1
+            else:
+                self.summary.add_case(self.suites[-1][0], self.case_name, self.case_state)
+            self.case_state = None
+
+
+    __tally_index = {StatusSummary.passed: 0, StatusSummary.failed: 1, StatusSummary.skipped: 2}
+
+
+    def attribute_totals(attrs):
+        # (passed, failed, skipped) from a testsuite's attributes, or None unless they're present, numeric, and add up.
+        # The ResultsAggregator only counts <failure> as failing, so suites reporting errors have their cases counted.
+        try:
+            _tests = int(attrs["tests"])
+            _failures = int(attrs["failures"])
+            _errors = int(attrs.get("errors", 0))
+            _skipped = int(attrs.get("skipped", 0))
+        except (KeyError, ValueError):
+            return None
+        if _errors != 0 or min(_tests, _failures, _skipped) < 0 or _failures + _skipped > _tests:
+            return None
+        return (_tests - _failures - _skipped, _failures, _skipped)
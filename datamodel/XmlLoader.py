@@ -0,0 +1,117 @@
+"""XmlLoader
+
+A streaming, event-driven JUnit XML loader for the ResultsAggregator.
+Files are fed to expat in fixed-size chunks and each testcase is handed to a callback as soon as its closing tag is seen,
+so memory use stays flat no matter how large the results file is.  Character data is only collected inside <failure>
+elements - <system-out>, <system-err>, <properties> and friends are scanned by expat but never materialized in Python.
+In lazy message mode not even that is collected: each failure is reported as a MessageRef to its byte range in the file.
+"""
+
+import codecs, xml.parsers.expat
+from datamodel import MessageRef
+
+class XmlLoader():
+
+    # Case states - these mirror the state strings used by the ResultsAggregator
+    passed = "passed"
+    failed = "failed"
+    skipped = "skipped"
+
+    # Number of bytes handed to expat per Parse() call
+    read_size = 64 * 1024
+
+    def __init__(self, on_case, lazy_path=None):
+        """Create an XmlLoader that reports each testcase it finds to on_case.
+
+        Required Arguments:
+        on_case -- a callable taking (testsuite, name, state, message), invoked once per testcase in document order
+
+        Keyword Arguments:
+        lazy_path   --  path of the file being loaded - if set, failure messages are passed to on_case as MessageRefs into
+                        this file rather than as text.  Ignored for UTF-16 files, whose fragments can't be parsed on their own.
+        """
+        self.on_case = on_case
+        self.lazy_path = lazy_path
+        self.__encoding = None
+        self.__base = 0
+        self.__message_start = None
+        # Stack of open element names, used to make sure we only pick up testcases that are direct children of a
+        # testsuite and failure/skipped elements that are direct children of that testcase
+        self.__elements = []
+        # Stack of open testsuite names - the innermost suite owns any testcase we find
+        self.__suites = []
+        self.__in_case = False
+        self.__case_name = None
+        self.__case_state = None
+        self.__message = None
+        self.__message_parts = None
+        self.__parser = None
+
+
+    def load(self, stream):
+        """Parse a binary stream of JUnit XML, invoking on_case for every testcase.  Raises xml.parsers.expat.ExpatError if the stream isn't well-formed XML.
+
+        Required Arguments:
+        stream -- a file-like object opened in binary mode
+        """
+        self.__parser = xml.parsers.expat.ParserCreate()
+        self.__parser.buffer_text = True
+        self.__parser.StartElementHandler = self.__start_element
+        self.__parser.EndElementHandler = self.__end_element
+        self.__parser.XmlDeclHandler = self.__xml_decl
+        # Parser byte offsets count from wherever the stream is now, message references need them relative to the file
+        self.__base = stream.tell() if self.lazy_path is not None else 0
+        _first = True
+        while True:
+            _chunk = stream.read(XmlLoader.read_size)
+            if not _chunk:
+                break
+            if _first and _chunk.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                self.lazy_path = None
+            _first = False
+            self.__parser.Parse(_chunk, False)
+        self.__parser.Parse(b"", True)
+
+
+    def __start_element(self, name, attrs):
+        _parent = self.__elements[-1] if self.__elements else None
+        self.__elements.append(name)
+        if name == "testsuite":
+            self.__suites.append(attrs.get("name"))
+        elif name == "testcase" and _parent == "testsuite":
+            self.__in_case = True
+            self.__case_name = attrs.get("name")
+            self.__case_state = XmlLoader.passed
+            self.__message = None
+        elif self.__in_case and _parent == "testcase":
+            if name == "failure":
+                self.__case_state = XmlLoader.failed
+                # Only the first failure's text is kept, matching get_case_message_xml
+                if self.__message is None and self.lazy_path is not None:
+                    self.__message_start = self.__base + self.__parser.CurrentByteIndex
+                elif self.__message is None:
+                    self.__message_parts = []
+                    self.__parser.CharacterDataHandler = self.__message_parts.append
+            elif name == "skipped" and self.__case_state != XmlLoader.failed:
+                self.__case_state = XmlLoader.skipped
+
+
+    def __end_element(self, name):
+        self.__elements.pop()
+        if name == "testsuite":
+            self.__suites.pop()
+        elif name == "failure" and self.__message_start is not None and self.__elements and self.__elements[-1] == "testcase":
+            self.__message = MessageRef.MessageRef(self.lazy_path, self.__message_start, self.__base + self.__parser.CurrentByteIndex, self.__encoding)
+            self.__message_start = None
+        elif name == "failure" and self.__message_parts is not None and self.__elements and self.__elements[-1] == "testcase":
+            self.__parser.CharacterDataHandler = None
+            self.__message = "".join(self.__message_parts)
+            self.__message_parts = None
+        elif name == "testcase" and self.__in_case and self.__elements and self.__elements[-1] == "testsuite":
+            self.on_case(self.__suites[-1], self.__case_name, self.__case_state, self.__message if self.__message is not None else "")
+            self.__in_case = False
+
+
+    def __xml_decl(self, version, encoding, standalone):
+        # Fragments re-parsed for lazy messages have no declaration of their own, so remember the document's encoding
+        self.__encoding = encoding
@@ -1,24 +1,31 @@
-"""generate_slack_status.py
+"""generate_status.py
 
-This file is simple, it forms a very rigid (fragile) script that will turn a JUnit XML and some metadata
-into a slack status, either "danger" or "good".  Invoke it as follows:
+A lightweight stand-in for `python3 reporter.py st --summary-only` for CI steps that only need the pass/fail status of a
+bundle of JUnit XML results.  It prints the same canary status report and exits 0 on pass and 1 otherwise, but only loads
+the StatusSummary and ResultsDiscovery modules - not the report generators or PyGithub - so it starts in a fraction of the
+time.  Invoke it as follows:
 
-python3 generate_slack_message.py <xml results folder filepath>
+python3 datamodel/generate_status.py <xml results folder filepath> [<xml results folder filepath> ...] [-eg 100] [-pg 100]
 
 """
 
-import sys, os, glob, math, untangle, xml
-from helpers import *
+import sys, os, argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datamodel import ResultsDiscovery, StatusSummary
 
 if __name__ == "__main__":
 
-    if len(sys.argv) < 2:
-        print("""
-Missing arguments!  
-Usage: python3 generate_slack_status.py <xml results folder filepath>
-""")
-        exit(1)
+    parser = argparse.ArgumentParser(description="Generate a canary status from JUnit XML results, exit with 0 on pass and 1 otherwise.")
+    parser.add_argument('results_directory', nargs='+', metavar='RESULTS_DIR',
+        help="Directories containing JUnit XML results files, or .zip/.tar.gz archives of them.")
+    parser.add_argument('-eg', '--executed-quality-gate', default='100',
+        help="Percentage of the test suites that must be executed (not skipped) to count as a quality result.")
+    parser.add_argument('-pg', '--passing-quality-gate', default='100',
+        help="Percentage of the executed test cases that must pass to count as a quality result.")
+    parser.add_argument('-rec', '--recursive', action='store_true',
+        help="If provided - also load results files from subdirectories of each RESULTS_DIR.")
+    args = parser.parse_args()
 
-    _test_filename = sys.argv[1]
-    exit(get_status(_test_filename))
-            
\ No newline at end of file
+    _files = ResultsDiscovery.ResultsDiscovery(recursive=args.recursive).discover(args.results_directory)
+    exit(StatusSummary.StatusSummary.print_status(StatusSummary.StatusSummary(files=_files),
+        int(args.executed_quality_gate), int(args.passing_quality_gate)))
@@ -0,0 +1,97 @@
+"""ArchiveLoader
+
+Loads results straight out of .zip and .tar(.gz/.bz2/.xz) bundles, so CI artifacts don't need to be extracted to disk first.
+Each *.xml member is streamed from the archive into the registered XML loader - nothing is written to a temporary file, and
+members that aren't XML are never handed to a parser.  Results are recorded against "<archive>/<member>" file names.
+"""
+
+import bz2, lzma, os, sys, tarfile, zipfile, zlib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import LoaderRegistry
+from datamodel import ResultsAggregator as ra
+
+class ArchiveLoader():
+
+    # Only archive members with this suffix are read
+    member_suffix = ".xml"
+
+    zip_magic = (b"PK\x03\x04", b"PK\x05\x06")
+    # Compressed streams tarfile can open, and a decompressor for each - the start of the stream is decompressed to check
+    # for a tar header inside, so compressed results files (ex. results.xml.gz) aren't mistaken for archives
+    tar_compressed_magic = {
+        b"\x1f\x8b": lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+        b"BZh": bz2.BZ2Decompressor,
+        b"\xfd7zXZ\x00": lzma.LZMADecompressor
+    }
+    tar_magic_offset = 257
+    tar_magic = b"ustar"
+
+
+    def sniff_zip(head):
+        """Binary sniffer for zip archives."""
+        return head.startswith(ArchiveLoader.zip_magic)
+
+
+    def sniff_tar(head):
+        """Binary sniffer for (POSIX/GNU format) tar archives, plain or gzip/bzip2/xz compressed."""
+        for _magic, _decompressor in ArchiveLoader.tar_compressed_magic.items():
+            if head.startswith(_magic):
+                try:
+                    head = _decompressor().decompress(head)
+                except (zlib.error, OSError, EOFError, lzma.LZMAError):
+                    return False
+                break
+        return head[ArchiveLoader.tar_magic_offset:ArchiveLoader.tar_magic_offset + len(ArchiveLoader.tar_magic)] == ArchiveLoader.tar_magic
+
+
+    def load_zip(aggregator, stream, filename):
+        """Loader for zip archives - registered with the LoaderRegistry as "zip".  Only *.xml members are decompressed.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert results into
+        stream      --  a seekable binary stream of the zip archive
+        filename    --  the name of the archive the stream was opened from
+        """
+        try:
+            with zipfile.ZipFile(stream) as _zip:
+                for _info in _zip.infolist():
+                    if _info.is_dir() or not _info.filename.endswith(ArchiveLoader.member_suffix):
+                        continue
+                    with _zip.open(_info) as _member:
+                        ArchiveLoader.load_member(aggregator, _member, f"{filename}/{_info.filename}")
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, EOFError) as ex:
+            ArchiveLoader.insert_load_failure(aggregator, filename, ex)
+
+
+    def load_tar(aggregator, stream, filename):
+        """Loader for tar archives - registered with the LoaderRegistry as "tar".  The archive is read in a single forward pass.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert results into
+        stream      --  a binary stream of the (optionally compressed) tar archive
+        filename    --  the name of the archive the stream was opened from
+        """
+        try:
+            # Stream mode ("r|*") reads members in order without seeking, so nothing beyond the current member is buffered
+            with tarfile.open(fileobj=stream, mode="r|*") as _tar:
+                for _info in _tar:
+                    if not _info.isfile() or not _info.name.endswith(ArchiveLoader.member_suffix):
+                        continue
+                    ArchiveLoader.load_member(aggregator, _tar.extractfile(_info), f"{filename}/{_info.name}")
+        except (tarfile.TarError, EOFError, OSError) as ex:
+            ArchiveLoader.insert_load_failure(aggregator, filename, ex)
+
+
+    def load_member(aggregator, stream, member_name):
+        """Hand one archive member's stream to the XML loader."""
+        LoaderRegistry.LoaderRegistry.get_loader("xml")(aggregator, stream, member_name)
+
+
+    def insert_load_failure(aggregator, filename, ex):
+        """Record an unreadable archive as a failed result, the same way unparsable results files are."""
+        print(f"{filename} could not be read as an archive: {ex}", file=sys.stderr)
+        aggregator.insert_result(f"{filename}", ra.ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} could not be read as an archive ({ex}).  Marking as a failure."})
+
+
+LoaderRegistry.LoaderRegistry.register("zip", ArchiveLoader.sniff_zip, ArchiveLoader.load_zip, binary=True)
+LoaderRegistry.LoaderRegistry.register("tar", ArchiveLoader.sniff_tar, ArchiveLoader.load_tar, binary=True)
@@ -0,0 +1,116 @@
+"""GinkgoLoader
+
+Loads the JSON reports Ginkgo v2 writes with --json-report directly, so Go component suites don't need converting to JUnit
+XML first.  A report is a list of suite reports, each with a SpecReports list - specs are streamed out of the file and
+inserted one at a time, so only one spec is held in memory however large the report is.
+
+Results are recorded the way Ginkgo's own JUnit reporter names them - testsuite is the suite description and name is
+"[<node type>] <container and spec text> [<labels>]" - so ignorelists and reports written against converted XML still
+apply.  Priority, severity, and squad tags are read from "[priority][severity][squad1,squad2]" tags in the spec text like
+JUnit test names, and spec labels override them: "p1"-style labels set the priority, "sev1"-style labels the severity, and
+"squad:<name>" labels the squads.  Failure messages include where the spec failed and are always held in memory - the
+JSON-escaped text in the file can't be referenced in place like an XML failure message.
+"""
+
+import os, re, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import JsonStreamReader, LoaderRegistry
+from datamodel import ResultsAggregator as ra
+
+class GinkgoLoader():
+
+    # Ginkgo spec states that aren't reported as failures - every other state (failed, panicked, timedout, ...) is
+    states = {
+        "passed": ra.ResultsAggregator.passed,
+        "skipped": ra.ResultsAggregator.skipped,
+        "pending": ra.ResultsAggregator.skipped
+    }
+
+    # Labels read as priority, severity, and squad tags, ex. Label("p2", "sev1", "squad:search")
+    priority_label = re.compile(r"p\d+", re.IGNORECASE)
+    severity_label = re.compile(r"sev\d+", re.IGNORECASE)
+    squad_label_prefix = "squad:"
+
+    __report_start = re.compile(r'\[\s*\{\s*"Suite(Path|Description)"\s*:')
+
+
+    def sniff(text):
+        """Sniffer for Ginkgo JSON reports - a list of objects opening with Ginkgo's suite report fields."""
+        return GinkgoLoader.__report_start.match(text) is not None
+
+
+    def load(aggregator, stream, filename):
+        """Loader for Ginkgo v2 JSON reports - registered with the LoaderRegistry as "ginkgo".
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert results into
+        stream      --  a binary stream of a Ginkgo JSON report
+        filename    --  the name of the file the stream was opened from, recorded in each result's metadata
+        """
+        try:
+            for _suite, _specs in JsonStreamReader.JsonStreamReader(stream).iter_objects("SpecReports"):
+                for _spec in _specs:
+                    # SuiteDescription precedes SpecReports in Ginkgo's reports, so it's read by the time specs are
+                    _testsuite = _suite.get("SuiteDescription") or _suite.get("SuitePath") or filename
+                    GinkgoLoader.insert_spec(aggregator, _testsuite, _spec, filename)
+        except (ValueError, KeyError, TypeError, AttributeError) as ex: # not JSON, or not a Ginkgo report
+            print(f"{filename} could not be loaded as a Ginkgo JSON report: {ex!r}")
+            aggregator.insert_result(f"{filename}", ra.ResultsAggregator.failed, f"Load {filename}", {"message": f"{filename} not in Ginkgo JSON report format ({ex!r}).  Marking as a failure."})
+
+
+    def insert_spec(aggregator, testsuite, spec, filename):
+        """Insert one Ginkgo spec report into the aggregate.
+
+        Required Arguments:
+        aggregator  --  the ResultsAggregator to insert the result into
+        testsuite   --  the testsuite to record the spec under
+        spec        --  a decoded entry of a suite report's SpecReports
+        filename    --  the report file the spec was loaded from
+        """
+        _text = " ".join(t for t in (spec.get("ContainerHierarchyTexts") or []) + [spec.get("LeafNodeText", "")] if t)
+        _labels = GinkgoLoader.get_labels(spec)
+        # Named like Ginkgo's JUnit reporter names test cases
+        _name = f"[{spec['LeafNodeType']}] {_text}".strip()
+        if _labels:
+            _name = f"{_name} [{', '.join(_labels)}]"
+        _state = GinkgoLoader.states.get(spec['State'], ra.ResultsAggregator.failed)
+        _message = GinkgoLoader.get_message(spec) if _state == ra.ResultsAggregator.failed else ""
+        _metadata = ra.ResultsAggregator.get_case_metadata(_text, _message, filename)
+        _squads = []
+        for _label in _labels:
+            if GinkgoLoader.priority_label.fullmatch(_label):
+                _metadata['priority'] = _label
+            elif GinkgoLoader.severity_label.fullmatch(_label):
+                _metadata['severity'] = _label
+            elif _label.startswith(GinkgoLoader.squad_label_prefix) and len(_label) > len(GinkgoLoader.squad_label_prefix):
+                _squads.append(_label[len(GinkgoLoader.squad_label_prefix):].strip())
+        if _squads:
+            _metadata['squad(s)'] = _squads
+        aggregator.insert_result(testsuite, _state, _name, _metadata)
+
+
+    def get_labels(spec):
+        """Return a spec's labels - those of its containers, then its own - without duplicates, as Ginkgo reports them."""
+        _labels = []
+        for _container_labels in (spec.get("ContainerHierarchyLabels") or []) + [spec.get("LeafNodeLabels")]:
+            for _label in _container_labels or []:
+                if _label not in _labels:
+                    _labels.append(_label)
+        return _labels
+
+
+    def get_message(spec):
+        """Return the failure message of a failed spec, with the node and location it failed at, as Ginkgo's JUnit reporter writes it."""
+        _failure = spec.get("Failure") or {}
+        _location = _failure.get("Location") or {}
+        _message = f"[{spec['State'].upper()}] {_failure.get('Message', '')}"
+        if _location:
+            _message += f"\nIn [{_failure.get('FailureNodeType', spec['LeafNodeType'])}] at: {_location.get('FileName', '')}:{_location.get('LineNumber', '')}"
+        if _failure.get("ForwardedPanic"):
+            _message += f"\n\n{_failure['ForwardedPanic']}"
+        if _location.get("FullStackTrace"):
+            _message += f"\n\nFull Stack Trace\n{_location['FullStackTrace']}"
+        return _message
+
+
+LoaderRegistry.LoaderRegistry.register("ginkgo", GinkgoLoader.sniff, GinkgoLoader.load)
@@ -0,0 +1,181 @@
+"""CombinedGenerator
+
+An AbstractGenerator and ReportGenerator implementation that loads results once and emits every report format from them as part of the canary reporting CLI.
+This class can generate its CLI parser, load args, generate a single ResultsAggregator object, and hand it to the status, slack, markdown, json, and GitHub issue generators.
+"""
+
+import os, sys, json, argparse
+from generators import AbstractGenerator,ReportGenerator,ReportWriter
+from generators import StatusGenerator, SlackGenerator, MarkdownGenerator, JsonGenerator, GitHubIssueGenerator
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, PrefetchReader
+
+class CombinedGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
+
+    def __init__(self, results_dirs, snapshot=None, branch=None, verification_level=None, stage=None, hub_version=None,
+        hub_platform=None, import_cluster_details=[], job_url=None, build_id=None,
+        md_url=None, sd_url=None, issue_url=None, must_gather_url=None, results_url=None, tags=[],
+        ignorelist=[], passing_quality_gate=100, executed_quality_gate=100, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, group_messages=False, aggregated_results=None):
+        """Create a CombinedGenerator Object, unroll xml files from input, initialize a single ResultsAggregator, and wrap it in each report generator.
+
+        Required Arguments:
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
+
+        Keyword Arguments:
+        snapshot    --  a string representation of the snapshot that these test results represent, ex. 2.2.0-SNAPSHOT-timestamp
+        branch      --  a string representaiton of the integration test branch that generated the xml results, ex. 2.2-integration
+        verification_level  --  the level of verification testing that this report was generated on
+        stage       --  a string representaiton of the integration test stage/step that generated the xml results, ex deploy
+        hub_version     --  a string representation of the hub cluster version that was tested
+        hub_platform    --  a string representation of the hub cluster's hosting cloud platform
+        import_cluster_details  --  a list of dicts, each identifying an import cluster's clustername, version, and platform
+        job_url     --  the URL of the CI job that produced this JUnit XML, ex. $TRAVIS_BUILD_WEB_URL
+        build_id    --  CI build id (unique identifier) that produced this JUnit XML, ex. $TRAVIS_BUILD_ID
+        md_url      --  the URL of any hosted md report generated previously from this XML
+        sd_url      --  the URL of any snapshot diff report generated previously for this snapshot
+        issue_url   --  the URL of any opened git issue related to this JUnit XML
+        must_gather_url     --  the URL of an s3 bucket containing must-gather data from this test
+        results_url         --  the URL of an s3 bucket containing the raw XML results from this test
+        tags        --  a list of github tags that would be applied to the git issue
+        ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
+        passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
+        executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        group_messages  --  list tests that failed with the same message together in the markdown and GitHub issue reports
+        aggregated_results  --  an already-built ResultsAggregator to report on - results_dirs is ignored if this is set
+        """
+        self.results_files = []
+        if aggregated_results is not None:
+            self.aggregated_results = aggregated_results
+        else:
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
+        # Every generator below reports on the one aggregate built above - none of them touch the results files
+        _common = {
+            "snapshot": snapshot,
+            "branch": branch,
+            "verification_level": verification_level,
+            "stage": stage,
+            "hub_version": hub_version,
+            "hub_platform": hub_platform,
+            "import_cluster_details": import_cluster_details,
+            "job_url": job_url,
+            "build_id": build_id,
+            "ignorelist": ignorelist,
+            "passing_quality_gate": passing_quality_gate,
+            "executed_quality_gate": executed_quality_gate,
+            "aggregated_results": self.aggregated_results
+        }
+        self.status_generator = StatusGenerator.StatusGenerator([], ignorelist=ignorelist, passing_quality_gate=passing_quality_gate,
+            executed_quality_gate=executed_quality_gate, aggregated_results=self.aggregated_results)
+        self.slack_generator = SlackGenerator.SlackGenerator([], md_url=md_url, sd_url=sd_url, issue_url=issue_url, **_common)
+        self.markdown_generator = MarkdownGenerator.MarkdownGenerator([], sd_url=sd_url, issue_url=issue_url, group_messages=group_messages, **_common)
+        self.json_generator = JsonGenerator.JsonGenerator([], issue_url=issue_url, **_common)
+        self.github_issue_generator = GitHubIssueGenerator.GitHubIssueGenerator([], sd_url=sd_url, md_url=md_url, must_gather_url=must_gather_url,
+            results_url=results_url, tags=tags, dry_run=True, output_file=None, group_messages=group_messages, **_common)
+
+
+    def set_aggregated_results(self, aggregated_results):
+        """Point this generator and every report generator it wraps at a new ResultsAggregator, ex. after a --watch poll.
+
+        Required Arguments:
+        aggregated_results  --  the ResultsAggregator to report on
+        """
+        self.aggregated_results = aggregated_results
+        for _sub_generator in [self.status_generator, self.slack_generator, self.markdown_generator, self.json_generator, self.github_issue_generator]:
+            _sub_generator.aggregated_results = aggregated_results
+
+
+    def generate_subparser(subparser):
+        """Static method to generate a subparser for the CombinedGenerator module.
+
+        Required Argument:
+        subparser -- an argparse.ArgumentParser object to extend with a new subparser.
+        """
+        subparser_name = 'all'
+        all_parser = subparser.add_parser(subparser_name, parents=[ReportGenerator.ReportGenerator.generate_parent_parser()],
+            help="Load JUnit XML test results once and generate any combination of report formats, exit with 0 on pass and 1 otherwise.",
+            formatter_class=argparse.RawTextHelpFormatter,
+            epilog="""
+Example Usages:
+
+    Generate slack, markdown, json, and GitHub issue reports from the JUnit xml in the 'junit_xml' folder in one pass, exiting with the status gate result:
+        python3 reporter.py all junit_xml/ -o-slack slack.json -o-md report.md -o-json results.json -o-gh github.md
+""")
+        all_parser.add_argument('-o-slack', '--slack-output-file',
+            help="Destination file for the slack message json payload.  Not generated if omitted.")
+        all_parser.add_argument('-o-md', '--markdown-output-file',
+            help="Destination file for the markdown report.  Not generated if omitted.")
+        all_parser.add_argument('-o-json', '--json-output-file',
+            help="Destination file for the raw JSON results.  Not generated if omitted.")
+        all_parser.add_argument('-o-gh', '--github-output-file',
+            help="Destination file for the GitHub issue markdown.  Not generated if omitted.  No issue is opened, use the gh subcommand for that.")
+        all_parser.add_argument('-md', '--markdown-url',
+            help="URL of the markdown report file artifact associated with this report.")
+        all_parser.add_argument('-sd', '--snapshot-diff-url',
+            help="URL of the snapshot diff file artifact associated with this report.")
+        all_parser.add_argument('-iu', '--issue-url', default=os.getenv('GIT_ISSUE_URL'),
+            help="URL of the github/jira/tracking issue associated with this report.")
+        all_parser.add_argument('-ru', '--results-url',
+            help="URL of the S3 bucket containing full results artifacts.")
+        all_parser.add_argument('-mg', '--must-gather-url',
+            help="URL of the S3 bucket containing must-gather artifacts.")
+        all_parser.add_argument('-t', '--tags', action='append', default=[],
+            help="GitHub issue tags to list in the GitHub issue report.")
+        all_parser.add_argument('-gm', '--group-messages', action='store_true',
+            help="If provided - list failing tests that share a failure message together in the markdown and GitHub issue reports.")
+        all_parser.set_defaults(func=CombinedGenerator.generate_all_from_args)
+        return subparser_name, all_parser
+
+
+    def generate_all_from_args(args):
+        """Static method to create a CombinedGenerator object and generate every requested report from the command-line args.
+
+        Required Argument:
+        args -- argparse-generated arguments from an argparse with a parser generated by CombinedGenerator.generate_subparser()
+        """
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
+        _generator = CombinedGenerator(args.results_directory, snapshot=args.snapshot, branch=args.branch,
+            verification_level=ReportGenerator.ReportGenerator.get_verification_level(args.verification_level, args.branch), stage=args.stage,
+            hub_version=args.hub_version, hub_platform=args.hub_platform, import_cluster_details=ReportGenerator.ReportGenerator.load_import_cluster_details(args),
+            job_url=args.job_url, build_id=args.build_id, md_url=args.markdown_url, sd_url=args.snapshot_diff_url, issue_url=args.issue_url,
+            must_gather_url=args.must_gather_url, results_url=args.results_url, tags=args.tags, ignorelist=_ignorelist,
+            executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate),
+            jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args),
+            lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir, group_messages=args.group_messages, aggregated_results=ra.ResultsAggregator() if args.watch else None)
+        def _write_reports(aggregated_results):
+            _generator.set_aggregated_results(aggregated_results)
+            ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, aggregated_results)
+            return _generator.generate_reports(slack_file=args.slack_output_file, markdown_file=args.markdown_output_file,
+                json_file=args.json_output_file, github_file=args.github_output_file)
+        if args.watch:
+            exit(ReportGenerator.ReportGenerator.watch_results(args, _ignorelist, _write_reports))
+        exit(_write_reports(_generator.aggregated_results))
+
+
+    def generate_reports(self, slack_file=None, markdown_file=None, json_file=None, github_file=None):
+        """Macro function to write each requested report and print the status report - will return a 0 if passing, 1 otherwise.
+
+        Keyword Arguments:
+        slack_file      --  destination for the slack message json payload, skipped if None
+        markdown_file   --  destination for the markdown report, skipped if None
+        json_file       --  destination for the raw JSON results, skipped if None
+        github_file     --  destination for the GitHub issue markdown, skipped if None
+        """
+        if slack_file is not None:
+            with open(slack_file, "w+") as f:
+                f.write(json.dumps({"text": self.slack_generator.generate_slack_report()}))
+        if markdown_file is not None:
+            ReportWriter.ReportWriter.write_report(self.markdown_generator.iter_markdown_report(), markdown_file)
+        if json_file is not None:
+            ReportWriter.ReportWriter.write_report(self.json_generator.iter_json_report(), json_file)
+        if github_file is not None:
+            ReportWriter.ReportWriter.write_report(GitHubIssueGenerator.GitHubIssueGenerator.iter_pages_file(self.github_issue_generator.generate_github_issue_pages()), github_file)
+        return self.status_generator.generate_status()
@@ -4,11 +4,12 @@ An AbstractGenerator and ReportGenerator implementation to generate a markdown r
 This class can generate its CLI parser, load args, generate a ResultsAggregator object, and format the output data as a md report. 
 """
 
-import os, sys, json, argparse, itertools, db_utils, re
+import os, sys, json, argparse, db_utils, re
 from github import Github, UnknownObjectException
-from generators import AbstractGenerator,ReportGenerator
+from generators import AbstractGenerator,ReportGenerator,ReportWriter
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, PrefetchReader
 from random import randrange
 from datetime import datetime
 
@@ -58,16 +59,23 @@ class GitHubIssueGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.
         "Priority/P3"
     ]
 
+    # GitHub rejects issue and comment bodies longer than this many characters
+    max_body_length = 65536
+    # Failures that don't fit in an issue's body overflow into at most this many comments - any beyond those are only counted
+    max_overflow_comments = 10
+    # With group_messages, at most this many of the tests sharing a failure message are listed by name
+    max_grouped_tests = 100
+
     def __init__(self, results_dirs, snapshot=None, branch=None, verification_level=None, stage=None, hub_version=None, 
         hub_platform=None, import_cluster_details=[], job_url=None, build_id=None,
         sd_url=None, md_url=None, must_gather_url=None, results_url=None, ignorelist=[], assigneelist={},
         passing_quality_gate=100, executed_quality_gate=100, github_token=os.getenv('GITHUB_TOKEN'), github_org=["stolostron"],
         github_repo=["cicd-staging"], tags=[], dry_run=True, output_file="github.md",
-        consolidated_defect=True, persquad_defect=False):
+        consolidated_defect=True, persquad_defect=False, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, group_messages=False, aggregated_results=None):
         """Create a GitHubIssueGenerator Object, unroll xml files from input, and initialize a ResultsAggregator.  
 
         Required Arguments:
-        results_dirs    -- a list of directories that contain XML files from which to generate an aggregate report
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
 
         Keyword Arguments:
         snapshot    --  a string representation of the snapshot that these test results represent, ex. 2.2.0-SNAPSHOT-timestamp
@@ -95,6 +103,15 @@ class GitHubIssueGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.
         output_file --  a place to output the git issue's raw markdown, especially useful when using dry-run
         consolidated_defect --  original, consolidated defect creation in github when dry_run is not on
         persquad_defect --  create issues only if a unique set of failures appears by squad (and dry_run is not on) - requires database connection
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        group_messages  --  list tests that failed with the same message together under one copy of the message
+        aggregated_results  --  an already-built ResultsAggregator to report on - results_dirs is ignored if this is set
         """
         self.snapshot = snapshot
         self.branch = branch
@@ -112,6 +129,7 @@ class GitHubIssueGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.
         self.assigneelist = assigneelist
         self.passing_quality_gate = passing_quality_gate
         self.executed_quality_gate = executed_quality_gate
+        self.group_messages = group_messages
         self.results_files = []
         self.github_token = github_token
         self.github_org = github_org
@@ -121,19 +139,13 @@ class GitHubIssueGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.
         self.output_file = output_file
         self.consolidated_defect = consolidated_defect
         self.persquad_defect = persquad_defect
-        if verification_level is not None:
-            self.verification_level = verification_level
-        elif branch is None:
-            self.verification_level = "Verification Test"
+        self.verification_level = ReportGenerator.ReportGenerator.get_verification_level(verification_level, branch)
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
         else:
-            self.verification_level = "BVT" if re.match(r".*-integration\b", branch) else "SVT" if re.match(r".*-dev\b", branch) else "SVT-Extended" if re.match(r".*-nightly\b" ,branch) else "Verification Test"
-        for _results_dir in results_dirs:
-            _files_list = os.listdir(_results_dir)
-            for _f in _files_list:
-                _full_path = os.path.join(_results_dir, _f)
-                if os.path.isfile(_full_path) and _full_path.endswith('.xml'):
-                    self.results_files.append(_full_path)
-        self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist)
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
 
     def generate_subparser(subparser):
         """Static method to generate a subparser for the GitHubIssueGenerator module.  
@@ -198,6 +210,8 @@ Example Usages:
             help="GitHub issue tags to apply to the created issue.  Only applied if the tags exist on the target repository.")
         gh_parser.add_argument('-al', '--assignee-list',
             help="GitHub issue assignee for the created issue(s).  Only applied if the assignees exist on the target repository.")
+        gh_parser.add_argument('-gm', '--group-messages', action='store_true',
+            help="If provided - list failing tests that share a failure message together under a single copy of the message.")
         gh_parser.set_defaults(func=GitHubIssueGenerator.generate_github_issue_from_args)
         return subparser_name, gh_parser
 
@@ -208,14 +222,11 @@ Example Usages:
         Required Argument:
         args -- argparse-generated arguments from an argparse with a parser generated by GitHubIssueGenerator.generate_subparser()
         """
-        _ignorelist = []
-        if args.ignore_list is not None and os.path.isfile(args.ignore_list):
-            try:
-                with open(args.ignore_list, "r+") as f:
-                    _il = json.loads(f.read())
-                _ignorelist = _il['ignored_tests']
-            except json.JSONDecodeError as ex:
-                print(f"Ignorelist found in {args.ignore_list} was not in JSON format, ignoring the ignorelist. Ironic.", file=sys.stderr, flush=False)
+        if args.watch:
+            # Every batch would open (or dedupe against) issues for a partial set of results
+            print("--watch isn't supported by gh, generate the issue once all results have landed.", file=sys.stderr)
+            exit(1)
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
         _assigneelist = {}
         if args.assignee_list is not None and os.path.isfile(args.assignee_list):
             try:
@@ -223,31 +234,16 @@ Example Usages:
                     _assigneelist = json.loads(f.read())
             except json.JSONDecodeError as ex:
                 print(f"AssigneeList found in {args.assignee_list} was not in JSON format, ignoring the assigneelist.", file=sys.stderr, flush=False)
-        _import_cluster_details = []
-        if args.import_cluster_details_file is not None and os.path.isfile(args.import_cluster_details_file):
-            try:
-                with open(args.import_cluster_details_file, "r+") as f:
-                    _import_cluster_details = json.loads(f.read())
-            except json.JSONDecodeError as ex:
-                print(f"Import cluster details found in {args.import_cluster_details_file} was not in JSON format, ignoring.", file=sys.stderr, flush=False)
-        elif args.import_version or args.import_platform:
-            _import_cluster = {
-                "clustername": ""
-            }
-            _import_cluster["version"] = args.import_version if args.import_version else ""
-            _import_cluster["platform"] = args.import_platform if args.import_platform else ""
-            _import_cluster_details.append(_import_cluster)
-        if args.verification_level is not None:
-            _verification_level = args.verification_level
-        else:
-            _verification_level = "BVT" if re.match(r".*-integration\b", args.branch) else "SVT" if re.match(r".*-dev\b", args.branch) else "SVT-Extended" if re.match(r".*-nightly\b" , args.branch) else "Verification Test"
+        _import_cluster_details = ReportGenerator.ReportGenerator.load_import_cluster_details(args)
+        _verification_level = ReportGenerator.ReportGenerator.get_verification_level(args.verification_level, args.branch)
         _generator = GitHubIssueGenerator(args.results_directory, snapshot=args.snapshot, branch=args.branch, verification_level=_verification_level, stage=args.stage,
             hub_version=args.hub_version, hub_platform=args.hub_platform,
             import_cluster_details=_import_cluster_details, job_url=args.job_url, build_id=args.build_id, ignorelist=_ignorelist, assigneelist=_assigneelist,
-            sd_url=args.snapshot_diff_url, md_url=args.markdown_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate),
+            sd_url=args.snapshot_diff_url, md_url=args.markdown_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args), lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir,
             results_url=args.results_url, must_gather_url=args.must_gather_url, github_token=args.github_token, github_org=args.github_organization,
             github_repo=args.repo, tags=args.tags, dry_run=args.dry_run, output_file=args.output_file,
             consolidated_defect=args.consolidated_defect, persquad_defect=args.persquad_defect)
+        ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, _generator.aggregated_results)
         _message = _generator.open_github_issue()
         _generator.open_github_issues()
 
@@ -257,19 +253,11 @@ Example Usages:
         # Connect to our duplicate detection database
         db_utils.connect_to_db()
 
-        # Get all results of this canary test
-        _results = self.aggregated_results.get_results()
-        # Get just the failed tests
-        _failures = list(filter(lambda a: a['state'] == "failed", _results))
-        # Get a view of just the metadata to extract the list of squads
-        _metadata = []
-        for f in _failures:
-            _metadata.append(f['metadata'])
-        # What are the unique squads in that metadata?
-        _squads = list(set(itertools.chain(*map(lambda r: r.get('squad(s)', "Unlabelled"), _metadata))))
+        # Partition the failed tests of this canary test by squad, and render the parts every squad's issue shares once
+        _failures_by_squad = self.get_failures_by_squad()
+        _head = self.generate_github_issue_head()
         # Iterate over all squads and open an issue for that squad if one doesn't already exist for this set of failures
-        for squad in _squads:
-            _squad_issue_set = list(filter(lambda a: a['metadata']['squad(s)'][0] == squad, _failures))
+        for squad, _squad_issue_set in _failures_by_squad.items():
             # Need to flatten issue set down to name, testsuite, squad, pri, sev
             _flat_issue_set = []
             _highest_sev=len(GitHubIssueGenerator.tag_mappings)
@@ -297,7 +285,7 @@ Example Usages:
                     _tags.append(GitHubIssueGenerator.severities[_highest_sev])
                     _tags.append(GitHubIssueGenerator.priorities[_highest_pri])
                     _tags.append("squad:{}".format(squad))
-                    github_id = self.open_github_issue_per_squad(_tags, squad)
+                    github_id = self.open_github_issue_per_squad(_tags, squad, pages=self.generate_github_issue_pages(_squad_issue_set, head=_head))
                     if github_id == None:
                         github_id = "seed{}".format(randrange(100000,999999))
                     # Needed because "Object of type datetime is not JSON serializable"
@@ -313,9 +301,14 @@ Example Usages:
         if defectCreated == False:
             print("*No defect(s) created due to duplicate detection* :im-helping:")
 
-    def open_github_issue_per_squad(self, _tags, squad):
-        """Macro function to assemble and open GitHub Issues, one per squad.  This wraps the title, body, and tag assembly and issue generation."""
-        _message = self.generate_github_issue_body()
+    def open_github_issue_per_squad(self, _tags, squad, pages=None):
+        """Macro function to assemble and open GitHub Issues, one per squad.  This wraps the title, body, and tag assembly and issue generation.
+        The issue only lists the squad's own failures.
+
+        Keyword Arguments:
+        pages   --  the squad's issue body and overflow comments, if already rendered by generate_github_issue_pages()
+        """
+        _pages = self.generate_github_issue_pages(self.get_failures_by_squad().get(squad, [])) if pages is None else pages
         _github_tags_objects = []
         _assignees=[]
         if self.persquad_defect and not self.dry_run:
@@ -341,7 +334,7 @@ Example Usages:
                     print(f"No user for {tag}, skipping and continuing.", file=sys.stderr, flush=False)
                     pass
             _issue_title = "{}:{}".format(self.generate_issue_title(),squad)
-            _issue = repo.create_issue(_issue_title, body=_message[:65535], labels=_github_tags_objects, assignees=_assignees)
+            _issue = GitHubIssueGenerator.create_issue(repo, _issue_title, _pages, _github_tags_objects, _assignees)
             print("*squad:{}* opened issue URL: {}".format(squad, _issue.html_url))
             return _issue.number
         else:
@@ -358,12 +351,10 @@ Example Usages:
 
     def open_github_issue(self):
         """Macro function to assemble and open our GitHub Issue.  This wraps the title, body, and tag assembly and issue generation."""
-        _message = self.generate_github_issue_body()
-
         _tags = self.generate_tags()
+        _pages = self.generate_github_issue_pages()
         if self.output_file is not None:
-            with open(self.output_file, "w+") as f:
-                f.write(_message)
+            ReportWriter.ReportWriter.write_report(GitHubIssueGenerator.iter_pages_file(_pages), self.output_file)
         if self.consolidated_defect and not self.dry_run:
             try:
                 g = Github(self.github_token)
@@ -387,7 +378,7 @@ Example Usages:
                 except UnknownObjectException as ex:
                     print(f"No user for {tag}, skipping and continuing.", file=sys.stderr, flush=False)
                     pass
-            _issue = repo.create_issue(self.generate_issue_title(), body=_message[:65535], labels=_github_tags_objects, assignees=_assignees)
+            _issue = GitHubIssueGenerator.create_issue(repo, self.generate_issue_title(), _pages, _github_tags_objects, _assignees)
             print(_issue.html_url)
         else:
             print(f"--dry-run or --no-consolidated-defect has been set, skipping consolidated git issue creation", file=sys.stderr, flush=False)
@@ -402,6 +393,32 @@ Example Usages:
                         print(f"* {self.assigneelist[tag]}", file=sys.stderr, flush=False)
 
 
+    def create_issue(repo, title, pages, labels, assignees):
+        """Static method to open a GitHub issue whose body is pages[0], then post the rest of pages as comments on it, in order.
+        Returns the opened issue.
+
+        Required Arguments:
+        repo        --  the PyGithub Repository to open the issue on
+        title       --  the issue's title
+        pages       --  the issue body and overflow comments, ex. from generate_github_issue_pages()
+        labels      --  PyGithub Labels to apply to the issue
+        assignees   --  PyGithub users to assign the issue to
+        """
+        _issue = repo.create_issue(title, body=pages[0], labels=labels, assignees=assignees)
+        for _comment in pages[1:]:
+            _issue.create_comment(_comment)
+        return _issue
+
+
+    def iter_pages_file(pages):
+        """Static method to yield an issue's body and overflow comments as one markdown document, each comment introduced by an
+        HTML comment marking where it starts - what --output-file shows of the issue that would be posted."""
+        yield pages[0]
+        for i, _comment in enumerate(pages[1:]):
+            yield f"\n<!-- Comment {i + 1} of {len(pages) - 1} -->\n"
+            yield _comment
+
+
     def generate_tags(self):
         _unique_tags = self.aggregated_results.get_unique_tags_from_failures()
         _unique_tags = [t if GitHubIssueGenerator.tag_mappings.get(t.lower(), None) is None else GitHubIssueGenerator.tag_mappings.get(t.lower(), None) for t in _unique_tags]
@@ -433,14 +450,136 @@ Example Usages:
 
     def generate_github_issue_body(self):
         """Macro function to assemble our GitHub Issue.  This wraps the header, metadata, summary, and body generation with a neat bow."""
-        # Generate GitHub Issue Test
-        _report = ""
-        _report = _report + self.generate_header() + "\n"
-        _report = _report + self.generate_metadata() + "\n"
-        _report = _report + self.generate_summary() + "\n"
-        _report = _report + self.generate_body() + "\n"
-        # Create GitHub Issue with generated report body
-        return _report
+        return "".join(self.iter_github_issue_body())
+
+
+    def iter_github_issue_body(self):
+        """Yield our GitHub Issue body in chunks - a section or failure at a time - for a ReportWriter to write out without
+        building the whole body in memory.  The chunks join up to exactly generate_github_issue_body()."""
+        yield self.generate_header() + "\n"
+        yield self.generate_metadata() + "\n"
+        yield self.generate_summary() + "\n"
+        yield from self.iter_body()
+        yield "\n"
+
+
+    def generate_github_issue_head(self):
+        """Generate the header, metadata, and summary that open every GitHub Issue body - the consolidated issue's and each squad's."""
+        return self.generate_header() + "\n" + self.generate_metadata() + "\n" + self.generate_summary() + "\n"
+
+
+    def generate_github_issue_pages(self, results=None, head=None):
+        """Assemble our GitHub Issue as a list of pages - the issue body, then any comments its failures overflow into - each
+        within max_body_length characters.  Failing tests are listed most severe first and rendered one at a time until
+        the pages are full: at most max_overflow_comments comments are used, and failures beyond those are only counted.
+        A failure whose message is too long for a page of its own has its message cut short, keeping its code block
+        closed.  If everything fits in the body, it's exactly generate_github_issue_body().
+
+        Keyword Arguments:
+        results --  the failures to list, ex. one squad's from get_failures_by_squad() - all failing and ignored tests if omitted
+        head    --  the generate_github_issue_head() to open the body with, so it can be rendered once for many issues
+        """
+        _page = self.generate_github_issue_head() if head is None else head
+        if results is None:
+            _total, _passed, _failed, _skipped, _ignored = self.aggregated_results.get_counts()
+            _failures = _failed + _ignored if _failed > 0 else 0
+        else:
+            _failures = len(results)
+        if _failures == 0:
+            return [_page + "\n"]
+        _page = _page + "## Failing Tests\n\n"
+        _pages = []
+        _listed = 0
+        _page_listed = 0
+        # Every page is left room for the longest line that might end it
+        _reserve = max(len(GitHubIssueGenerator.__continued_line), len(GitHubIssueGenerator.__more_line(_failures)))
+        for _count, _heading, _message in self.iter_failure_entries(results):
+            _entry = GitHubIssueGenerator.__failure_entry(_heading, _message)
+            if len(_page) + len(_entry) + _reserve > GitHubIssueGenerator.max_body_length and _page_listed > 0:
+                if len(_pages) == GitHubIssueGenerator.max_overflow_comments:
+                    break
+                _pages.append(_page + GitHubIssueGenerator.__continued_line)
+                _page = "## Failing Tests (continued)\n\n"
+                _page_listed = 0
+            if len(_page) + len(_entry) + _reserve > GitHubIssueGenerator.max_body_length:
+                _entry = GitHubIssueGenerator.__failure_entry(_heading, _message, GitHubIssueGenerator.max_body_length - len(_page) - _reserve)
+            _page = _page + _entry
+            _listed = _listed + _count
+            _page_listed = _page_listed + 1
+        if _listed < _failures:
+            return _pages + [_page + GitHubIssueGenerator.__more_line(_failures - _listed)]
+        return _pages + [_page + "\n"]
+
+
+    def iter_failure_entries(self, results=None):
+        """Yield a (test count, heading, message) tuple for each failure listed in the body, most severe first - one per failing
+        or ignored test, or with group_messages one per failure message, headed by the tests that failed with it.
+
+        Keyword Arguments:
+        results --  the failures to list - all failing and ignored tests if omitted
+        """
+        if not self.group_messages:
+            if results is None:
+                results = ReportGenerator.ReportGenerator.get_failures_by_severity(self.aggregated_results, states=[ra.ResultsAggregator.failed, ra.ResultsAggregator.ignored])
+            else:
+                results = sorted(results, key=ReportGenerator.ReportGenerator.get_failure_rank)
+            for _result in results:
+                yield 1, f"### {GitHubIssueGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n\n", self.aggregated_results.get_message(_result)
+            return
+        _groups = self.aggregated_results.get_message_groups() if results is None else self.__group_by_message(results)
+        _groups = sorted(_groups, key=lambda g: min(ReportGenerator.ReportGenerator.get_failure_rank(r) for r in g['results']))
+        for _group in _groups:
+            _results = _group['results']
+            if len(_results) == 1:
+                _heading = f"### {GitHubIssueGenerator.status_symbols[_results[0]['state']]} {_results[0]['testsuite']} -> {_results[0]['name']}\n\n"
+            else:
+                _heading = f"### {GitHubIssueGenerator.status_symbols[_results[0]['state']]} {len(_results)} Tests Failed With This Message\n\n"
+                _heading = _heading + "".join(f"* {GitHubIssueGenerator.status_symbols[r['state']]} {r['testsuite']} -> {r['name']}\n" for r in _results[:GitHubIssueGenerator.max_grouped_tests])
+                if len(_results) > GitHubIssueGenerator.max_grouped_tests:
+                    _heading = _heading + f"* …and {len(_results) - GitHubIssueGenerator.max_grouped_tests} more\n"
+                _heading = _heading + "\n"
+            yield len(_results), _heading, _group['message']
+
+
+    def get_failures_by_squad(self):
+        """Partition the failing tests by squad, in a single pass over them - returns a dict of squad name to that squad's
+        failures, in get_results() order.  Each failure is filed under its first squad, or "Unlabelled" if it has none."""
+        _squads = {}
+        for _result in self.aggregated_results.iter_results(states=[ra.ResultsAggregator.failed]):
+            _squads.setdefault((_result['metadata'].get('squad(s)') or ["Unlabelled"])[0], []).append(_result)
+        return _squads
+
+
+    def __group_by_message(self, results):
+        # Group results by failure message like ResultsAggregator.get_message_groups(), keeping their order
+        _groups = {}
+        for _result in results:
+            _message = self.aggregated_results.get_message(_result)
+            _groups.setdefault(_message, {"message": _message, "results": []})['results'].append(_result)
+        return list(_groups.values())
+
+
+    __continued_line = "\n_Failing tests continue in the next comment._\n"
+    __truncated_marker = "\n… (truncated)"
+    __truncated_heading = "* …\n\n"
+
+
+    def __more_line(count):
+        return f"\n_…and {count} more failing " + ("test" if count == 1 else "tests") + " not listed, see the full report._\n"
+
+
+    def __failure_entry(heading, message, limit=None):
+        # Render a failure's heading and message, cutting the message short if the entry would be longer than limit - and
+        # the heading's list of tests too, if that alone is longer
+        _entry = f"{heading}```\n{message}\n```\n"
+        if limit is None or len(_entry) <= limit:
+            return _entry
+        _overhead = len("```\n\n```\n") + len(GitHubIssueGenerator.__truncated_marker)
+        if len(heading) + _overhead > limit:
+            _heading = heading[:max(0, limit - _overhead - len(GitHubIssueGenerator.__truncated_heading))]
+            heading = _heading[:_heading.rfind("\n") + 1] + GitHubIssueGenerator.__truncated_heading
+        _allowance = max(0, limit - len(heading) - _overhead)
+        return f"{heading}```\n{message[:_allowance]}{GitHubIssueGenerator.__truncated_marker}\n```\n"
 
 
     def generate_issue_title(self):
@@ -548,14 +687,18 @@ Example Usages:
     
     def generate_body(self):
         """Generates a summary of our failing tests and their console/error messages."""
-        _body = ""
+        return "".join(self.iter_body())
+
+
+    def iter_body(self):
+        """Yield the failing tests section of generate_body() a failure at a time, most severe first."""
         _total, _passed, _failed, _skipped, _ignored = self.aggregated_results.get_counts()
         if _failed > 0:
-            _body = "## Failing Tests\n\n"
-            _results = self.aggregated_results.get_results()
-            for _result in _results:
-                if _result['state'] == ra.ResultsAggregator.failed or _result['state'] == ra.ResultsAggregator.ignored:
-                    _body = _body + f"### {GitHubIssueGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n\n"
-                    _body = _body + f"```\n{_result['metadata']['message']}\n```\n"
-        return _body
-    
+            yield "## Failing Tests\n\n"
+            for _count, _heading, _message in self.iter_failure_entries():
+                yield GitHubIssueGenerator.__failure_entry(_heading, _message)
+
+
+    def generate_grouped_failures(self):
+        """Generate the failed and ignored tests grouped by failure message, so a message shared by many tests is only listed once."""
+        return "".join(GitHubIssueGenerator.__failure_entry(h, m) for _count, h, m in self.iter_failure_entries()) if self.group_messages else ""
@@ -6,19 +6,30 @@ This class can generate its CLI parser, load args, generate a ResultsAggregator
 
 import os, sys, json, argparse, re
 from re import findall
-from generators import AbstractGenerator,ReportGenerator
+from generators import AbstractGenerator,ReportGenerator,ReportWriter
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, PrefetchReader, CompactResults
 
 class JsonGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
 
+    # Number of results encoded into each chunk by iter_json_report() and the other formats' iterators
+    results_per_chunk = 500
+
+    # Report formats - a JSON document, NDJSON with a line per result and a trailing summary record, or a JSON document
+    # with repeated strings dictionary-encoded (see datamodel/CompactResults.py)
+    json_format = "json"
+    ndjson_format = "ndjson"
+    compact_format = "compact"
+    formats = [json_format, ndjson_format, compact_format]
+
     def __init__(self, results_dirs, snapshot=None, branch=None, verification_level=None, stage=None, hub_version=None, 
         hub_platform=None, import_cluster_details=[], job_url=None, build_id=None,
-        issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100):
+        issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, aggregated_results=None, output_format=json_format):
         """Create a JsonGenerator Object, unroll xml files from input, and initialize a ResultsAggregator.  
 
         Required Arguments:
-        results_dirs    -- a list of directories that contain XML files from which to generate an aggregate report
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
 
         Keyword Arguments:
         snapshot    --  a string representation of the snapshot that these test results represent, ex. 2.2.0-SNAPSHOT-timestamp
@@ -34,6 +45,15 @@ class JsonGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportG
         ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
         passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
         executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        aggregated_results  --  an already-built ResultsAggregator to report on - results_dirs is ignored if this is set
+        output_format   --  the format iter_report() writes, one of JsonGenerator.formats
         """
         self.snapshot = snapshot
         self.branch = branch
@@ -47,20 +67,15 @@ class JsonGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportG
         self.import_cluster_details = import_cluster_details
         self.passing_quality_gate = passing_quality_gate
         self.executed_quality_gate = executed_quality_gate
+        self.output_format = output_format
         self.results_files = []
-        if verification_level is not None:
-            self.verification_level = verification_level
-        elif branch is None:
-            self.verification_level = "Verification Test"
+        self.verification_level = ReportGenerator.ReportGenerator.get_verification_level(verification_level, branch)
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
         else:
-            self.verification_level = "BVT" if re.match(r".*-integration\b", branch) else "SVT" if re.match(r".*-dev\b", branch) else "SVT-Extended" if re.match(r".*-nightly\b" ,branch) else "Verification Test"
-        for _results_dir in results_dirs:
-            _files_list = os.listdir(_results_dir)
-            for _f in _files_list:
-                _full_path = os.path.join(_results_dir, _f)
-                if os.path.isfile(_full_path) and _full_path.endswith('.xml'):
-                    self.results_files.append(_full_path)
-        self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist)
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
 
 
     def generate_subparser(subparser):
@@ -78,11 +93,16 @@ Example Usage:
 
     Generate a parsed and processed JSON representation of the JUnit results in the 'junit_xml' folder and output it to 'out.json':
         python3 reporter.py js junit_xml/ -o out.json    
+
+    Generate the same report with testsuites, squads, severities, and priorities dictionary-encoded, for archiving:
+        python3 reporter.py js junit_xml/ -f compact -o out.json
 """)
         js_parser.add_argument('-iu', '--issue-url', default=os.getenv('GIT_ISSUE_URL'),
             help="URL of the github/jira/tracking issue associated with this report.")
         js_parser.add_argument('-o', '--output-file',
             help="Destination file for slack message.  Message will be output to stdout if left blank.")
+        js_parser.add_argument('-f', '--format', dest='output_format', choices=JsonGenerator.formats, default=JsonGenerator.json_format,
+            help="Format of the report: a JSON document, NDJSON with one result per line followed by a summary record, or compact JSON\nwith repeated strings written once in a string table.  Defaults to json.")
         js_parser.set_defaults(func=JsonGenerator.generate_json_report_from_args)
         return subparser_name, js_parser
 
@@ -93,60 +113,114 @@ Example Usage:
         Required Argument:
         args -- argparse-generated arguments from an argparse with a parser generated by JsonGenerator.generate_subparser()
         """
-        _ignorelist = []
-        if args.ignore_list is not None and os.path.isfile(args.ignore_list):
-            try:
-                with open(args.ignore_list, "r+") as f:
-                    _il = json.loads(f.read())
-                _ignorelist = _il['ignored_tests']
-            except json.JSONDecodeError as ex:
-                print(f"Ignorelist found in {args.ignore_list} was not in JSON format, ignoring the ignorelist. Ironic.")
-        _import_cluster_details = []
-        if args.import_cluster_details_file is not None and os.path.isfile(args.import_cluster_details_file):
-            try:
-                with open(args.import_cluster_details_file, "r+") as f:
-                    _import_cluster_details = json.loads(f.read())
-            except json.JSONDecodeError as ex:
-                print(f"Import cluster details found in {args.import_cluster_details_file} was not in JSON format, ignoring.")
-        elif args.import_version or args.import_platform:
-            _import_cluster_details = {
-                "clustername": ""
-            }
-            _import_cluster_details["version"] = args.import_version if args.import_version else ""
-            _import_cluster_details["platform"] = args.import_platform if args.import_platform else ""
-        if args.verification_level is not None:
-            _verification_level = args.verification_level
-        else:
-            _verification_level = "BVT" if re.match(r".*-integration\b", args.branch) else "SVT" if re.match(r".*-dev\b", args.branch) else "SVT-Extended" if re.match(r".*-nightly\b" , args.branch) else "Verification Test"
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
+        _import_cluster_details = ReportGenerator.ReportGenerator.load_import_cluster_details(args)
+        _verification_level = ReportGenerator.ReportGenerator.get_verification_level(args.verification_level, args.branch)
         _generator = JsonGenerator(args.results_directory, snapshot=args.snapshot, branch=args.branch, verification_level=_verification_level, stage=args.stage,
             hub_version=args.hub_version, hub_platform=args.hub_platform,
             import_cluster_details=_import_cluster_details, job_url=args.job_url, build_id=args.build_id, ignorelist=_ignorelist,
-            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate))
-        _message = _generator.generate_json_report()
-        if args.output_file is not None:
-            with open(args.output_file, "w+") as f:
-                f.write(json.dumps(_message))
+            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args), lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir, aggregated_results=ra.ResultsAggregator() if args.watch else None,
+            output_format=args.output_format)
+        def _write_report(aggregated_results):
+            _generator.aggregated_results = aggregated_results
+            ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, aggregated_results)
+            ReportWriter.ReportWriter.write_report(_generator.iter_report(), args.output_file)
+        if args.watch:
+            ReportGenerator.ReportGenerator.watch_results(args, _ignorelist, _write_report)
         else:
-            print(json.dumps(_message))
+            _write_report(_generator.aggregated_results)
 
     
     def generate_json_report(self):
         """Macro function to assemble our json report.  This wraps data extraction and the inclusion of metadata in our JSON payload."""
-        _report = self.aggregated_results.get_raw_results()
+        return self.add_report_metadata(self.aggregated_results.get_raw_results())
+
+
+    def iter_report(self):
+        """Generate our report in the chunks of its output_format - see iter_json_report(), iter_ndjson_report(), and iter_compact_json_report()."""
+        if self.output_format == JsonGenerator.ndjson_format:
+            return self.iter_ndjson_report()
+        if self.output_format == JsonGenerator.compact_format:
+            return self.iter_compact_json_report()
+        return self.iter_json_report()
+
+
+    def iter_json_report(self):
+        """Generate the JSON text of our json report in chunks, streaming results out of the datamodel one at a time rather
+        than building the whole report first.  The chunks join up to exactly json.dumps(self.generate_json_report())."""
+        yield from JsonGenerator.__iter_object(self.add_report_metadata(self.aggregated_results.iter_raw_results()), json.dumps, json.dumps)
+
+
+    def iter_ndjson_report(self):
+        """Generate our report as NDJSON in chunks: a line holding each result, as in iter_json_report(), then a final line
+        holding the summary record - {"summary": {...}} with the rest of the report (counts, coverage, snapshot details, ...)."""
+        _report = self.add_report_metadata(self.aggregated_results.iter_raw_results())
+        _results = _report.pop("results")
+        yield from JsonGenerator.__iter_batches(_results, lambda r: json.dumps(r) + "\n", "")
+        yield json.dumps({"summary": _report})
+
+
+    def iter_compact_json_report(self):
+        """Generate our report as compact JSON in chunks - a "strings" table of the testsuites, squads, severities, priorities,
+        file names, and states used by the results, then each result as a row referencing it, then the rest of the report
+        as in iter_json_report().  The string table is gathered in a first pass over the results, so their rows can still
+        be streamed out one at a time."""
+        _strings = CompactResults.CompactResults.build_strings(self.aggregated_results.iter_results())
+        _report = {
+            "format": CompactResults.CompactResults.format_name,
+            "format_version": CompactResults.CompactResults.format_version,
+            "strings": list(_strings)
+        }
+        _report.update(self.add_report_metadata(self.aggregated_results.iter_raw_results()))
+        _dumps = lambda v: json.dumps(v, separators=(",", ":"))
+        yield from JsonGenerator.__iter_object(_report, _dumps, lambda r: _dumps(CompactResults.CompactResults.encode(r, _strings)), separators=(",", ":"))
+
+
+    def __iter_object(report, dumps, dumps_result, separators=(", ", ": ")):
+        # Yield the JSON text of a report dict whose "results" are an iterator, encoding each result with dumps_result
+        _item_separator, _key_separator = separators
+        yield "{"
+        for _i, (_key, _value) in enumerate(report.items()):
+            yield f"{_item_separator if _i else ''}{dumps(_key)}{_key_separator}"
+            if _key == "results":
+                yield "["
+                yield from JsonGenerator.__iter_batches(_value, dumps_result, _item_separator)
+                yield "]"
+            else:
+                yield dumps(_value)
+        yield "}"
+
+
+    def __iter_batches(results, dumps_result, separator):
+        # Results are encoded in batches - yielding a chunk per result costs more than encoding it
+        _leading = ""
+        _batch = []
+        for _result in results:
+            _batch.append(dumps_result(_result))
+            if len(_batch) == JsonGenerator.results_per_chunk:
+                yield _leading + separator.join(_batch)
+                _leading = separator
+                _batch = []
+        if _batch:
+            yield _leading + separator.join(_batch)
+
+
+    def add_report_metadata(self, report):
+        """Add the snapshot, environment, and quality gate details to a raw results dict and return it."""
         # Translate fields that our internal datamodel defaults to None to "" to make it more JSON-friendly
-        _report["snapshot"] = self.snapshot if self.snapshot else ""
-        _report["branch"] = self.branch if self.branch else ""
-        _report["verification_level"] = self.verification_level
-        _report["stage"] = self.stage if self.branch else ""
-        _report["hub_version"] = self.hub_version if self.hub_version else ""
-        _report["hub_platform"] = self.hub_platform if self.hub_platform else ""
-        _report["job_url"] = self.job_url if self.job_url else ""
-        _report["build_id"] = self.build_id if self.build_id else ""
-        _report["issue_url"] = self.issue_url if self.issue_url else ""
+        report["snapshot"] = self.snapshot if self.snapshot else ""
+        report["branch"] = self.branch if self.branch else ""
+        report["verification_level"] = self.verification_level
+        report["stage"] = self.stage if self.branch else ""
+        report["hub_version"] = self.hub_version if self.hub_version else ""
+        report["hub_platform"] = self.hub_platform if self.hub_platform else ""
+        report["job_url"] = self.job_url if self.job_url else ""
+        report["build_id"] = self.build_id if self.build_id else ""
+        report["issue_url"] = self.issue_url if self.issue_url else ""
         # No translation needed for integers wtih defaults and lists that default to empty in internal data model
-        _report["ignorelist"] = self.ignorelist
-        _report["import_cluster_details"] = self.import_cluster_details
-        _report["executed_quality_gate"] = self.executed_quality_gate
-        _report["passing_quality_gate"] = self.passing_quality_gate
-        return _report
+        report["ignorelist"] = self.ignorelist
+        report["import_cluster_details"] = self.import_cluster_details
+        report["executed_quality_gate"] = self.executed_quality_gate
+        report["passing_quality_gate"] = self.passing_quality_gate
+        return report
 
@@ -5,9 +5,10 @@ This class can generate its CLI parser, load args, generate a ResultsAggregator
 """
 
 import os, sys, json, argparse, re
-from generators import AbstractGenerator,ReportGenerator
+from generators import AbstractGenerator,ReportGenerator,ReportWriter
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, PrefetchReader
 
 class MarkdownGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
     
@@ -33,11 +34,11 @@ class MarkdownGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Rep
 
     def __init__(self, results_dirs, snapshot=None, branch=None, verification_level=None, stage=None, hub_version=None, 
         hub_platform=None, import_cluster_details=[], job_url=None, build_id=None,
-        sd_url=None, issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100):
+        sd_url=None, issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, group_messages=False, aggregated_results=None):
         """Create a MarkdownGenerator Object, unroll xml files from input, and initialize a ResultsAggregator.  
 
         Required Arguments:
-        results_dirs    -- a list of directories that contain XML files from which to generate an aggregate report
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
 
         Keyword Arguments:
         snapshot    --  a string representation of the snapshot that these test results represent, ex. 2.2.0-SNAPSHOT-timestamp
@@ -54,6 +55,15 @@ class MarkdownGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Rep
         ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
         passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
         executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        group_messages  --  list tests that failed with the same message together under one copy of the message
+        aggregated_results  --  an already-built ResultsAggregator to report on - results_dirs is ignored if this is set
         """
         self.snapshot = snapshot
         self.branch = branch
@@ -68,20 +78,15 @@ class MarkdownGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Rep
         self.ignorelist = ignorelist
         self.passing_quality_gate = passing_quality_gate
         self.executed_quality_gate = executed_quality_gate
+        self.group_messages = group_messages
         self.results_files = []
-        if verification_level is not None:
-            self.verification_level = verification_level
-        elif branch is None:
-            self.verification_level = "Verification Test"
+        self.verification_level = ReportGenerator.ReportGenerator.get_verification_level(verification_level, branch)
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
         else:
-            self.verification_level = "BVT" if re.match(r".*-integration\b", branch) else "SVT" if re.match(r".*-dev\b", branch) else "SVT-Extended" if re.match(r".*-nightly\b" ,branch) else "Verification Test"
-        for _results_dir in results_dirs:
-            _files_list = os.listdir(_results_dir)
-            for _f in _files_list:
-                _full_path = os.path.join(_results_dir, _f)
-                if os.path.isfile(_full_path) and _full_path.endswith('.xml'):
-                    self.results_files.append(_full_path)
-        self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist)
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
 
 
     def generate_subparser(subparser):
@@ -106,6 +111,8 @@ Example Usages:
             help="URL of the github/jira/tracking issue associated with this report.")
         md_parser.add_argument('-o', '--output-file',
             help="Destination file for slack message.  Message will be output to stdout if left blank.")
+        md_parser.add_argument('-gm', '--group-messages', action='store_true',
+            help="If provided - list failing tests that share a failure message together under a single copy of the message.")
         md_parser.set_defaults(func=MarkdownGenerator.generate_markdown_report_from_args)
         return subparser_name, md_parser
 
@@ -116,53 +123,38 @@ Example Usages:
         Required Argument:
         args -- argparse-generated arguments from an argparse with a parser generated by MarkdownGenerator.generate_subparser()
         """
-        _ignorelist = []
-        if args.ignore_list is not None and os.path.isfile(args.ignore_list):
-            try:
-                with open(args.ignore_list, "r+") as f:
-                    _il = json.loads(f.read())
-                _ignorelist = _il['ignored_tests']
-            except json.JSONDecodeError as ex:
-                print(f"Ignorelist found in {args.ignore_list} was not in JSON format, ignoring the ignorelist. Ironic.")
-        _import_cluster_details = []
-        if args.import_cluster_details_file is not None and os.path.isfile(args.import_cluster_details_file):
-            try:
-                with open(args.import_cluster_details_file, "r+") as f:
-                    _import_cluster_details = json.loads(f.read())
-            except json.JSONDecodeError as ex:
-                print(f"Import cluster details found in {args.import_cluster_details_file} was not in JSON format, ignoring.")
-        elif args.import_version or args.import_platform:
-            _import_cluster = {
-                "clustername": ""
-            }
-            _import_cluster["version"] = args.import_version if args.import_version else ""
-            _import_cluster["platform"] = args.import_platform if args.import_platform else ""
-            _import_cluster_details.append(_import_cluster)
-        if args.verification_level is not None:
-            _verification_level = args.verification_level
-        else:
-            _verification_level = "BVT" if re.match(r".*-integration\b", args.branch) else "SVT" if re.match(r".*-dev\b", args.branch) else "SVT-Extended" if re.match(r".*-nightly\b" , args.branch) else "Verification Test"
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
+        _import_cluster_details = ReportGenerator.ReportGenerator.load_import_cluster_details(args)
+        _verification_level = ReportGenerator.ReportGenerator.get_verification_level(args.verification_level, args.branch)
         _generator = MarkdownGenerator(args.results_directory, snapshot=args.snapshot, branch=args.branch, verification_level=_verification_level, stage=args.stage,
             hub_version=args.hub_version, hub_platform=args.hub_platform, import_cluster_details=_import_cluster_details,
             job_url=args.job_url, build_id=args.build_id, ignorelist=_ignorelist, sd_url=args.snapshot_diff_url,
-            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate))
-        _message = _generator.generate_markdown_report()
-        if args.output_file is not None:
-            with open(args.output_file, "w+") as f:
-                f.write(_message)
+            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args), lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir, group_messages=args.group_messages, aggregated_results=ra.ResultsAggregator() if args.watch else None)
+        def _write_report(aggregated_results):
+            _generator.aggregated_results = aggregated_results
+            ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, aggregated_results)
+            ReportWriter.ReportWriter.write_report(_generator.iter_markdown_report(), args.output_file)
+        if args.watch:
+            ReportGenerator.ReportGenerator.watch_results(args, _ignorelist, _write_report)
         else:
-            print(_message)
+            _write_report(_generator.aggregated_results)
 
     
     def generate_markdown_report(self):
         """Macro function to assemble our markdown report.  This wraps the header, metadata, summary, table, and body generation with a neat bow."""
-        _report = ""
-        _report = _report + self.generate_header() + "\n"
-        _report = _report + self.generate_metadata() + "\n"
-        _report = _report + self.generate_summary() + "\n"
-        _report = _report + self.generate_table() + "\n"
-        _report = _report + self.generate_body() + "\n"
-        return _report
+        return "".join(self.iter_markdown_report())
+
+
+    def iter_markdown_report(self):
+        """Yield our markdown report in chunks - a section, table row, or failure at a time - for a ReportWriter to write out
+        without building the whole report in memory.  The chunks join up to exactly generate_markdown_report()."""
+        yield self.generate_header() + "\n"
+        yield self.generate_metadata() + "\n"
+        yield self.generate_summary() + "\n"
+        yield from self.iter_table()
+        yield "\n"
+        yield from self.iter_body()
+        yield "\n"
 
 
     def generate_header(self):
@@ -252,25 +244,51 @@ Example Usages:
 
     def generate_table(self):
         """Generates a table listing all of our test results, their suite name, and their status (pass/fail/skip/ignored)."""
-        _table = "## Test Case Summary\n\n"
-        _table = _table + "|Results|Testsuite|Test|\n"
-        _table = _table + "|---|---|---|\n"
-        _results = self.aggregated_results.get_results()
-        for _result in _results:
-            _table = _table + f"| {MarkdownGenerator.status_symbols[_result['state']]} | {_result['testsuite']} | {_result['name']} |\n"
-        return _table
+        return "".join(self.iter_table())
+
+
+    def iter_table(self):
+        """Yield the test case summary table of generate_table() a row at a time."""
+        yield "## Test Case Summary\n\n"
+        yield "|Results|Testsuite|Test|\n"
+        yield "|---|---|---|\n"
+        for _result in self.aggregated_results.iter_results():
+            yield f"| {MarkdownGenerator.status_symbols[_result['state']]} | {_result['testsuite']} | {_result['name']} |\n"
 
     
     def generate_body(self):
         """Generate a list of all failed or ignored tests and their associated messages, including all details."""
-        _body = ""
+        return "".join(self.iter_body())
+
+
+    def iter_body(self):
+        """Yield the failing tests section of generate_body() a failure at a time."""
         _total, _passed, _failed, _skipped, _ignored = self.aggregated_results.get_counts()
         if _failed > 0:
-            _body = _body + "## Failing Tests\n\n"
-            _results = self.aggregated_results.get_results()
-            for _result in _results:
-                if _result['state'] == ra.ResultsAggregator.failed or _result['state'] == ra.ResultsAggregator.ignored:
-                    _body = _body + f"### {MarkdownGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n\n"
-                    _body = _body + f"```\n{_result['metadata']['message']}\n```\n"
-        return _body
+            yield "## Failing Tests\n\n"
+            if self.group_messages:
+                yield from self.iter_grouped_failures()
+                return
+            for _result in self.aggregated_results.iter_results(states=[ra.ResultsAggregator.failed, ra.ResultsAggregator.ignored]):
+                yield f"### {MarkdownGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n\n"
+                yield f"```\n{self.aggregated_results.get_message(_result)}\n```\n"
+
+
+    def generate_grouped_failures(self):
+        """Generate the failed and ignored tests grouped by failure message, so a message shared by many tests is only listed once."""
+        return "".join(self.iter_grouped_failures())
+
+
+    def iter_grouped_failures(self):
+        """Yield the grouped failures of generate_grouped_failures() a test at a time."""
+        for _group in self.aggregated_results.get_message_groups():
+            _results = _group['results']
+            if len(_results) == 1:
+                yield f"### {MarkdownGenerator.status_symbols[_results[0]['state']]} {_results[0]['testsuite']} -> {_results[0]['name']}\n\n"
+            else:
+                yield f"### {MarkdownGenerator.status_symbols[_results[0]['state']]} {len(_results)} Tests Failed With This Message\n\n"
+                for _result in _results:
+                    yield f"* {MarkdownGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n"
+                yield "\n"
+            yield f"```\n{_group['message']}\n```\n"
  
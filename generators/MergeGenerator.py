@@ -0,0 +1,110 @@
+"""MergeGenerator
+
+An AbstractGenerator and ReportGenerator implementation to merge results into a single portable results artifact as part of the canary reporting CLI.
+This class can generate its CLI parser, load args, generate a ResultsAggregator object from JUnit XML and/or results artifacts, and export it as a ResultsArtifact.
+"""
+
+import os, sys, argparse
+from generators import AbstractGenerator,ReportGenerator
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, ResultsArtifact, IgnoreListMatcher, PrefetchReader
+
+class MergeGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
+
+    def __init__(self, results_dirs, ignorelist=None, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, aggregated_results=None):
+        """Create a MergeGenerator Object, unroll results files from input, and initialize a ResultsAggregator.
+
+        Required Arguments:
+        results_dirs    -- a list of results artifacts, directories that contain XML files, or .zip/.tar.gz archives of them, to merge
+
+        Keyword Arguments:
+        ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys - the union of the ignorelists recorded in
+                        the input artifacts if None
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're exported, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        aggregated_results  --  an already-built ResultsAggregator to export - results_dirs is ignored if this is set
+        """
+        self.results_files = []
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
+            self.ignorelist = aggregated_results.ignorelist
+        else:
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.ignorelist = ignorelist if ignorelist is not None else MergeGenerator.merge_ignorelists(self.results_files)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=self.ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
+
+
+    def generate_subparser(subparser):
+        """Static method to generate a subparser for the MergeGenerator module.
+
+        Required Argument:
+        subparser -- an argparse.ArgumentParser object to extend with a new subparser.
+        """
+        subparser_name = 'merge'
+        merge_parser = subparser.add_parser(subparser_name, parents=[ReportGenerator.ReportGenerator.generate_parent_parser()],
+            help="Merge JUnit XML results and/or results artifacts into a single results artifact.",
+            formatter_class=argparse.RawTextHelpFormatter,
+            epilog="""
+Example Usages:
+
+    Export the JUnit xml in the 'junit_xml' folder on one CI node as a results artifact:
+        python3 reporter.py merge junit_xml/ -o node-1.cra
+
+    Merge the artifacts from every node into one, then report on it like any other results:
+        python3 reporter.py merge node-1.cra node-2.cra node-3.cra -o canary.cra
+        python3 reporter.py md canary.cra -o report.md
+""")
+        merge_parser.add_argument('-o', '--output-file',
+            help="Destination file for the merged results artifact.  Only a summary of the merged results is printed if left blank.")
+        merge_parser.set_defaults(func=MergeGenerator.generate_merge_from_args)
+        return subparser_name, merge_parser
+
+
+    def generate_merge_from_args(args):
+        """Static method to create a MergeGenerator object and write a merged results artifact from the command-line args.
+
+        Required Argument:
+        args -- argparse-generated arguments from an argparse with a parser generated by MergeGenerator.generate_subparser()
+        """
+        if args.watch:
+            print("--watch is not supported by the merge subcommand.", file=sys.stderr)
+            exit(1)
+        _generator = MergeGenerator(args.results_directory,
+            ignorelist=ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list) if args.ignore_list is not None else None,
+            jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args),
+            lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir)
+        ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, _generator.aggregated_results)
+        if args.output_file is not None:
+            _generator.generate_artifact(args.output_file)
+        print(_generator.generate_summary())
+
+
+    def generate_artifact(self, output_file):
+        """Write the merged results to output_file as a results artifact."""
+        ResultsArtifact.ResultsArtifact.write(self.aggregated_results, output_file)
+
+
+    def generate_summary(self):
+        """Return a one-line summary of the merged results' counts."""
+        _total, _passed, _failed, _skipped, _ignored = self.aggregated_results.get_counts()
+        return f"Merged {len(self.results_files)} results files: {_total} tests, {_passed} passed, {_failed} failed, {_skipped} skipped, {_ignored} ignored."
+
+
+    def merge_ignorelists(files):
+        """Return the union, by test name, match type, and testsuite, of the ignorelists recorded in any results artifacts among files."""
+        _ignorelist = []
+        _keys = set()
+        for _file in files:
+            for _ignored in ResultsArtifact.ResultsArtifact.read_ignorelist(_file):
+                _key = (_ignored.get('name'), _ignored.get('match', IgnoreListMatcher.IgnoreListMatcher.exact), _ignored.get('testsuite'))
+                if _key not in _keys:
+                    _keys.add(_key)
+                    _ignorelist.append(_ignored)
+        return _ignorelist
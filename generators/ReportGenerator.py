@@ -1,11 +1,14 @@
-import argparse, os
+import argparse, os, sys, json, re, time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ParseCache, ResultsDiscovery, ResultsWatcher, PrefetchReader
+from datamodel import ResultsAggregator as ra
 
 class ReportGenerator():
     
     def generate_parent_parser() -> argparse.ArgumentParser:
         parent = argparse.ArgumentParser(add_help=False)
         parent.add_argument('results_directory', nargs='+', metavar='RESULTS_DIR',
-            help="A directory that holds JUnit XML Results files to process and generate a report from.")
+            help="A directory that holds JUnit XML Results files to process and generate a report from, or a .zip/.tar.gz archive of them.")
         parent.add_argument('-sn', '--snapshot', default=os.getenv('SNAPSHOT'),
             help="The snapshot whose test results are represented in RESULTS_DIR. Attempts to load from the SNAPSHOT environment variable if omitted.")
         parent.add_argument('-b', '--branch', default=os.getenv('TRAVIS_BRANCH'),
@@ -34,4 +37,158 @@ class ReportGenerator():
             help="Percentage of the executed test cases that must pass to count as a quality result.")
         parent.add_argument('-il', '--ignore-list',
             help="Path to the IgnoreList JSON file. Ignorelist won't be used if omitted.")
-        return parent
\ No newline at end of file
+        parent.add_argument('-ilr', '--ignore-list-report',
+            help="If provided - write every ignorelist entry to this JSON file with the number of failures it ignored, to find stale entries.")
+        parent.add_argument('-nj', '--jobs', default='1',
+            help="Number of worker processes used to load results files in parallel.  Use 0 for one per CPU.  Defaults to 1 (serial).")
+        parent.add_argument('-pd', '--prefetch-depth', default=str(PrefetchReader.PrefetchReader.default_depth),
+            help=f"Number of results files read ahead of the parser on a thread pool when loading serially, to overlap file I/O with parsing.  Use 0 to read each file as it's parsed.  Defaults to {PrefetchReader.PrefetchReader.default_depth}.")
+        parent.add_argument('-rs', '--results-store', choices=[ra.ResultsAggregator.memory_store, ra.ResultsAggregator.sqlite_store], default=ra.ResultsAggregator.memory_store,
+            help="Where to keep results while reporting - in memory (the default), or in a temporary SQLite database on local disk so memory use stays bounded for very large runs.")
+        parent.add_argument('-rsd', '--results-store-dir',
+            help="Directory for the --results-store sqlite database file.  Defaults to the system temporary directory.")
+        parent.add_argument('-cdir', '--cache-dir', default=ParseCache.ParseCache.default_cache_dir(),
+            help="Directory for the parse cache shared between runs.  Defaults to CANARY_REPORTING_CACHE_DIR or ~/.cache/canary-reporting.")
+        parent.add_argument('-cs', '--cache-size-mb', default=str(ParseCache.ParseCache.default_max_mb),
+            help="Size bound for the parse cache in MB, least recently used entries are evicted beyond it.")
+        parent.add_argument('-nc', '--no-cache', action='store_true',
+            help="If provided - don't read or write the parse cache, always parse results files from scratch.")
+        parent.add_argument('-lm', '--lazy-messages', action='store_true',
+            help="If provided - leave failure messages in the results files and only read them back when a report renders them, to reduce memory use.")
+        parent.add_argument('-rec', '--recursive', action='store_true',
+            help="If provided - also load results files from subdirectories of each RESULTS_DIR.")
+        parent.add_argument('-inc', '--include', action='append', default=[],
+            help="Glob pattern, matched against file names and paths relative to RESULTS_DIR, of results files to load.  Can be repeated.  Defaults to *.xml.")
+        parent.add_argument('-exc', '--exclude', action='append', default=[],
+            help="Glob pattern of results files (or subdirectories) under RESULTS_DIR to skip.  Can be repeated.")
+        parent.add_argument('-dt', '--discovery-threads', default='1',
+            help="Number of threads used to list RESULTS_DIR trees in parallel with --recursive, useful on network filesystems.  Defaults to 1 (serial).")
+        parent.add_argument('-w', '--watch', action='store_true',
+            help="If provided - keep watching RESULTS_DIR, loading results files as they land and regenerating the report after each batch.")
+        parent.add_argument('-wi', '--watch-interval', default='30',
+            help="Seconds between polls of RESULTS_DIR with --watch.  Defaults to 30.")
+        parent.add_argument('-wt', '--watch-idle-timeout', default='0',
+            help="Stop watching once no results files have changed for this many seconds.  Defaults to 0 (watch until interrupted).")
+        return parent
+
+    def load_ignorelist(ignore_list_file):
+        """Return the ignored tests listed in an IgnoreList JSON file, or an empty list if the file is missing or isn't JSON.
+
+        Required Argument:
+        ignore_list_file -- path to an IgnoreList JSON file with an "ignored_tests" list, or None
+        """
+        _ignorelist = []
+        if ignore_list_file is not None and os.path.isfile(ignore_list_file):
+            try:
+                with open(ignore_list_file, "r") as f:
+                    _il = json.loads(f.read())
+                _ignorelist = _il['ignored_tests']
+            except json.JSONDecodeError as ex:
+                print(f"Ignorelist found in {ignore_list_file} was not in JSON format, ignoring the ignorelist. Ironic.", file=sys.stderr)
+        return _ignorelist
+
+
+    def write_ignorelist_report(ignore_list_report_file, aggregated_results):
+        """Write aggregated_results' ignorelist entries, each with a "hits" count of the failures it ignored, to a JSON file.
+        Does nothing if ignore_list_report_file is None.
+
+        Required Arguments:
+        ignore_list_report_file --  destination JSON file, typically args.ignore_list_report
+        aggregated_results      --  a ResultsAggregator
+        """
+        if ignore_list_report_file is None:
+            return
+        with open(ignore_list_report_file, "w") as f:
+            f.write(json.dumps({"ignored_tests": aggregated_results.get_ignorelist_hits()}, indent=2))
+
+
+    def get_failure_rank(result):
+        """Return a sort key ordering results by severity and then priority, most urgent first - ex. "Severity 1 - Urgent"
+        and "sev1" before "sev2", "blocker (P0)" before "Priority/P1".  Results without a numbered severity or priority sort last.
+
+        Required Arguments:
+        result -- a result dict from a ResultsAggregator
+        """
+        return (ReportGenerator.__tag_level(result['metadata'].get('severity')), ReportGenerator.__tag_level(result['metadata'].get('priority')))
+
+
+    def get_failures_by_severity(aggregated_results, states=[ra.ResultsAggregator.failed]):
+        """Return a list of aggregated_results' results in the given states, most severe first (see get_failure_rank) and
+        otherwise in the same order as get_results().
+
+        Required Arguments:
+        aggregated_results  --  a ResultsAggregator
+
+        Keyword Arguments:
+        states  --  the states of the results to list, failures by default
+        """
+        return sorted(aggregated_results.iter_results(states=states), key=ReportGenerator.get_failure_rank)
+
+
+    def __tag_level(tag):
+        _level = re.search(r"\d+", tag) if tag else None
+        return int(_level.group()) if _level is not None else sys.maxsize
+
+
+    def load_import_cluster_details(args):
+        """Return a list of import cluster dicts from the --import-cluster-details-file, --import-version, and --import-platform arguments.
+
+        Required Argument:
+        args -- argparse-generated arguments from a parser using ReportGenerator.generate_parent_parser()
+        """
+        _import_cluster_details = []
+        if args.import_cluster_details_file is not None and os.path.isfile(args.import_cluster_details_file):
+            try:
+                with open(args.import_cluster_details_file, "r") as f:
+                    _import_cluster_details = json.loads(f.read())
+            except json.JSONDecodeError as ex:
+                print(f"Import cluster details found in {args.import_cluster_details_file} was not in JSON format, ignoring.", file=sys.stderr)
+        elif args.import_version or args.import_platform:
+            _import_cluster_details.append({
+                "clustername": "",
+                "version": args.import_version if args.import_version else "",
+                "platform": args.import_platform if args.import_platform else ""
+            })
+        return _import_cluster_details
+
+
+    def get_verification_level(verification_level, branch):
+        """Return verification_level if set, otherwise derive it from the branch name (ex. 2.2-integration is a BVT)."""
+        if verification_level is not None:
+            return verification_level
+        if branch is None:
+            return "Verification Test"
+        return "BVT" if re.match(r".*-integration\b", branch) else "SVT" if re.match(r".*-dev\b", branch) else "SVT-Extended" if re.match(r".*-nightly\b" , branch) else "Verification Test"
+
+
+    def watch_results(args, ignorelist, on_batch):
+        """Watch args.results_directory until interrupted or idle for --watch-idle-timeout seconds, calling on_batch with
+        a fresh aggregate each time a poll loads new or changed results files.  Returns on_batch's last return value.
+
+        Required Arguments:
+        args        --  argparse-generated arguments from a parser using ReportGenerator.generate_parent_parser()
+        ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
+        on_batch    --  a callable taking a ResultsAggregator, typically regenerating and writing out a report
+        """
+        _watcher = ResultsWatcher.ResultsWatcher(args.results_directory, discovery=ResultsDiscovery.ResultsDiscovery.from_args(args),
+            ignorelist=ignorelist, jobs=int(args.jobs), cache=ParseCache.ParseCache.from_args(args), lazy_messages=args.lazy_messages)
+        _interval = float(args.watch_interval)
+        _idle_timeout = float(args.watch_idle_timeout)
+        _result = None
+        _emitted = False
+        _last_change = time.monotonic()
+        try:
+            while True:
+                if _watcher.poll():
+                    print(f"Watch: {len(_watcher.get_files())} results files loaded.", file=sys.stderr)
+                    _result = on_batch(_watcher.get_aggregate())
+                    _emitted = True
+                    _last_change = time.monotonic()
+                elif _idle_timeout > 0 and time.monotonic() - _last_change >= _idle_timeout:
+                    break
+                time.sleep(_interval)
+        except KeyboardInterrupt:
+            pass
+        if not _emitted: # nothing ever landed - still report on the (empty) results
+            _result = on_batch(_watcher.get_aggregate())
+        return _result
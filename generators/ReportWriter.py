@@ -0,0 +1,72 @@
+"""ReportWriter
+
+A buffered writer for reports rendered as a stream of chunks.  The report generators yield their reports a section, row,
+or failure at a time rather than concatenating one large string, and a ReportWriter gathers those chunks and writes them
+to a file or stdout in large blocks - so rendering stays linear in the size of the report and only a buffer's worth of
+it is held in memory at a time.
+"""
+
+import sys
+
+class ReportWriter():
+
+    # Characters gathered before they're written out in one block
+    buffer_size = 64 * 1024
+
+    def __init__(self, file):
+        """Create a ReportWriter that writes to an open text file.  Use it as a context manager, or call flush() when done.
+
+        Required Arguments:
+        file -- a file-like object opened in text mode, ex. sys.stdout
+        """
+        self.file = file
+        self.__chunks = []
+        self.__size = 0
+
+
+    def write(self, chunk):
+        """Buffer a chunk of the report, writing the buffer out once it holds buffer_size characters."""
+        self.__chunks.append(chunk)
+        self.__size += len(chunk)
+        if self.__size >= ReportWriter.buffer_size:
+            self.flush()
+
+
+    def writelines(self, chunks):
+        """Buffer every chunk from an iterable of report chunks, ex. a generator's iter_*_report()."""
+        for _chunk in chunks:
+            self.write(_chunk)
+
+
+    def flush(self):
+        """Write out any buffered chunks."""
+        if self.__chunks:
+            self.file.write("".join(self.__chunks))
+            self.__chunks = []
+            self.__size = 0
+
+
+    def write_report(chunks, output_file=None):
+        """Static method to write a report's chunks to output_file, or to stdout followed by a newline (as print() would) if omitted.
+
+        Required Arguments:
+        chunks -- an iterable of strings that make up the report
+
+        Keyword Arguments:
+        output_file -- path of the file to write the report to, overwritten if it exists
+        """
+        if output_file is not None:
+            with open(output_file, "w+") as f, ReportWriter(f) as _writer:
+                _writer.writelines(chunks)
+        else:
+            with ReportWriter(sys.stdout) as _writer:
+                _writer.writelines(chunks)
+                _writer.write("\n")
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
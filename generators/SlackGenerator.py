@@ -8,6 +8,7 @@ import os, sys, json, argparse, re
 from generators import AbstractGenerator,ReportGenerator
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, PrefetchReader
 
 class SlackGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
 
@@ -31,13 +32,18 @@ class SlackGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Report
         f"{ra.ResultsAggregator.ignored}": ":yellow_jenkins_circle:",
     }
 
+    # Reports are kept shorter than this many characters, past which Slack truncates messages
+    max_message_length = 4000
+    # Failure messages that don't fit in full are cut to excerpts no shorter than this many characters
+    min_excerpt_length = 100
+
     def __init__(self, results_dirs, snapshot=None, branch=None, verification_level=None, stage=None, hub_version=None, 
         hub_platform=None, import_cluster_details=[], job_url=None, build_id=None,
-        md_url=None, sd_url=None, issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100):
+        md_url=None, sd_url=None, issue_url=None, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, aggregated_results=None):
         """Create a SlackGenerator Object, unroll xml files from input, and initialize a ResultsAggregator.  
 
         Required Arguments:
-        results_dirs    -- a list of directories that contain XML files from which to generate an aggregate report
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
 
         Keyword Arguments:
         snapshot    --  a string representation of the snapshot that these test results represent, ex. 2.2.0-SNAPSHOT-timestamp
@@ -56,6 +62,14 @@ class SlackGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Report
         ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
         passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
         executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        aggregated_results  --  an already-built ResultsAggregator to report on - results_dirs is ignored if this is set
         """
         self.snapshot = snapshot
         self.branch = branch
@@ -72,19 +86,13 @@ class SlackGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.Report
         self.passing_quality_gate = passing_quality_gate
         self.executed_quality_gate = executed_quality_gate
         self.results_files = []
-        if verification_level is not None:
-            self.verification_level = verification_level
-        elif branch is None:
-            self.verification_level = "Verification Test"
+        self.verification_level = ReportGenerator.ReportGenerator.get_verification_level(verification_level, branch)
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
         else:
-            self.verification_level = "BVT" if re.match(r".*-integration\b", branch) else "SVT" if re.match(r".*-dev\b", branch) else "SVT-Extended" if re.match(r".*-nightly\b" ,branch) else "Verification Test"
-        for _results_dir in results_dirs:
-            _files_list = os.listdir(_results_dir)
-            for _f in _files_list:
-                _full_path = os.path.join(_results_dir, _f)
-                if os.path.isfile(_full_path) and _full_path.endswith('.xml'):
-                    self.results_files.append(_full_path)
-        self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist)
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
 
 
     def generate_subparser(subparser):
@@ -121,44 +129,28 @@ Example Usages:
         Required Argument:
         args -- argparse-generated arguments from an argparse with a parser generated by SlackGenerator.generate_subparser()
         """
-        _ignorelist = []
-        if args.ignore_list is not None and os.path.isfile(args.ignore_list):
-            try:
-                with open(args.ignore_list, "r+") as f:
-                    _il = json.loads(f.read())
-                _ignorelist = _il['ignored_tests']
-            except json.JSONDecodeError as ex:
-                print(f"Ignorelist found in {args.ignore_list} was not in JSON format, ignoring the ignorelist. Ironic.")
-        _import_cluster_details = []
-        if args.import_cluster_details_file is not None and os.path.isfile(args.import_cluster_details_file):
-            try:
-                with open(args.import_cluster_details_file, "r+") as f:
-                    _import_cluster_details = json.loads(f.read())
-            except json.JSONDecodeError as ex:
-                print(f"Import cluster details found in {args.import_cluster_details_file} was not in JSON format, ignoring.")
-        elif args.import_version or args.import_platform:
-            _import_cluster = {
-                "clustername": ""
-            }
-            _import_cluster["version"] = args.import_version if args.import_version else ""
-            _import_cluster["platform"] = args.import_platform if args.import_platform else ""
-            _import_cluster_details.append(_import_cluster)
-        if args.verification_level is not None:
-            _verification_level = args.verification_level
-        else:
-            _verification_level = "BVT" if re.match(r".*-integration\b", args.branch) else "SVT" if re.match(r".*-dev\b", args.branch) else "SVT-Extended" if re.match(r".*-nightly\b" , args.branch) else "Verification Test"
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
+        _import_cluster_details = ReportGenerator.ReportGenerator.load_import_cluster_details(args)
+        _verification_level = ReportGenerator.ReportGenerator.get_verification_level(args.verification_level, args.branch)
         _generator = SlackGenerator(args.results_directory, snapshot=args.snapshot, branch=args.branch, verification_level=_verification_level, stage=args.stage,
             hub_version=args.hub_version, hub_platform=args.hub_platform, import_cluster_details=_import_cluster_details,
             job_url=args.job_url, build_id=args.build_id, ignorelist=_ignorelist, md_url=args.markdown_url, sd_url=args.snapshot_diff_url,
-            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate))
-        _message = {
-            "text": _generator.generate_slack_report()
-        }
-        if args.output_file is not None:
-            with open(args.output_file, "w+") as f:
-                f.write(json.dumps(_message))
+            issue_url=args.issue_url, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=ResultsDiscovery.ResultsDiscovery.from_args(args), lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir, aggregated_results=ra.ResultsAggregator() if args.watch else None)
+        def _write_report(aggregated_results):
+            _generator.aggregated_results = aggregated_results
+            ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, aggregated_results)
+            _message = {
+                "text": _generator.generate_slack_report()
+            }
+            if args.output_file is not None:
+                with open(args.output_file, "w+") as f:
+                    f.write(json.dumps(_message))
+            else:
+                print(json.dumps(_message))
+        if args.watch:
+            ReportGenerator.ReportGenerator.watch_results(args, _ignorelist, _write_report)
         else:
-            print(json.dumps(_message))
+            _write_report(_generator.aggregated_results)
 
     
     def generate_slack_report(self):
@@ -167,14 +159,9 @@ Example Usages:
         _report = _report + self.generate_header() + "\n"
         _report = _report + self.generate_metadata() + "\n"
         _report = _report + self.generate_summary() + "\n"
-        _full_body = self.generate_body_full()
-        if (len(_report) + len(_full_body)) < 4000:
-            _report = _report + _full_body
-        else:
-            _short_body = self.generate_body_short()
-            if (len(_report) + len(_short_body)) < 4000:
-                _report = _report + _short_body
-            # else - all body tests are too long, skip it
+        if self.aggregated_results.get_status(executed_gate=self.executed_quality_gate, passing_gate=self.passing_quality_gate) == ra.ResultsAggregator.failed:
+            # The whole report must stay under max_message_length characters
+            _report = _report + self.generate_body(SlackGenerator.max_message_length - len(_report) - 1)
         return _report
 
 
@@ -251,29 +238,78 @@ Example Usages:
         return _summary
 
     
-    def generate_body_full(self):
-        """Generates a full slack results body - this edition of the slack message body includes console output for failing test cases."""
-        _body = ""
-        _total, _passed, _failed, _skipped, _ignored = self.aggregated_results.get_counts()
-        if (self.aggregated_results.get_status(executed_gate=self.executed_quality_gate, passing_gate=self.passing_quality_gate) == ra.ResultsAggregator.failed
-            and _failed > 0):
-            _body = "*Failing Tests*\n"
-            _results = self.aggregated_results.get_results()
-            for _result in _results:
-                if _result['state'] == ra.ResultsAggregator.failed:
-                    _body = _body + f"{SlackGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n"
-                    _body = _body + f"```{_result['metadata']['message']}```\n"
-        return _body
+    def generate_body(self, budget=max_message_length - 1):
+        """Generates the slack results body listing failing tests, most severe first, in at most budget characters.  If every
+        failure doesn't fit with its full console output, the body degrades gradually: long messages are cut to an equal
+        excerpt, then only the most severe tests keep an excerpt and the rest are listed by name, and finally as many tests
+        as fit are listed by name followed by a count of those left out.  How each test is shown is worked out from the
+        lengths of its name and message before anything is rendered.  Returns "" if there are no failures or not even the
+        heading fits.
 
+        Keyword Arguments:
+        budget  --  the most characters the body may take up
+        """
+        _failures = ReportGenerator.ReportGenerator.get_failures_by_severity(self.aggregated_results)
+        _heading = "*Failing Tests*\n"
+        _budget = budget - len(_heading)
+        if not _failures or _budget < len(SlackGenerator.__more_line(len(_failures))):
+            return ""
+        _names = [f"{SlackGenerator.status_symbols[r['state']]} {r['testsuite']} -> {r['name']}\n" for r in _failures]
+        _fence = len("``````\n")
+        # List as many tests by name as fit, leaving room to say how many more there are if that isn't all of them
+        _listed = len(_failures)
+        _spare = _budget - sum(len(n) for n in _names)
+        if _spare < 0:
+            _listed = 0
+            _spare = _budget - len(SlackGenerator.__more_line(len(_failures)))
+            while len(_names[_listed]) <= _spare:
+                _spare = _spare - len(_names[_listed])
+                _listed = _listed + 1
+        _messages = [self.aggregated_results.get_message(r) for r in _failures[:_listed]]
+        if _listed == len(_failures) and _fence * _listed + sum(len(m) for m in _messages) <= _spare:
+            # Everything fits in full
+            _allowances = [len(m) for m in _messages]
+        else:
+            _allowances = SlackGenerator.__message_allowances([len(m) for m in _messages], _spare - _fence * sum(1 for m in _messages if m))
+            if _allowances is None:
+                # Too many tests for everyone to get an excerpt - the most severe get one while there's room
+                _allowances = []
+                for _message in _messages:
+                    _allowance = min(len(_message), SlackGenerator.min_excerpt_length)
+                    if _message and _fence + _allowance <= _spare:
+                        _spare = _spare - _fence - _allowance
+                        _allowances.append(_allowance)
+                    else:
+                        _allowances.append(None)
+        _body = [_heading]
+        for _name, _message, _allowance in zip(_names, _messages, _allowances):
+            _body.append(_name)
+            if _allowance is None:
+                continue
+            _body.append(f"```{_message if _allowance >= len(_message) else _message[:_allowance - 1] + '…'}```\n")
+        if _listed < len(_failures):
+            _body.append(SlackGenerator.__more_line(len(_failures) - _listed))
+        return "".join(_body)
+
+
+    def __message_allowances(lengths, spare):
+        # Find the largest excerpt length that every message can be cut to within spare characters, messages shorter than it
+        # being shown in full.  Returns each message's allowance (None for empty messages, which are left out), or None if
+        # that excerpt length would be shorter than min_excerpt_length.
+        if spare < 0:
+            return None
+        _level = None
+        _remaining = spare
+        _sorted = sorted(l for l in lengths if l > 0)
+        for i, _length in enumerate(_sorted):
+            if _length * (len(_sorted) - i) > _remaining:
+                _level = _remaining // (len(_sorted) - i)
+                break
+            _remaining = _remaining - _length
+        if _level is not None and _level < SlackGenerator.min_excerpt_length:
+            return None
+        return [(l if _level is None else min(l, _level)) if l > 0 else None for l in lengths]
 
-    def generate_body_short(self):
-        """Generates a shortened slack message results body - this edition omits error messages for failing test cases and only includes the case name."""
-        _body = ""
-        if self.aggregated_results.get_status(executed_gate=self.executed_quality_gate, passing_gate=self.passing_quality_gate) == ra.ResultsAggregator.failed:
-            _body = "*Failing Tests*\n"
-            _results = self.aggregated_results.get_results()
-            for _result in _results:
-                if _result['state'] == ra.ResultsAggregator.failed:
-                    _body = _body + f"{SlackGenerator.status_symbols[_result['state']]} {_result['testsuite']} -> {_result['name']}\n"
-        return _body
 
+    def __more_line(count):
+        return f"_…and {count} more failing " + ("test" if count == 1 else "tests") + "_\n"
@@ -8,32 +8,40 @@ import os, sys, json, argparse
 from generators import AbstractGenerator,ReportGenerator
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache, ResultsDiscovery, StatusSummary, PrefetchReader
 
 class StatusGenerator(AbstractGenerator.AbstractGenerator, ReportGenerator.ReportGenerator):
 
 
-    def __init__(self, results_dirs, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100):
+    def __init__(self, results_dirs, ignorelist=[], passing_quality_gate=100, executed_quality_gate=100, jobs=1, parse_cache=None, discovery=None, lazy_messages=False, prefetch=PrefetchReader.PrefetchReader.default_depth, store=ra.ResultsAggregator.memory_store, store_dir=None, aggregated_results=None):
         """Create a SlackGenerator Object, unroll xml files from input, and initialize a ResultsAggregator.  
 
         Required Arguments:
-        results_dirs    -- a list of directories that contain XML files from which to generate an aggregate report
+        results_dirs    -- a list of directories that contain XML files, or .zip/.tar.gz archives of them, from which to generate an aggregate report
 
         Keyword Arguments:
         ignorelist  --  a list of dicts contianing "name", "squad", and "owner" keys
         passing_quality_gate    --  a number between 0 and 100 that defines the percentage of tests that must pass to declare success
         executed_quality_gate   --  a number between 0 and 100 that defines the percentage of tests that must be executed to declare success
+        jobs    --  number of worker processes used to load results files in parallel, 0 for one per CPU - files are loaded serially if 1
+        parse_cache --  an optional ParseCache used to skip re-parsing results files parsed by an earlier run
+        discovery   --  an optional ResultsDiscovery that finds the results files in results_dirs - top-level *.xml files if omitted
+        lazy_messages   --  leave failure messages in the results files until they're rendered, see ResultsAggregator
+        prefetch        --  number of results files read ahead of the parser when loading serially, see PrefetchReader
+        store           --  where results are kept while reporting, ResultsAggregator.memory_store or ResultsAggregator.sqlite_store
+        store_dir       --  directory for the SQLite store's database file - the system temporary directory if omitted
+        aggregated_results  --  an already-built ResultsAggregator (or StatusSummary) to report on - results_dirs is ignored if this is set
         """
         self.ignorelist = ignorelist
         self.passing_quality_gate = passing_quality_gate
         self.executed_quality_gate = executed_quality_gate
         self.results_files = []
-        for _results_dir in results_dirs:
-            _files_list = os.listdir(_results_dir)
-            for _f in _files_list:
-                _full_path = os.path.join(_results_dir, _f)
-                if os.path.isfile(_full_path) and _full_path.endswith('.xml'):
-                    self.results_files.append(_full_path)
-        self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist)
+        if aggregated_results is not None:
+            # Reuse an aggregate built by the caller rather than loading results_dirs again
+            self.aggregated_results = aggregated_results
+        else:
+            self.results_files = (discovery if discovery is not None else ResultsDiscovery.ResultsDiscovery()).discover(results_dirs)
+            self.aggregated_results = ra.ResultsAggregator(files=self.results_files, ignorelist=ignorelist, jobs=jobs, cache=parse_cache, lazy_messages=lazy_messages, prefetch=prefetch, store=store, store_dir=store_dir)
 
 
     def generate_subparser(subparser):
@@ -51,7 +59,12 @@ Example Usages:
 
     Generate a status code from test xml base on pass/fail.  
         python3 reporter.py st junit_xml/
+
+    Generate the same status from testsuite totals only, without building the full results datamodel.  
+        python3 reporter.py st junit_xml/ --summary-only
 """)
+        st_parser.add_argument('-so', '--summary-only', action='store_true',
+            help="Count results from <testsuite> attributes (or a counter-only scan of their testcases) rather than loading every\nresult - much faster on large results directories.  Ignored with --watch.")
         st_parser.set_defaults(func=StatusGenerator.generate_status_from_args)
         return subparser_name, st_parser
 
@@ -62,29 +75,25 @@ Example Usages:
         Required Argument:
         args -- argparse-generated arguments from an argparse with a parser generated by StatusGenerator.generate_subparser()
         """
-        _ignorelist = []
-        if args.ignore_list is not None and os.path.isfile(args.ignore_list):
-            try:
-                with open(args.ignore_list, "r+") as f:
-                    _il = json.loads(f.read())
-                _ignorelist = _il['ignored_tests']
-            except json.JSONDecodeError as ex:
-                print(f"Ignorelist found in {args.ignore_list} was not in JSON format, ignoring the ignorelist. Ironic.")
-        _generator = StatusGenerator(args.results_directory, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), ignorelist=_ignorelist)
-        exit(_generator.generate_status())
+        _ignorelist = ReportGenerator.ReportGenerator.load_ignorelist(args.ignore_list)
+        _discovery = ResultsDiscovery.ResultsDiscovery.from_args(args)
+        _aggregated_results = None
+        if args.watch:
+            _aggregated_results = ra.ResultsAggregator()
+        elif args.summary_only:
+            _aggregated_results = StatusSummary.StatusSummary(files=_discovery.discover(args.results_directory))
+        _generator = StatusGenerator(args.results_directory, executed_quality_gate=int(args.executed_quality_gate), passing_quality_gate=int(args.passing_quality_gate), jobs=int(args.jobs), parse_cache=ParseCache.ParseCache.from_args(args), discovery=_discovery, lazy_messages=args.lazy_messages, prefetch=int(args.prefetch_depth), store=args.results_store, store_dir=args.results_store_dir, ignorelist=_ignorelist, aggregated_results=_aggregated_results)
+        def _write_report(aggregated_results):
+            _generator.aggregated_results = aggregated_results
+            # --summary-only doesn't apply the ignorelist, so there are no hits to report
+            if not isinstance(aggregated_results, StatusSummary.StatusSummary):
+                ReportGenerator.ReportGenerator.write_ignorelist_report(args.ignore_list_report, aggregated_results)
+            return _generator.generate_status()
+        if args.watch:
+            exit(ReportGenerator.ReportGenerator.watch_results(args, _ignorelist, _write_report))
+        exit(_write_report(_generator.aggregated_results))
 
     
     def generate_status(self):
         """Macro function to generate a status given our xml test results - will return a 0 if passing, 1 otherwise"""
-        _coverage = self.aggregated_results.get_coverage()
-        print("##### Canary Status Report")
-        print(f"Expected Percentage Executed: {self.executed_quality_gate}")
-        print(f"Actual Percentage Executed: {round(_coverage[ra.ResultsAggregator.skipped], 2)}")
-        print(f"Expected Percentage Passed: {self.passing_quality_gate}")
-        print(f"Actual Percentage Passed: {round(_coverage[ra.ResultsAggregator.passed], 2)}")
-        if _coverage[ra.ResultsAggregator.skipped] < self.executed_quality_gate or _coverage[ra.ResultsAggregator.passed] < self.passing_quality_gate:
-            print("##### Result: Failed")
-            return 1
-        print("##### Result: Passed")
-        return 0
-
+        return StatusSummary.StatusSummary.print_status(self.aggregated_results, self.executed_quality_gate, self.passing_quality_gate)
@@ -1,10 +1,11 @@
-import json, os, sys, unittest
+import io, json, os, sys, unittest
 from numpy import equal
 import numpy
 import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from generators import JsonGenerator
-from builder import process_test_results
+from builder import process_test_results, read_report
+from datamodel import ResultsAggregator as ra
 
 class TestBuilder(unittest.TestCase):
 
@@ -54,5 +55,14 @@ class TestBuilder(unittest.TestCase):
         _expected = pd.read_csv(f"{os.path.dirname(os.path.abspath(__file__))}/df.txt", delimiter="\t", dtype={'passes': pd.Int64Dtype(), 'fails': pd.Int64Dtype(), 'skips': pd.Int64Dtype(), 'ignored': pd.Int64Dtype()})
         pd.testing.assert_frame_equal(_expected, processed_results)
 
+
+    def test_read_report(self):
+        # Every js format reads back as the plain JSON report - including an NDJSON report with no results, which is a single summary line
+        for _generator in [JsonGenerator.JsonGenerator([TestBuilder.results_folder], snapshot="TEST_SNAPSHOT"), JsonGenerator.JsonGenerator([], aggregated_results=ra.ResultsAggregator(), snapshot="TEST_SNAPSHOT")]:
+            _expected = json.loads(json.dumps(_generator.generate_json_report()))
+            for _format in JsonGenerator.JsonGenerator.formats:
+                _generator.output_format = _format
+                self.assertEqual(read_report(io.StringIO("".join(_generator.iter_report()))), _expected)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest, os, sys, json, tempfile, shutil, io, contextlib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from generators import CombinedGenerator, MarkdownGenerator, JsonGenerator
+
+class TestCombinedGenerator(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+    ignorelist = [
+        {
+            "name": "Search: Viewer is NOT able to edit configmaps",
+            "squad": "search",
+            "owner": "@anonymous-user-that-I-wont-name"
+        }
+    ]
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+
+    def test_reports_match_standalone_generators(self):
+        _generator = CombinedGenerator.CombinedGenerator([TestCombinedGenerator.results_folder], snapshot="TEST_SNAPSHOT",
+            branch="TEST_BRANCH", ignorelist=TestCombinedGenerator.ignorelist, passing_quality_gate=0, executed_quality_gate=0)
+        _md_file = os.path.join(self.output_dir, "report.md")
+        _json_file = os.path.join(self.output_dir, "results.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            _code = _generator.generate_reports(markdown_file=_md_file, json_file=_json_file)
+        self.assertEqual(_code, 0)
+        _md_generator = MarkdownGenerator.MarkdownGenerator([TestCombinedGenerator.results_folder], snapshot="TEST_SNAPSHOT",
+            branch="TEST_BRANCH", ignorelist=TestCombinedGenerator.ignorelist, passing_quality_gate=0, executed_quality_gate=0)
+        _json_generator = JsonGenerator.JsonGenerator([TestCombinedGenerator.results_folder], snapshot="TEST_SNAPSHOT",
+            branch="TEST_BRANCH", ignorelist=TestCombinedGenerator.ignorelist, passing_quality_gate=0, executed_quality_gate=0)
+        with open(_md_file, "r") as f:
+            self.assertEqual(f.read(), _md_generator.generate_markdown_report())
+        with open(_json_file, "r") as f:
+            self.assertEqual(json.loads(f.read()), _json_generator.generate_json_report())
+        # Reports that weren't requested aren't written
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["report.md", "results.json"])
+
+
+    def test_shares_one_aggregate(self):
+        _generator = CombinedGenerator.CombinedGenerator([TestCombinedGenerator.results_folder])
+        for _sub_generator in [_generator.status_generator, _generator.slack_generator, _generator.markdown_generator,
+            _generator.json_generator, _generator.github_issue_generator]:
+            self.assertIs(_sub_generator.aggregated_results, _generator.aggregated_results)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(_generator.generate_reports(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest, os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from generators import GitHubIssueGenerator
+from datamodel import ResultsAggregator as ra
 
 class TestGitHubIssueGenerator(unittest.TestCase):
 
@@ -323,6 +324,87 @@ https://on.cypress.io/element-cannot-be-interacted-with
 """)
 
 
+    def test_github_issue_pages(self):
+        _aggregate = ra.ResultsAggregator()
+        for _name, _message in [("[P2][sev2][search] a", "a" * 300), ("[P1][sev1][search] b", "b" * 300), ("[P1][sev2][search] c", "c" * 2000),
+            ("[P3][sev3][search] d", "d" * 300), ("[P3][sev3][search] e", "e" * 300)]:
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, ra.ResultsAggregator.get_case_metadata(_name, _message, "a.xml"))
+        _generator = GitHubIssueGenerator.GitHubIssueGenerator([], aggregated_results=_aggregate, output_file=TestGitHubIssueGenerator.output_file, dry_run=True)
+        # Everything fits in the body
+        self.assertEqual(_generator.generate_github_issue_pages(), [_generator.generate_github_issue_body()])
+        _max_body_length, _max_overflow_comments = GitHubIssueGenerator.GitHubIssueGenerator.max_body_length, GitHubIssueGenerator.GitHubIssueGenerator.max_overflow_comments
+        try:
+            GitHubIssueGenerator.GitHubIssueGenerator.max_body_length = len(_generator.generate_header() + _generator.generate_metadata() + _generator.generate_summary()) + 500
+            GitHubIssueGenerator.GitHubIssueGenerator.max_overflow_comments = 2
+            _pages = _generator.generate_github_issue_pages()
+            self.assertEqual(len(_pages), 3)
+            for _page in _pages:
+                self.assertLessEqual(len(_page), GitHubIssueGenerator.GitHubIssueGenerator.max_body_length)
+                self.assertEqual(_page.count("```") % 2, 0)
+            # Most severe first, a message too long for any page cut short, and the rest counted
+            self.assertIn("-> [P1][sev1][search] b\n\n```\n" + "b" * 300 + "\n```\n", _pages[0])
+            self.assertTrue(_pages[0].endswith("\n_Failing tests continue in the next comment._\n"))
+            self.assertTrue(_pages[1].startswith("## Failing Tests (continued)\n\n### :x: suite -> [P1][sev2][search] c\n\n```\nccc"))
+            self.assertIn("\n… (truncated)\n```\n", _pages[1])
+            self.assertTrue(_pages[2].startswith("## Failing Tests (continued)\n\n### :x: suite -> [P2][sev2][search] a\n\n"))
+            self.assertTrue(_pages[2].endswith("\n_…and 1 more failing test not listed, see the full report._\n"))
+            # The dry run writes out exactly what would be posted
+            _generator.open_github_issue()
+            with open(TestGitHubIssueGenerator.output_file, "r+") as f:
+                self.assertEqual(f.read(), _pages[0] + "\n<!-- Comment 1 of 2 -->\n" + _pages[1] + "\n<!-- Comment 2 of 2 -->\n" + _pages[2])
+        finally:
+            GitHubIssueGenerator.GitHubIssueGenerator.max_body_length = _max_body_length
+            GitHubIssueGenerator.GitHubIssueGenerator.max_overflow_comments = _max_overflow_comments
+
+
+    def test_github_issue_grouped_pages(self):
+        _aggregate = ra.ResultsAggregator()
+        for i in range(300):
+            _name = f"[P1][sev1][search] a test with a fairly long name that shares its failure message {i:03}"
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, ra.ResultsAggregator.get_case_metadata(_name, "shared " * 50, "a.xml"))
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "[P2][sev2][search] b", ra.ResultsAggregator.get_case_metadata("[P2][sev2][search] b", "b" * 300, "a.xml"))
+        _generator = GitHubIssueGenerator.GitHubIssueGenerator([], aggregated_results=_aggregate, group_messages=True)
+        # Only the first max_grouped_tests tests sharing a message are listed by name
+        _body = _generator.generate_github_issue_body()
+        self.assertIn("### :x: 300 Tests Failed With This Message\n\n", _body)
+        self.assertIn("message 099\n* …and 200 more\n\n```\n", _body)
+        self.assertNotIn("message 100\n", _body)
+        _max_body_length = GitHubIssueGenerator.GitHubIssueGenerator.max_body_length
+        try:
+            # Even that list is cut short when it doesn't fit on a page of its own
+            GitHubIssueGenerator.GitHubIssueGenerator.max_body_length = len(_generator.generate_github_issue_head()) + 3000
+            _pages = _generator.generate_github_issue_pages()
+            self.assertEqual(len(_pages), 2)
+            for _page in _pages:
+                self.assertLessEqual(len(_page), GitHubIssueGenerator.GitHubIssueGenerator.max_body_length)
+                self.assertEqual(_page.count("```") % 2, 0)
+            self.assertIn("* …\n\n```\nshared", _pages[0])
+            self.assertIn("-> [P2][sev2][search] b\n\n```\n" + "b" * 300 + "\n```\n", _pages[1])
+        finally:
+            GitHubIssueGenerator.GitHubIssueGenerator.max_body_length = _max_body_length
+
+
+    def test_github_issue_squad_pages(self):
+        _aggregate = ra.ResultsAggregator()
+        for _name in ["[P2][sev2][search] a", "[P1][sev1][observability,search] b", "[P1][sev1][search] c", "d"]:
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, ra.ResultsAggregator.get_case_metadata(_name, f"{_name} failed", "a.xml"))
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "[P1][sev1][search] e", ra.ResultsAggregator.get_case_metadata("[P1][sev1][search] e", "", "a.xml"))
+        # ex. a JSON report listing no squads for a result
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "f", {"message": "f failed", "squad(s)": []})
+        _generator = GitHubIssueGenerator.GitHubIssueGenerator([], aggregated_results=_aggregate)
+        # Each failure is filed under its first squad only
+        _failures_by_squad = _generator.get_failures_by_squad()
+        self.assertEqual({s: [r['name'] for r in f] for s, f in _failures_by_squad.items()},
+            {"search": ["[P1][sev1][search] c", "[P2][sev2][search] a"], "observability": ["[P1][sev1][observability,search] b"], "Unlabelled": ["d", "f"]})
+        _head = _generator.generate_github_issue_head()
+        _pages = _generator.generate_github_issue_pages(_failures_by_squad["search"], head=_head)
+        # A squad's issue shares the consolidated head, and lists only its own failures, most severe first
+        self.assertEqual(_pages, [_head + "## Failing Tests\n\n### :x: suite -> [P1][sev1][search] c\n\n```\n[P1][sev1][search] c failed\n```\n"
+            + "### :x: suite -> [P2][sev2][search] a\n\n```\n[P2][sev2][search] a failed\n```\n\n"])
+        self.assertEqual(_generator.generate_github_issue_pages(_failures_by_squad["search"]), _pages)
+        self.assertEqual(_generator.generate_github_issue_pages([]), [_head + "\n"])
+
+
     def tearDown(self):
         if os.path.exists(TestGitHubIssueGenerator.output_file):
             os.remove(TestGitHubIssueGenerator.output_file)
@@ -0,0 +1,74 @@
+import unittest, os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import IgnoreListMatcher
+
+class TestIgnoreListMatcher(unittest.TestCase):
+
+    ignorelist = [
+        {"name": "exact", "squad": "search", "owner": "someone"},
+        {"name": "scoped", "testsuite": "suite a"},
+        {"name": "Search: * configmaps", "match": "glob"},
+        {"name": r"(create|delete) cluster \d+", "match": "regex"},
+        {"name": "retried*", "match": "glob", "testsuite": "suite b"},
+        {"name": "stale"},
+        {"name": r"retry* in \w+", "match": "regex"}
+    ]
+
+    def test_match(self):
+        _matcher = IgnoreListMatcher.IgnoreListMatcher(TestIgnoreListMatcher.ignorelist)
+        _cases = [
+            ("suite a", "exact", 0),
+            ("suite b", "exact", 0),
+            ("suite a", "scoped", 1),
+            ("suite b", "scoped", None),
+            ("suite a", "Search: Viewer is NOT able to edit configmaps", 2),
+            ("suite a", "Search: configmaps", None),
+            ("suite a", "delete cluster 12", 3),
+            # Regex entries must match the whole name
+            ("suite a", "delete cluster 12 again", None),
+            ("suite b", "retried twice", 4),
+            ("suite a", "retried twice", None),
+            # The quantifier leaves only "retr" as the literal prefix
+            ("suite a", "retr in suite", 6),
+            ("suite a", "unlisted", None)
+        ]
+        for _testsuite, _name, _expected in _cases:
+            _entry = _matcher.match(_testsuite, _name)
+            self.assertIs(_entry, TestIgnoreListMatcher.ignorelist[_expected] if _expected is not None else None, (_testsuite, _name))
+        self.assertEqual([e['hits'] for e in _matcher.get_hits()], [2, 1, 1, 1, 1, 0, 1])
+        self.assertEqual(_matcher.get_hits()[0], {"name": "exact", "squad": "search", "owner": "someone", "hits": 2})
+
+
+    def test_invalid_entries_skipped(self):
+        _ignorelist = [
+            {"name": "(unclosed", "match": "regex"},
+            {"name": "x", "match": "fuzzy"},
+            # Reused group names can't share one regex, so these are matched separately
+            {"name": "(?P<n>a)b", "match": "regex"},
+            {"name": "(?P<n>c)d", "match": "regex"}
+        ]
+        _matcher = IgnoreListMatcher.IgnoreListMatcher(_ignorelist)
+        self.assertIsNone(_matcher.match("suite", "(unclosed"))
+        self.assertIsNone(_matcher.match("suite", "x"))
+        self.assertIs(_matcher.match("suite", "cd"), _ignorelist[3])
+        self.assertIs(_matcher.match("suite", "ab"), _ignorelist[2])
+
+
+    def test_aggregator_hits(self):
+        _ignorelist = [{"name": "flaky*", "match": "glob"}, {"name": "stale"}]
+        _partial = ra.ResultsAggregator(ignorelist=_ignorelist)
+        _partial.insert_result("suite", ra.ResultsAggregator.failed, "flaky one", {"message": "boom"})
+        _partial.insert_result("suite", ra.ResultsAggregator.passed, "flaky two", {"message": ""})
+        _partial.insert_result("suite", ra.ResultsAggregator.failed, "solid", {"message": "boom"})
+        self.assertEqual(_partial.get_counts(), (3, 1, 1, 0, 1))
+        self.assertEqual([e['hits'] for e in _partial.get_ignorelist_hits()], [1, 0])
+        # Results merged in already ignored are counted by the merging aggregate too
+        _merged = ra.ResultsAggregator(ignorelist=_ignorelist)
+        _merged.merge(_partial)
+        self.assertEqual(_merged.get_counts(), (3, 1, 1, 0, 1))
+        self.assertEqual([e['hits'] for e in _merged.get_ignorelist_hits()], [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
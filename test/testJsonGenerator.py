@@ -1,6 +1,8 @@
-import unittest, os, sys
+import unittest, os, sys, json, tempfile, shutil
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from generators import JsonGenerator
+from datamodel import CompactResults
+from datamodel import ResultsAggregator as ra
 
 class TestJsonGenerator(unittest.TestCase):
 
@@ -83,5 +85,61 @@ class TestJsonGenerator(unittest.TestCase):
         self.assertEqual(_js_report, _expected)
 
 
+    def test_json_report_round_trip(self):
+        _original = JsonGenerator.JsonGenerator([TestJsonGenerator.results_folder], ignorelist=TestJsonGenerator.ignorelist).generate_json_report()
+        _tmp_dir = tempfile.mkdtemp()
+        try:
+            _report_file = os.path.join(_tmp_dir, "results.json")
+            with open(_report_file, "w+") as f:
+                f.write(json.dumps(_original))
+            # Loading the report back rebuilds the same results, counts, and coverage - ignored results included
+            _reloaded = JsonGenerator.JsonGenerator([_report_file], ignorelist=TestJsonGenerator.ignorelist).generate_json_report()
+            self.assertEqual(_reloaded, _original)
+            _reloaded = JsonGenerator.JsonGenerator([_report_file]).generate_json_report()
+            self.assertEqual((_reloaded['results'], _reloaded['coverage'], _reloaded['ignored']), (_original['results'], _original['coverage'], 1))
+        finally:
+            shutil.rmtree(_tmp_dir)
+
+
+    def test_json_report_stream(self):
+        _generator = JsonGenerator.JsonGenerator([TestJsonGenerator.results_folder], ignorelist=TestJsonGenerator.ignorelist, snapshot="SNAPSHOT")
+        self.assertEqual("".join(_generator.iter_json_report()), json.dumps(_generator.generate_json_report()))
+        _generator = JsonGenerator.JsonGenerator([TestJsonGenerator.results_folder], lazy_messages=True, store="sqlite")
+        self.assertEqual(json.loads("".join(_generator.iter_json_report())), json.loads(json.dumps(_generator.generate_json_report())))
+
+
+    def test_json_report_formats(self):
+        _generator = JsonGenerator.JsonGenerator([TestJsonGenerator.results_folder], ignorelist=TestJsonGenerator.ignorelist, snapshot="SNAPSHOT")
+        _original = _generator.generate_json_report()
+        _summary = {k: v for k, v in _original.items() if k != "results"}
+        # NDJSON has a line per result, then the summary record
+        _lines = "".join(_generator.iter_ndjson_report()).split("\n")
+        self.assertEqual([json.loads(l) for l in _lines], _original['results'] + [{"summary": _summary}])
+        # Compact JSON lists each repeated string once, and decodes back to the same results
+        _compact = json.loads("".join(_generator.iter_compact_json_report()))
+        self.assertEqual(len(_compact['strings']), len(set(_compact['strings'])))
+        self.assertIn("Severity 1 - Urgent", _compact['strings'])
+        self.assertEqual([CompactResults.CompactResults.decode(r, _compact['strings']) for r in _compact['results']], _original['results'])
+        self.assertEqual({k: v for k, v in _compact.items() if k not in ("format", "format_version", "strings", "results")}, _summary)
+        _tmp_dir = tempfile.mkdtemp()
+        try:
+            # Both load back like a JSON report, ignored results included
+            for _format in [JsonGenerator.JsonGenerator.ndjson_format, JsonGenerator.JsonGenerator.compact_format]:
+                _report_file = os.path.join(_tmp_dir, f"results.{_format}")
+                _generator.output_format = _format
+                with open(_report_file, "w+") as f:
+                    f.write("".join(_generator.iter_report()))
+                _reloaded = JsonGenerator.JsonGenerator([_report_file], ignorelist=TestJsonGenerator.ignorelist, snapshot="SNAPSHOT").generate_json_report()
+                self.assertEqual(_reloaded, _original)
+            # A report with no results is just the summary record - it still loads as NDJSON, not as a failed load
+            _empty = JsonGenerator.JsonGenerator([], aggregated_results=ra.ResultsAggregator(), output_format=JsonGenerator.JsonGenerator.ndjson_format)
+            _report_file = os.path.join(_tmp_dir, "empty.ndjson")
+            with open(_report_file, "w+") as f:
+                f.write("".join(_empty.iter_report()))
+            self.assertEqual(JsonGenerator.JsonGenerator([_report_file]).aggregated_results.get_counts(), (0, 0, 0, 0, 0))
+        finally:
+            shutil.rmtree(_tmp_dir)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
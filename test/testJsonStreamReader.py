@@ -0,0 +1,60 @@
+import unittest, os, sys, io, json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import JsonStreamReader
+
+class TestJsonStreamReader(unittest.TestCase):
+
+    document = {"total": 123456, "results": [{"name": "café ☃", "n": 1.5e10}, [], "x" * 300, None, True], "coverage": {"passed": 99.5}}
+
+    def read(self, data, key="results", read_size=JsonStreamReader.JsonStreamReader.read_size):
+        _original = JsonStreamReader.JsonStreamReader.read_size
+        JsonStreamReader.JsonStreamReader.read_size = read_size
+        try:
+            _reader = JsonStreamReader.JsonStreamReader(io.BytesIO(data))
+            return list(_reader.iter_items(key)), _reader.members
+        finally:
+            JsonStreamReader.JsonStreamReader.read_size = _original
+
+
+    def test_matches_json_loads(self):
+        _data = json.dumps(TestJsonStreamReader.document, indent=2, ensure_ascii=False).encode("utf-8")
+        _expected_members = {k: v for k, v in TestJsonStreamReader.document.items() if k != "results"}
+        # Tiny reads split numbers, strings, and multi-byte characters across chunk boundaries
+        for _read_size in [1, 3, 7, 64 * 1024]:
+            _items, _members = self.read(_data, read_size=_read_size)
+            self.assertEqual(_items, TestJsonStreamReader.document['results'])
+            self.assertEqual(_members, _expected_members)
+
+
+    def test_top_level_array_and_bom(self):
+        self.assertEqual(self.read(b"\xef\xbb\xbf [1, {\"a\": 2}] ", read_size=2), ([1, {"a": 2}], {}))
+        self.assertEqual(self.read(b"{}"), ([], {}))
+        self.assertEqual(self.read(b"{\"results\": []}"), ([], {}))
+
+
+    def test_iter_objects(self):
+        _document = [{"name": "a", "specs": [1, 2, 3], "after": True}, {"name": "b"}, {"specs": [4], "name": "c"}]
+        for _read_size in [1, 5, 64 * 1024]:
+            JsonStreamReader.JsonStreamReader.read_size, _original = _read_size, JsonStreamReader.JsonStreamReader.read_size
+            try:
+                _objects = []
+                for _members, _items in JsonStreamReader.JsonStreamReader(io.BytesIO(json.dumps(_document).encode())).iter_objects("specs"):
+                    # Only the first item of each object is read, the rest are skipped
+                    _first = next(_items, None)
+                    _objects.append((dict(_members), _first, _members))
+            finally:
+                JsonStreamReader.JsonStreamReader.read_size = _original
+            self.assertEqual([o[:2] for o in _objects], [({"name": "a"}, 1), ({"name": "b"}, None), ({}, 4)])
+            self.assertEqual([o[2] for o in _objects], [{"name": "a", "after": True}, {"name": "b"}, {"name": "c"}])
+        with self.assertRaises(ValueError):
+            list(JsonStreamReader.JsonStreamReader(io.BytesIO(b"[{}, 1]")).iter_objects("specs"))
+
+
+    def test_invalid_documents(self):
+        for _data in [b"{\"results\": [1, 2", b"{\"results\": [1 2]}", b"{\"total\": 1} trailing", b"{1: 2}", b"not json", b""]:
+            with self.assertRaises(ValueError, msg=_data):
+                self.read(_data, read_size=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
-import unittest, os, sys
+import unittest, os, sys, io, tempfile, shutil
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from generators import MarkdownGenerator
+from generators import MarkdownGenerator, ReportWriter
+from datamodel import ResultsAggregator as ra
 
 class TestMarkdownGenerator(unittest.TestCase):
 
@@ -349,6 +350,51 @@ https://on.cypress.io/element-cannot-be-interacted-with
 """)
 
 
+    def test_markdown_body_grouped(self):
+        _aggregate = ra.ResultsAggregator()
+        for _name, _message in [("a", "timed out"), ("b", "boom"), ("c", "timed out")]:
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, {"message": _message})
+        _md_generator = MarkdownGenerator.MarkdownGenerator([], group_messages=True, aggregated_results=_aggregate)
+        self.assertEqual(_md_generator.generate_body(), """## Failing Tests
+
+### :x: 2 Tests Failed With This Message
+
+* :x: suite -> a
+* :x: suite -> c
+
+```
+timed out
+```
+### :x: suite -> b
+
+```
+boom
+```
+""")
+
+
+    def test_markdown_report_stream(self):
+        _md_generator = MarkdownGenerator.MarkdownGenerator([TestMarkdownGenerator.results_folder], ignorelist=TestMarkdownGenerator.ignorelist)
+        _expected = _md_generator.generate_markdown_report()
+        self.assertEqual("".join(_md_generator.iter_markdown_report()), _expected)
+        # A small buffer flushes part way through the report
+        _original, ReportWriter.ReportWriter.buffer_size = ReportWriter.ReportWriter.buffer_size, 100
+        try:
+            _out = io.StringIO()
+            with ReportWriter.ReportWriter(_out) as _writer:
+                _writer.writelines(_md_generator.iter_markdown_report())
+                self.assertTrue(0 < len(_out.getvalue()) < len(_expected))
+        finally:
+            ReportWriter.ReportWriter.buffer_size = _original
+        self.assertEqual(_out.getvalue(), _expected)
+        _tmp_dir = tempfile.mkdtemp()
+        try:
+            ReportWriter.ReportWriter.write_report(_md_generator.iter_markdown_report(), os.path.join(_tmp_dir, "report.md"))
+            with open(os.path.join(_tmp_dir, "report.md")) as f:
+                self.assertEqual(f.read(), _expected)
+        finally:
+            shutil.rmtree(_tmp_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
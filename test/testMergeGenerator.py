@@ -0,0 +1,77 @@
+import unittest, os, sys, tempfile, shutil, contextlib, io
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from generators import MergeGenerator, StatusGenerator
+from datamodel import ResultsAggregator as ra
+from datamodel import ResultsArtifact
+
+class TestMergeGenerator(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def write_artifact(self, name, cases, ignorelist=[]):
+        _aggregate = ra.ResultsAggregator(ignorelist=ignorelist)
+        for _testsuite, _state, _name, _message in cases:
+            _aggregate.insert_result(_testsuite, _state, _name, {"message": _message, "filename": name})
+        _path = os.path.join(self.tmp_dir, name)
+        ResultsArtifact.ResultsArtifact.write(_aggregate, _path)
+        return _path
+
+
+    def test_artifact_round_trip(self):
+        _original = ra.ResultsAggregator(files=[os.path.join(TestMergeGenerator.results_folder, f) for f in sorted(os.listdir(TestMergeGenerator.results_folder))])
+        _path = os.path.join(self.tmp_dir, "node.cra")
+        ResultsArtifact.ResultsArtifact.write(_original, _path)
+        _loaded = ra.ResultsAggregator(files=[_path])
+        self.assertEqual(_loaded.get_raw_results(), _original.get_raw_results())
+        with open(_path, "rb") as f:
+            self.assertEqual(ResultsArtifact.ResultsArtifact.read_header(f)['counts']['total'], 13)
+
+
+    def test_merge_uses_duplicate_rules(self):
+        _first = self.write_artifact("node-1.cra", [("suite", "passed", "flaky", ""), ("suite", "passed", "a", "")])
+        _second = self.write_artifact("node-2.cra", [("suite", "failed", "flaky", "boom"), ("suite", "skipped", "b", "")])
+        _generator = MergeGenerator.MergeGenerator([_first, _second])
+        self.assertEqual(_generator.aggregated_results.get_counts(), (3, 1, 1, 1, 0))
+        _merged = os.path.join(self.tmp_dir, "merged.cra")
+        _generator.generate_artifact(_merged)
+        _flaky = [r for r in ra.ResultsAggregator(files=[_merged]).get_results() if r['name'] == "flaky"][0]
+        self.assertEqual((_flaky['state'], _flaky['metadata']['message']), ("failed", "boom"))
+
+
+    def test_merge_applies_recorded_ignorelists(self):
+        _first = self.write_artifact("node-1.cra", [("suite", "failed", "known", "boom")], ignorelist=[{"name": "known", "squad": "s", "owner": "o"}])
+        _second = self.write_artifact("node-2.cra", [("suite", "failed", "new", "boom")])
+        self.assertEqual(MergeGenerator.MergeGenerator([_first, _second]).aggregated_results.get_counts(), (2, 0, 1, 0, 1))
+        # An explicit ignorelist replaces the recorded ones
+        _other = [{"name": "other", "squad": "s", "owner": "o"}]
+        self.assertEqual(MergeGenerator.MergeGenerator([_first, _second], ignorelist=_other).aggregated_results.get_counts(), (2, 0, 2, 0, 0))
+
+
+    def test_status_keeps_ignored_results(self):
+        _path = self.write_artifact("node.cra", [("suite", "failed", "known", "boom"), ("suite", "passed", "a", "")], ignorelist=[{"name": "known", "squad": "s", "owner": "o"}])
+        _generator = StatusGenerator.StatusGenerator([_path])
+        self.assertEqual(_generator.aggregated_results.get_counts(), (2, 1, 0, 0, 1))
+        _known = [r for r in _generator.aggregated_results.get_results() if r['name'] == "known"][0]
+        self.assertEqual(_known['state'], "ignored")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(_generator.generate_status(), 1)
+
+
+    def test_corrupt_artifact_is_a_failure(self):
+        _path = os.path.join(self.tmp_dir, "broken.cra")
+        with open(_path, "wb") as f:
+            f.write(ResultsArtifact.ResultsArtifact.magic + b"\x01\x00\x00\x00\x02{}not zlib")
+        _results = ra.ResultsAggregator(files=[_path]).get_results()
+        self.assertEqual([(r['name'], r['state']) for r in _results], [(f"Load {_path}", "failed")])
+
+
+if __name__ == '__main__':
+    unittest.main()
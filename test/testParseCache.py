@@ -0,0 +1,73 @@
+import unittest, os, sys, tempfile, shutil, time, argparse
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import ParseCache
+
+class TestParseCache(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+    ignorelist = [
+        {
+            "name": "Search: Viewer is NOT able to edit configmaps",
+            "squad": "search",
+            "owner": "@anonymous-user-that-I-wont-name"
+        }
+    ]
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.files = sorted(os.path.join(TestParseCache.results_folder, f) for f in os.listdir(TestParseCache.results_folder))
+
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+
+    def test_cached_load_matches_parse(self):
+        _expected = ra.ResultsAggregator(files=self.files, ignorelist=TestParseCache.ignorelist).get_raw_results()
+        _cache = ParseCache.ParseCache(self.cache_dir)
+        _first = ra.ResultsAggregator(files=self.files, ignorelist=TestParseCache.ignorelist, cache=_cache)
+        self.assertEqual(len(os.listdir(self.cache_dir)), len(self.files))
+        _second = ra.ResultsAggregator(files=self.files, ignorelist=TestParseCache.ignorelist, cache=_cache)
+        self.assertEqual(_first.get_raw_results(), _expected)
+        self.assertEqual(_second.get_raw_results(), _expected)
+
+
+    def test_cache_hit_skips_parse(self):
+        _cache = ParseCache.ParseCache(self.cache_dir)
+        _key = _cache.key(self.files[0], ra.ResultsAggregator.parser_version)
+        _cache.put(_key, [("cached suite", ra.ResultsAggregator.passed, "cached case", {"message": ""})])
+        _aggregate = ra.ResultsAggregator(files=[self.files[0]], cache=_cache)
+        self.assertEqual([r['name'] for r in _aggregate.get_results()], ["cached case"])
+        self.assertNotEqual(_key, _cache.key(self.files[0], ra.ResultsAggregator.parser_version + 1))
+
+
+    def test_prune_evicts_least_recently_used(self):
+        _cache = ParseCache.ParseCache(self.cache_dir, max_bytes=0)
+        _cache.put("old", [("suite", "passed", "a", {})])
+        _cache.put("new", [("suite", "passed", "b", {})])
+        _size = os.path.getsize(os.path.join(self.cache_dir, "new.bin"))
+        os.utime(os.path.join(self.cache_dir, "old.bin"), (time.time() - 60, time.time() - 60))
+        _cache.max_bytes = _size
+        _cache.prune()
+        self.assertIsNone(_cache.get("old"))
+        self.assertEqual(_cache.get("new"), [("suite", "passed", "b", {})])
+
+
+    def test_unavailable_cache_dir(self):
+        # ex. a read-only or missing home directory - here the cache directory's parent is a file
+        _parent = os.path.join(self.cache_dir, "not-a-directory")
+        with open(_parent, "w+") as f:
+            f.write("")
+        _args = argparse.Namespace(no_cache=False, cache_dir=os.path.join(_parent, "cache"), cache_size_mb="1")
+        self.assertIsNone(ParseCache.ParseCache.from_args(_args))
+        # A cache whose directory goes away still loads results, it just doesn't store them
+        _cache = ParseCache.ParseCache(os.path.join(self.cache_dir, "cache"))
+        shutil.rmtree(_cache.cache_dir)
+        _aggregate = ra.ResultsAggregator(files=self.files, cache=_cache)
+        self.assertEqual(_aggregate.get_raw_results(), ra.ResultsAggregator(files=self.files).get_raw_results())
+        self.assertFalse(os.path.exists(_cache.cache_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
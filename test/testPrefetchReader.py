@@ -0,0 +1,48 @@
+import unittest, os, sys, tempfile, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import PrefetchReader, ParseCache
+
+class TestPrefetchReader(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def test_read_ahead_in_order(self):
+        _files = []
+        for i in range(50):
+            _files.append(os.path.join(self.tmp_dir, f"{i}.xml"))
+            with open(_files[-1], "w+") as f:
+                f.write(str(i) * (i + 1))
+        _missing = os.path.join(self.tmp_dir, "missing.xml")
+        _reader = PrefetchReader.PrefetchReader([*_files, _missing], depth=4, max_file_bytes=40)
+        _read = list(_reader)
+        self.assertEqual([f for f, _data in _read], [*_files, _missing])
+        # Files past max_file_bytes and files that can't be read are left for the loader to open
+        self.assertEqual([_data for f, _data in _read], [_c if len(_c) <= 40 else None for _c in (str(i).encode() * (i + 1) for i in range(50))] + [None])
+
+
+    def test_aggregate_matches_unprefetched(self):
+        _files = sorted(os.path.join(TestPrefetchReader.results_folder, f) for f in os.listdir(TestPrefetchReader.results_folder))
+        _expected = ra.ResultsAggregator(files=_files, prefetch=0)
+        self.assertEqual(ra.ResultsAggregator(files=_files, prefetch=3).get_raw_results(), _expected.get_raw_results())
+        # Lazy message references point into the files themselves rather than the prefetched bytes
+        _lazy = ra.ResultsAggregator(files=_files, prefetch=3, lazy_messages=True)
+        self.assertEqual([_lazy.get_message(r) for r in _lazy.get_results()], [_expected.get_message(r) for r in _expected.get_results()])
+        # Prefetched files hash to the same parse cache entries as files read by the cache itself
+        _cache = ParseCache.ParseCache(os.path.join(self.tmp_dir, "cache"))
+        ra.ResultsAggregator(files=_files, prefetch=0, cache=_cache)
+        _entries = sorted(os.listdir(_cache.cache_dir))
+        self.assertEqual(ra.ResultsAggregator(files=_files, prefetch=3, cache=_cache).get_raw_results(), _expected.get_raw_results())
+        self.assertEqual(sorted(os.listdir(_cache.cache_dir)), _entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
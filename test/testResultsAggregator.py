@@ -0,0 +1,275 @@
+import unittest, os, sys, json, tempfile, shutil, tarfile, zipfile, gzip, bz2, lzma
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import LoaderRegistry, MessageRef, ParseCache
+
+class TestResultsAggregator(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def write_file(self, name, contents):
+        _path = os.path.join(self.tmp_dir, name)
+        with open(_path, "w+") as f:
+            f.write(contents)
+        return _path
+
+
+    def test_load_xml_testsuites_root(self):
+        _aggregate = ra.ResultsAggregator(files=[os.path.join(TestResultsAggregator.results_folder, "console-ui-5a5a75448822a22f63c3c1aa6155320048f82336-console-ui-init.xml")])
+        self.assertEqual(_aggregate.get_counts(), (8, 7, 1, 0, 0))
+        _failed = [r for r in _aggregate.get_results() if r['state'] == ra.ResultsAggregator.failed]
+        self.assertEqual(len(_failed), 1)
+        self.assertEqual(_failed[0]['testsuite'], "Provider connections")
+        self.assertTrue(_failed[0]['metadata']['message'].startswith("CypressError: Timed out retrying"))
+
+
+    def test_load_xml_testsuite_root(self):
+        _file = self.write_file("bare.xml", """<?xml version="1.0"?>
+<testsuite name="bare">
+  <properties><property name="browser" value="chrome"/></properties>
+  <testcase name="[P2][Severity 2 - Major][search,console] passes"><system-out>lots of noise</system-out></testcase>
+  <testcase name="skips"><skipped/></testcase>
+  <testcase name="fails"><skipped/><failure message="m">first</failure><failure>second</failure><system-err>noise</system-err></testcase>
+</testsuite>""")
+        _aggregate = ra.ResultsAggregator(files=[_file])
+        _results = {r['name']: r for r in _aggregate.get_results()}
+        self.assertEqual(_aggregate.get_counts(), (3, 1, 1, 1, 0))
+        self.assertEqual(_results['skips']['state'], ra.ResultsAggregator.skipped)
+        self.assertEqual(_results['fails']['state'], ra.ResultsAggregator.failed)
+        self.assertEqual(_results['fails']['metadata']['message'], "first")
+        self.assertEqual(_results['fails']['testsuite'], "bare")
+        _tagged = _results['[P2][Severity 2 - Major][search,console] passes']['metadata']
+        self.assertEqual(_tagged['message'], "")
+        self.assertEqual(_tagged['priority'], "P2")
+        self.assertEqual(_tagged['squad(s)'], ["search", "console"])
+
+
+    def test_load_xml_invalid(self):
+        _file = self.write_file("broken.xml", "<testsuites><testsuite name=\"broken\">")
+        _aggregate = ra.ResultsAggregator()
+        _aggregate.load_file(_file, filetype="xml")
+        _results = _aggregate.get_results()
+        self.assertEqual(len(_results), 1)
+        self.assertEqual(_results[0]['name'], f"Load {_file}")
+        self.assertEqual(_results[0]['state'], ra.ResultsAggregator.failed)
+
+
+    def test_insert_result_duplicates(self):
+        _aggregate = ra.ResultsAggregator(ignorelist=[{"name": "flaky"}])
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "retried", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "retried", {"message": "boom"})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "retried", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.skipped, "flaky", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "flaky", {"message": "flake"})
+        _aggregate.insert_result("other suite", ra.ResultsAggregator.passed, "retried", {"message": ""})
+        self.assertEqual(_aggregate.get_counts(), (3, 1, 1, 0, 1))
+        self.assertEqual(_aggregate.get_coverage(), {ra.ResultsAggregator.skipped: 100, ra.ResultsAggregator.passed: (1 / 3) * 100})
+        _results = {(r['testsuite'], r['name']): r for r in _aggregate.get_results()}
+        self.assertEqual(_results[("suite", "retried")]['state'], ra.ResultsAggregator.failed)
+        self.assertEqual(_results[("suite", "retried")]['metadata']['message'], "boom")
+        self.assertEqual(_results[("suite", "flaky")]['state'], ra.ResultsAggregator.ignored)
+
+
+    def test_insert_result_duplicate_counts(self):
+        _aggregate = ra.ResultsAggregator()
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "b", {"message": "".join(["bo", "om"])})
+        _message = "".join(["bo", "om"])
+        _metadata = {"message": _message, "filename": "a.xml"}
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "a", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "a", _metadata)
+        # Replacing a duplicate moves it between states without adding to the total, however often it's retried
+        self.assertEqual(_aggregate.get_counts(), (2, 0, 2, 0, 0))
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "a", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "a", {"message": "boom again"})
+        self.assertEqual(_aggregate.get_counts(), (2, 0, 2, 0, 0))
+        # The caller's metadata isn't modified when its message is interned (as b's equal message)
+        self.assertIs(_metadata['message'], _message)
+        self.assertEqual(_metadata, {"message": "boom", "filename": "a.xml"})
+
+
+    def test_parallel_load_matches_serial(self):
+        _files = sorted(os.path.join(TestResultsAggregator.results_folder, f) for f in os.listdir(TestResultsAggregator.results_folder))
+        _broken = self.write_file("broken.xml", "neither xml nor json")
+        _ignorelist = [{"name": "Search: Viewer is NOT able to edit configmaps"}]
+        _serial = ra.ResultsAggregator(files=_files, ignorelist=_ignorelist)
+        _parallel = ra.ResultsAggregator(files=[*_files, _broken], ignorelist=_ignorelist, jobs=2)
+        _results = _parallel.get_raw_results()
+        _failed_load = [r for r in _results['results'] if r['name'] == f"Load {_broken}"]
+        self.assertEqual(len(_failed_load), 1)
+        _parallel_ok = ra.ResultsAggregator(files=_files, ignorelist=_ignorelist, jobs=2)
+        self.assertEqual(_parallel_ok.get_raw_results(), _serial.get_raw_results())
+
+
+    def test_merge(self):
+        _first = ra.ResultsAggregator()
+        _first.insert_result("suite", ra.ResultsAggregator.passed, "a", {"message": ""})
+        _first.insert_result("suite", ra.ResultsAggregator.passed, "b", {"message": ""})
+        _second = ra.ResultsAggregator()
+        _second.insert_result("suite", ra.ResultsAggregator.failed, "a", {"message": "boom"})
+        _second.insert_result("suite", ra.ResultsAggregator.skipped, "c", {"message": ""})
+        _first.merge(_second)
+        self.assertEqual(_first.get_counts(), (3, 1, 1, 1, 0))
+        self.assertEqual([r['state'] for r in _first.get_results()], [ra.ResultsAggregator.failed, ra.ResultsAggregator.passed, ra.ResultsAggregator.skipped])
+
+
+    def test_sniff_formats(self):
+        self.assertEqual(LoaderRegistry.LoaderRegistry.sniff(b"\xef\xbb\xbf  <?xml version='1.0'?><testsuites/>"), "xml")
+        self.assertEqual(LoaderRegistry.LoaderRegistry.sniff("<testsuite/>".encode("utf-16")), "xml")
+        self.assertEqual(LoaderRegistry.LoaderRegistry.sniff(b"\n{\"results\": []}"), "json")
+        self.assertIsNone(LoaderRegistry.LoaderRegistry.sniff(b"name,state\n"))
+
+
+    def test_registered_loader(self):
+        def _load_csv(aggregator, stream, filename):
+            for _line in stream.read().decode().splitlines()[1:]:
+                _name, _state = _line.split(",")
+                aggregator.insert_result("csv", _state, _name, ra.ResultsAggregator.get_case_metadata(_name, "", filename))
+        LoaderRegistry.LoaderRegistry.register("csv", lambda text: text.startswith("name,state"), _load_csv)
+        try:
+            _file = self.write_file("results.csv", "name,state\na,passed\nb,failed\n")
+            _aggregate = ra.ResultsAggregator(files=[_file])
+            self.assertEqual(_aggregate.get_counts(), (2, 1, 1, 0, 0))
+        finally:
+            LoaderRegistry.LoaderRegistry.unregister("csv")
+
+
+    def test_load_archives(self):
+        _files = sorted(os.listdir(TestResultsAggregator.results_folder))
+        _expected = ra.ResultsAggregator(files=[os.path.join(TestResultsAggregator.results_folder, f) for f in _files])
+        _zip = os.path.join(self.tmp_dir, "results.zip")
+        with zipfile.ZipFile(_zip, "w", compression=zipfile.ZIP_DEFLATED) as _z:
+            _z.writestr("notes.txt", "not a results file")
+            for _f in _files:
+                _z.write(os.path.join(TestResultsAggregator.results_folder, _f), f"shard/{_f}")
+        _tar = os.path.join(self.tmp_dir, "results.tar.gz")
+        with tarfile.open(_tar, "w:gz") as _t:
+            for _f in _files:
+                _t.add(os.path.join(TestResultsAggregator.results_folder, _f), f"shard/{_f}")
+        for _archive in [_zip, _tar]:
+            _aggregate = ra.ResultsAggregator(files=[_archive])
+            self.assertEqual(_aggregate.get_counts(), _expected.get_counts())
+            self.assertEqual([r['name'] for r in _aggregate.get_results()], [r['name'] for r in _expected.get_results()])
+            self.assertEqual(sorted(set(r['metadata']['filename'] for r in _aggregate.get_results())), _files)
+        _corrupt = self.write_file("corrupt.zip", "PK\x03\x04 truncated")
+        _aggregate = ra.ResultsAggregator(files=[_corrupt])
+        self.assertEqual(_aggregate.get_counts(), (1, 0, 1, 0, 0))
+        # A compressed results file isn't a tar archive, even though tarfile could open its compression
+        with open(_tar, "rb") as f:
+            self.assertEqual(LoaderRegistry.LoaderRegistry.sniff(f.read(LoaderRegistry.LoaderRegistry.sniff_size)), "tar")
+        with open(os.path.join(TestResultsAggregator.results_folder, _files[0]), "rb") as f:
+            _xml = f.read()
+        for _compress in [gzip.compress, bz2.compress, lzma.compress]:
+            self.assertIsNone(LoaderRegistry.LoaderRegistry.sniff(_compress(_xml)[:LoaderRegistry.LoaderRegistry.sniff_size]))
+
+
+    def test_load_ginkgo(self):
+        _spec = lambda texts, text, state, **kwargs: {"ContainerHierarchyTexts": texts, "ContainerHierarchyLabels": [["squad:search"]] * len(texts),
+            "LeafNodeType": "It", "LeafNodeText": text, "LeafNodeLabels": [], "State": state, **kwargs}
+        _report = [{"SuitePath": "/go/src/search", "SuiteDescription": "Search Suite", "SuiteSucceeded": False, "SpecReports": [
+            {"ContainerHierarchyTexts": None, "LeafNodeType": "BeforeSuite", "LeafNodeText": "", "State": "passed"},
+            _spec(["Search"], "lists pods", "passed"),
+            _spec(["Search"], "lists configmaps", "failed", LeafNodeLabels=["p2", "sev3", "squad:console"], Failure={"Message": "Expected 3 to equal 4",
+                "FailureNodeType": "It", "Location": {"FileName": "/go/src/search/search_test.go", "LineNumber": 42, "FullStackTrace": "search.test.func1()"}}),
+            _spec(["[P3][sev2][observability] Metrics"], "scrapes", "panicked", Failure={"Message": "Test Panicked", "ForwardedPanic": "nil map"}),
+            _spec(["Search"], "pending", "pending"),
+            _spec(["Search"], "skipped", "skipped", Failure={"Message": "not on this platform"})]},
+            {"SuitePath": "/go/src/empty", "SuiteDescription": "Empty Suite", "SpecReports": None}]
+        _file = self.write_file("ginkgo.json", json.dumps(_report, indent=2))
+        self.assertEqual(LoaderRegistry.LoaderRegistry.sniff(json.dumps(_report, indent=2).encode()), "ginkgo")
+        _aggregate = ra.ResultsAggregator(files=[_file], ignorelist=[{"name": "[It] Search lists configmaps [squad:search, p2, sev3, squad:console]"}])
+        self.assertEqual(_aggregate.get_counts(), (6, 2, 1, 2, 1))
+        _results = {r['name']: r for r in _aggregate.get_results()}
+        self.assertEqual(sorted(_results), ["[BeforeSuite]", "[It] Search lists configmaps [squad:search, p2, sev3, squad:console]", "[It] Search lists pods [squad:search]",
+            "[It] Search pending [squad:search]", "[It] Search skipped [squad:search]", "[It] [P3][sev2][observability] Metrics scrapes [squad:search]"])
+        self.assertEqual({r['testsuite'] for r in _results.values()}, {"Search Suite"})
+        _ignored = _results["[It] Search lists configmaps [squad:search, p2, sev3, squad:console]"]['metadata']
+        self.assertEqual((_ignored['priority'], _ignored['severity'], _ignored['squad(s)'], _ignored['filename']), ("p2", "sev3", ["search", "console"], "ginkgo.json"))
+        self.assertEqual(_ignored['message'], "[FAILED] Expected 3 to equal 4\nIn [It] at: /go/src/search/search_test.go:42\n\nFull Stack Trace\nsearch.test.func1()")
+        # Tags in the spec text are kept unless a label overrides them
+        _panicked = _results["[It] [P3][sev2][observability] Metrics scrapes [squad:search]"]
+        self.assertEqual((_panicked['state'], _panicked['metadata']['priority'], _panicked['metadata']['severity'], _panicked['metadata']['squad(s)']),
+            (ra.ResultsAggregator.failed, "P3", "sev2", ["search"]))
+        self.assertEqual(_panicked['metadata']['message'], "[PANICKED] Test Panicked\n\nnil map")
+        self.assertEqual(_results["[It] Search skipped [squad:search]"]['metadata']['message'], "")
+        self.assertEqual(_results["[BeforeSuite]"]['metadata']['squad(s)'], ["Unlabelled"])
+        _truncated = self.write_file("truncated.json", json.dumps(_report)[:300])
+        self.assertEqual(ra.ResultsAggregator(files=[_truncated]).get_results(states=[ra.ResultsAggregator.failed])[-1]['name'], f"Load {_truncated}")
+
+
+    def test_lazy_messages(self):
+        _latin = os.path.join(self.tmp_dir, "latin.xml")
+        with open(_latin, "wb") as f:
+            f.write("""<?xml version="1.0" encoding="ISO-8859-1"?>
+<testsuite name="latin">
+  <testcase name="entities"><failure message="m">caf\u00e9 &amp; <![CDATA[<cdata>]]></failure><failure>second</failure></testcase>
+  <testcase name="empty"><failure message="m"/></testcase>
+  <testcase name="passes"/>
+</testsuite>""".encode("latin-1"))
+        _files = [os.path.join(TestResultsAggregator.results_folder, f) for f in sorted(os.listdir(TestResultsAggregator.results_folder))] + [_latin]
+        _eager = ra.ResultsAggregator(files=_files)
+        _cache = ParseCache.ParseCache(os.path.join(self.tmp_dir, "cache"))
+        for _lazy in [ra.ResultsAggregator(files=_files, lazy_messages=True),
+            ra.ResultsAggregator(files=_files, lazy_messages=True, jobs=2),
+            ra.ResultsAggregator(files=_files, lazy_messages=True, cache=_cache),
+            ra.ResultsAggregator(files=_files, lazy_messages=True, cache=_cache)]:
+            _refs = [r for r in _lazy.get_results() if isinstance(r['metadata']['message'], MessageRef.MessageRef)]
+            self.assertEqual(len(_refs), 5)
+            self.assertEqual([_lazy.get_message(r) for r in _lazy.get_results()], [_eager.get_message(r) for r in _eager.get_results()])
+            self.assertEqual(_lazy.get_raw_results(), _eager.get_raw_results())
+        self.assertEqual([_eager.get_message(r) for r in _eager.get_results() if r['testsuite'] == "latin"], ["", "caf\u00e9 & <cdata>", ""])
+
+
+    def test_message_groups(self):
+        _aggregate = ra.ResultsAggregator(ignorelist=[{"name": "d"}])
+        for _name, _message in [("a", "timed out"), ("b", "boom"), ("c", "timed out"), ("d", "timed " + "out")]:
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, {"message": _message})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "e", {"message": ""})
+        _results = {r['name']: r for r in _aggregate.get_results()}
+        # Equal messages are stored once
+        self.assertIs(_results['a']['metadata']['message'], _results['d']['metadata']['message'])
+        _groups = _aggregate.get_message_groups()
+        self.assertEqual([(g['message'], [r['name'] for r in g['results']]) for g in _groups], [("timed out", ["a", "c", "d"]), ("boom", ["b"])])
+        self.assertNotEqual(_groups[0]['id'], _groups[1]['id'])
+        self.assertEqual([g['message'] for g in _aggregate.get_message_groups(states=[ra.ResultsAggregator.ignored])], ["timed out"])
+
+
+    def test_filtered_results(self):
+        _aggregate = ra.ResultsAggregator()
+        for _suite, _state, _name in [("s2", "passed", "[P2][Sev2][ui,api] shared"), ("s1", "failed", "[P1][Sev1][api] b"),
+            ("s1", "passed", "[P2][Sev2][ui,api] shared"), ("s1", "skipped", "c"), ("s1", "passed", "a")]:
+            _aggregate.insert_result(_suite, _state, _name, ra.ResultsAggregator.get_case_metadata(_name, "", "f.xml"))
+        # A duplicate failure moves a result into the failed index, keeping its place in name order
+        _aggregate.insert_result("s2", "failed", "[P2][Sev2][ui,api] shared", ra.ResultsAggregator.get_case_metadata("[P2][Sev2][ui,api] shared", "boom", "f.xml"))
+        _aggregate.insert_result("s1", "failed", "[P2][Sev2][ui,api] shared", ra.ResultsAggregator.get_case_metadata("[P2][Sev2][ui,api] shared", "boom", "f.xml"))
+        _keys = lambda results: [(r['testsuite'], r['name']) for r in results]
+        _failed = [r for r in _aggregate.get_results() if r['state'] == "failed"]
+        self.assertEqual(_keys(_aggregate.get_results(states=["failed"])), _keys(_failed))
+        self.assertEqual(_keys(_aggregate.get_results(states=["failed"])), [("s1", "[P1][Sev1][api] b"), ("s2", "[P2][Sev2][ui,api] shared"), ("s1", "[P2][Sev2][ui,api] shared")])
+        self.assertEqual(_keys(_aggregate.get_results(states=["failed"], squad="ui")), [("s2", "[P2][Sev2][ui,api] shared"), ("s1", "[P2][Sev2][ui,api] shared")])
+        self.assertEqual(_keys(_aggregate.get_results(squad="Unlabelled")), [("s1", "a"), ("s1", "c")])
+        self.assertEqual(_keys(_aggregate.get_results(states=["failed", "skipped"], severity="Sev1", priority="P1")), [("s1", "[P1][Sev1][api] b")])
+        self.assertEqual(_aggregate.get_results(states=["ignored"]), [])
+
+
+    def test_iter_results(self):
+        _aggregate = ra.ResultsAggregator()
+        for i in range(100):
+            _name = f"[P{i % 3}][Sev1][squad{i % 4}] case {99 - i}"
+            _aggregate.insert_result(f"suite {i % 2}", "failed" if i % 20 == 0 else "passed", _name, ra.ResultsAggregator.get_case_metadata(_name, "", "f.xml"))
+        # Narrow filters are answered from the indexes, broad ones by scanning the sorted results - both in get_results() order
+        for _filters in [{}, {"states": ["failed"]}, {"states": ["passed"]}, {"squad": "squad1"}, {"states": ["failed"], "priority": "P0"}, {"states": ["ignored"]}]:
+            self.assertEqual(list(_aggregate.iter_results(**_filters)), _aggregate.get_results(**_filters), _filters)
+        _raw = _aggregate.iter_raw_results()
+        self.assertEqual({**_raw, "results": list(_raw['results'])}, _aggregate.get_raw_results())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest, os, sys, tempfile, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsDiscovery
+
+class TestResultsDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for _path in ["b.xml", "a.xml", "notes.txt", "shard-1/chrome/c.xml", "shard-1/firefox/d.xml", "shard-2/chrome/e.xml", "shard-2/chrome/skip.xml"]:
+            _full_path = os.path.join(self.tmp_dir, _path)
+            os.makedirs(os.path.dirname(_full_path), exist_ok=True)
+            with open(_full_path, "w+") as f:
+                f.write("<testsuites/>")
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def relpaths(self, files):
+        return [os.path.relpath(f, self.tmp_dir).replace(os.sep, "/") for f in files]
+
+
+    def test_top_level_only(self):
+        _files = ResultsDiscovery.ResultsDiscovery().discover([self.tmp_dir])
+        self.assertEqual(self.relpaths(_files), ["a.xml", "b.xml"])
+
+
+    def test_recursive_sorted(self):
+        _expected = ["a.xml", "b.xml", "shard-1/chrome/c.xml", "shard-1/firefox/d.xml", "shard-2/chrome/e.xml", "shard-2/chrome/skip.xml"]
+        for _threads in [1, 4]:
+            _files = ResultsDiscovery.ResultsDiscovery(recursive=True, threads=_threads).discover([self.tmp_dir])
+            self.assertEqual(self.relpaths(_files), _expected)
+
+
+    def test_include_exclude(self):
+        _discovery = ResultsDiscovery.ResultsDiscovery(recursive=True, include=["shard-*/chrome/*.xml"], exclude=["skip.xml", "shard-1"])
+        self.assertEqual(self.relpaths(_discovery.discover([self.tmp_dir])), ["shard-2/chrome/e.xml"])
+
+
+    def test_files_passed_through(self):
+        _archive = os.path.join(self.tmp_dir, "notes.txt")
+        _files = ResultsDiscovery.ResultsDiscovery().discover([_archive, self.tmp_dir])
+        self.assertEqual(self.relpaths(_files), ["notes.txt", "a.xml", "b.xml"])
+
+
+if __name__ == '__main__':
+    unittest.main()
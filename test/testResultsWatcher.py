@@ -0,0 +1,57 @@
+import unittest, os, sys, tempfile, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import ResultsWatcher
+
+class TestResultsWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def write_shard(self, name, cases):
+        _path = os.path.join(self.tmp_dir, name)
+        with open(_path, "w+") as f:
+            f.write(f'<testsuite name="{name}">')
+            for _case, _failed in cases:
+                f.write(f'<testcase name="{_case}">' + ('<failure>boom</failure>' if _failed else '') + '</testcase>')
+            f.write('</testsuite>')
+        return _path
+
+
+    def test_incremental_aggregation(self):
+        _watcher = ResultsWatcher.ResultsWatcher([self.tmp_dir], settle_seconds=0)
+        self.assertFalse(_watcher.poll())
+        self.write_shard("a.xml", [("a1", False), ("a2", True)])
+        self.assertTrue(_watcher.poll())
+        self.assertEqual(_watcher.get_aggregate().get_counts(), (2, 1, 1, 0, 0))
+        self.assertFalse(_watcher.poll())
+        self.write_shard("b.xml", [("b1", False)])
+        self.assertTrue(_watcher.poll())
+        self.assertEqual(_watcher.get_aggregate().get_counts(), (3, 2, 1, 0, 0))
+        # A shard rewritten in place replaces its earlier results rather than adding to them
+        _path = self.write_shard("a.xml", [("a1", False), ("a2", False), ("a3", False)])
+        os.utime(_path, ns=(os.stat(_path).st_atime_ns, os.stat(_path).st_mtime_ns + 1000))
+        self.assertTrue(_watcher.poll())
+        self.assertEqual(_watcher.get_aggregate().get_counts(), (4, 4, 0, 0, 0))
+        os.remove(_path)
+        self.assertTrue(_watcher.poll())
+        self.assertEqual(_watcher.get_aggregate().get_counts(), (1, 1, 0, 0, 0))
+        self.assertEqual(_watcher.get_files(), [os.path.join(self.tmp_dir, "b.xml")])
+
+
+    def test_waits_for_files_to_settle(self):
+        _watcher = ResultsWatcher.ResultsWatcher([self.tmp_dir], settle_seconds=3600)
+        self.write_shard("a.xml", [("a1", False)])
+        # Just written - not loaded until it's been seen unchanged by a second poll
+        self.assertFalse(_watcher.poll())
+        self.assertTrue(_watcher.poll())
+        self.assertEqual(_watcher.get_aggregate().get_counts(), (1, 1, 0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
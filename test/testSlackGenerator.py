@@ -1,6 +1,7 @@
 import unittest, os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from generators import SlackGenerator
+from datamodel import ResultsAggregator as ra
 
 class TestSlackGenerator(unittest.TestCase):
 
@@ -233,5 +234,31 @@ https://on.cypress.io/element-cannot-be-interacted-with
 """)
 
 
+    def test_slack_body_budget(self):
+        _aggregate = ra.ResultsAggregator()
+        for _name, _message in [("[P1][sev2][search] a", "x" * 300), ("[P2][sev1][search] b", "y" * 300), ("[P1][sev1][search] c", "short"),
+            ("d", "z" * 300), ("[P1][sev1][search] e", "")]:
+            _aggregate.insert_result("suite", ra.ResultsAggregator.failed, _name, ra.ResultsAggregator.get_case_metadata(_name, _message, "a.xml"))
+        _generator = SlackGenerator.SlackGenerator([], aggregated_results=_aggregate)
+        # Untagged tests default to the most urgent severity and priority
+        _names = [":failed: suite -> [P1][sev1][search] c\n", ":failed: suite -> [P1][sev1][search] e\n", ":failed: suite -> d\n",
+            ":failed: suite -> [P2][sev1][search] b\n", ":failed: suite -> [P1][sev2][search] a\n"]
+        _full = "*Failing Tests*\n" + _names[0] + "```short```\n" + _names[1] + "``````\n" + "".join(n + f"```{c * 300}```\n" for n, c in zip(_names[2:], "zyx"))
+        # Most severe first, everything in full when it fits
+        self.assertEqual(_generator.generate_body(len(_full)), _full)
+        # Long messages are cut to an equal excerpt, empty ones dropped
+        _excerpts = "*Failing Tests*\n" + _names[0] + "```short```\n" + _names[1] + "".join(n + f"```{c * 199}…```\n" for n, c in zip(_names[2:], "zyx"))
+        self.assertEqual(_generator.generate_body(len(_excerpts)), _excerpts)
+        # Then only the most severe keep an excerpt
+        _names_only = "*Failing Tests*\n" + _names[0] + "```short```\n" + _names[1] + _names[2] + f"```{'z' * 99}…```\n" + _names[3] + _names[4]
+        self.assertEqual(_generator.generate_body(len(_names_only)), _names_only)
+        # Then as many names as fit, and a count of the rest
+        _more = "*Failing Tests*\n" + _names[0] + _names[1] + "_…and 3 more failing tests_\n"
+        self.assertEqual(_generator.generate_body(len(_more) + 5), _more)
+        self.assertEqual(_generator.generate_body(10), "")
+        for _budget in range(0, len(_full) + 10, 7):
+            self.assertLessEqual(len(_generator.generate_body(_budget)), _budget)
+
+
 if __name__ == '__main__':
     unittest.main()
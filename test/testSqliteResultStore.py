@@ -0,0 +1,69 @@
+import unittest, os, sys, tempfile, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import SqliteResultStore
+
+class TestSqliteResultStore(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = sorted(os.path.join(TestSqliteResultStore.results_folder, f) for f in os.listdir(TestSqliteResultStore.results_folder))
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def test_matches_memory_store(self):
+        _ignorelist = [{"name": "Search: Viewer is NOT able to edit configmaps"}]
+        for _lazy in (False, True):
+            _memory = ra.ResultsAggregator(files=self.files, ignorelist=_ignorelist, lazy_messages=_lazy)
+            _sqlite = ra.ResultsAggregator(files=self.files, ignorelist=_ignorelist, lazy_messages=_lazy, store=ra.ResultsAggregator.sqlite_store, store_dir=self.tmp_dir)
+            self.assertEqual(_sqlite.get_counts(), _memory.get_counts())
+            self.assertEqual(_sqlite.get_coverage(), _memory.get_coverage())
+            self.assertEqual(_sqlite.get_raw_results(), _memory.get_raw_results())
+            for _states in (None, [ra.ResultsAggregator.failed], [ra.ResultsAggregator.failed, ra.ResultsAggregator.ignored]):
+                # Lazy MessageRefs are compared by the message they resolve to
+                self.assertEqual([(r['testsuite'], r['name'], r['state'], _sqlite.get_message(r)) for r in _sqlite.get_results(states=_states)],
+                    [(r['testsuite'], r['name'], r['state'], _memory.get_message(r)) for r in _memory.get_results(states=_states)])
+                self.assertEqual(len(_sqlite.get_results(states=_states)), len(_memory.get_results(states=_states)))
+            self.assertEqual(sorted(_sqlite.get_unique_tags()), sorted(_memory.get_unique_tags()))
+            self.assertEqual(sorted(_sqlite.get_unique_tags_from_failures()), sorted(_memory.get_unique_tags_from_failures()))
+            self.assertEqual([[r['name'] for r in g['results']] for g in _sqlite.get_message_groups()],
+                [[r['name'] for r in g['results']] for g in _memory.get_message_groups()])
+
+
+    def test_duplicates_and_filters(self):
+        _aggregate = ra.ResultsAggregator(ignorelist=[{"name": "flaky"}], store=ra.ResultsAggregator.sqlite_store, store_dir=self.tmp_dir)
+        _tagged = ra.ResultsAggregator.get_case_metadata("[P2][Severity 2][search,console] tagged", "boom", "a.xml")
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "retried", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "retried", {"message": "boom"})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "retried", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "flaky", {"message": "flake"})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.passed, "tagged", {"message": ""})
+        _aggregate.insert_result("suite", ra.ResultsAggregator.failed, "tagged", _tagged)
+        self.assertEqual(_aggregate.get_counts(), (3, 0, 2, 0, 1))
+        self.assertEqual([(r['name'], r['metadata']['message']) for r in _aggregate.get_results(states=[ra.ResultsAggregator.failed])],
+            [("retried", "boom"), ("tagged", "boom")])
+        # An updated result moves between the squad, severity, and priority indexes
+        self.assertEqual([r['name'] for r in _aggregate.get_results(squad="console")], ["tagged"])
+        self.assertEqual([r['name'] for r in _aggregate.get_results(squad="Unlabelled")], ["flaky", "retried"])
+        self.assertEqual([r['name'] for r in _aggregate.get_results(severity="Severity 2", priority="P2")], ["tagged"])
+        self.assertFalse(_aggregate.get_results(squad="nobody"))
+
+
+    def test_database_removed(self):
+        _store = SqliteResultStore.SqliteResultStore(directory=self.tmp_dir)
+        _store.add({"testsuite": "suite", "name": "a", "state": ra.ResultsAggregator.passed, "metadata": {}})
+        with self.assertRaises(ValueError):
+            _store.add({"testsuite": "suite", "name": "a", "state": ra.ResultsAggregator.failed, "metadata": {}})
+        self.assertEqual(len(_store), 1)
+        self.assertEqual(os.listdir(self.tmp_dir), [os.path.basename(_store.path)])
+        del _store
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
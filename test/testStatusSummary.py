@@ -0,0 +1,106 @@
+import unittest, os, sys, tempfile, shutil
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from datamodel import ResultsAggregator as ra
+from datamodel import ResultsDiscovery, StatusSummary
+
+class TestStatusSummary(unittest.TestCase):
+
+    results_folder = f"{os.path.dirname(os.path.abspath(__file__))}/test_results_dir"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+    def write_file(self, name, content):
+        _path = os.path.join(self.tmp_dir, name)
+        with open(_path, "w+") as f:
+            f.write(content)
+        return _path
+
+
+    def assert_matches_aggregator(self, files):
+        _summary = StatusSummary.StatusSummary(files=files)
+        _aggregate = ra.ResultsAggregator(files=files)
+        self.assertEqual(_summary.get_counts(), _aggregate.get_counts())
+        self.assertEqual(_summary.get_coverage(), _aggregate.get_coverage())
+        return _summary
+
+
+    def test_matches_aggregator_on_test_results(self):
+        _files = ResultsDiscovery.ResultsDiscovery().discover([TestStatusSummary.results_folder])
+        _summary = self.assert_matches_aggregator(_files)
+        self.assertEqual(_summary.get_counts(), (13, 9, 3, 1, 0))
+
+
+    def test_counts_from_attributes(self):
+        _path = self.write_file("a.xml", '<testsuites><testsuite name="a" tests="4" failures="1" errors="0" skipped="1">'
+            + '<testcase name="t1"/><testcase name="t2"/><testcase name="t3"><failure>boom</failure></testcase><testcase name="t4"><skipped/></testcase>'
+            + '</testsuite></testsuites>')
+        _summary = self.assert_matches_aggregator([_path])
+        self.assertEqual(_summary.mode, "attributes")
+        self.assertEqual(_summary.get_counts(), (4, 2, 1, 1, 0))
+
+
+    def test_mismatched_attributes_rescan_cases(self):
+        # Attributes that undercount the suite's failures - or are missing its testcases altogether - aren't trusted
+        _path = self.write_file("a.xml", '<testsuite name="a" tests="2" failures="0"><testcase name="t1"/><testcase name="t2"><failure>boom</failure></testcase></testsuite>')
+        _summary = self.assert_matches_aggregator([_path])
+        self.assertEqual(_summary.mode, "cases")
+        self.assertEqual(_summary.get_status(), ra.ResultsAggregator(files=[_path]).get_status())
+        self.assertEqual(_summary.get_counts(), (2, 1, 1, 0, 0))
+        _path = self.write_file("b.xml", '<testsuites><testsuite name="a" tests="10" failures="2" errors="0" skipped="3"/></testsuites>')
+        self.assertEqual(self.assert_matches_aggregator([_path]).get_counts(), (0, 0, 0, 0, 0))
+
+
+    def test_counts_cases_without_attributes(self):
+        _path = self.write_file("a.xml", '<testsuites><testsuite name="a" tests="3" failures="0" errors="1">'
+            + '<testcase name="t1"/><testcase name="t2"><failure>boom</failure></testcase><testcase name="t3"><skipped/></testcase>'
+            + '</testsuite><testsuite name="b"><testcase name="t1"/></testsuite></testsuites>')
+        _summary = self.assert_matches_aggregator([_path])
+        self.assertEqual(_summary.mode, "attributes")
+        self.assertEqual(_summary.get_counts(), (4, 2, 1, 1, 0))
+
+
+    def test_duplicates_rescan_cases(self):
+        _first = self.write_file("a.xml", '<testsuite name="a" tests="2" failures="0"><testcase name="t1"/><testcase name="t2"/></testsuite>')
+        _second = self.write_file("b.xml", '<testsuite name="a" tests="2" failures="1"><testcase name="t1"><failure>boom</failure></testcase><testcase name="t3"/></testsuite>')
+        _summary = self.assert_matches_aggregator([_first, _second])
+        self.assertEqual(_summary.mode, "cases")
+        self.assertEqual(_summary.get_counts(), (3, 2, 1, 0, 0))
+
+
+    def test_retried_cases_rescan_cases(self):
+        # A retried test fails and then passes within one suite - any failure wins, as in the ResultsAggregator
+        _path = self.write_file("a.xml", '<testsuite name="a" tests="2" failures="1"><testcase name="t1"><failure>boom</failure></testcase>'
+            + '<testcase name="t1"/></testsuite>')
+        _summary = self.assert_matches_aggregator([_path])
+        self.assertEqual(_summary.mode, "cases")
+        self.assertEqual(_summary.get_counts(), (1, 0, 1, 0, 0))
+
+
+    def test_nested_suites_rescan_cases(self):
+        _path = self.write_file("a.xml", '<testsuite name="outer" tests="2" failures="0"><testcase name="t1"/>'
+            + '<testsuite name="inner" tests="1" failures="0"><testcase name="t1"/></testsuite></testsuite>')
+        _summary = self.assert_matches_aggregator([_path])
+        self.assertEqual(_summary.mode, "cases")
+
+
+    def test_falls_back_to_aggregator(self):
+        _valid = self.write_file("a.xml", '<testsuite name="a" tests="1" failures="0"><testcase name="t1"/></testsuite>')
+        _broken = self.write_file("b.xml", '<testsuite name="b"><testcase name="t1">')
+        _summary = self.assert_matches_aggregator([_valid, _broken])
+        self.assertEqual(_summary.mode, "aggregate")
+
+
+    def test_print_status(self):
+        _summary = StatusSummary.StatusSummary(files=ResultsDiscovery.ResultsDiscovery().discover([TestStatusSummary.results_folder]))
+        self.assertEqual(StatusSummary.StatusSummary.print_status(_summary, 90, 70), 0)
+        self.assertEqual(StatusSummary.StatusSummary.print_status(_summary, 100, 100), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()